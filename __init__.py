@@ -2,13 +2,17 @@
 from __future__ import annotations
 
 import asyncio
-from datetime import timedelta
+from collections.abc import Mapping
+from datetime import datetime, timedelta
+from http import HTTPStatus
 import logging
+import time
 from typing import Any, Dict, Optional
 
 from aiohttp import ClientConnectionError, ClientResponseError
 from async_timeout import timeout
-from .src.pymelcloud import Device, get_devices
+from .src.pymelcloud import DEVICE_TYPE_ATW, Device, get_devices, release_client
+from .src.pymelcloud.atw_device import STATUS_DEFROST
 from .src.pymelcloud.client import BASE_URL
 import voluptuous as vol
 
@@ -20,39 +24,56 @@ from homeassistant.const import (
     CONF_USERNAME,
     Platform,
 )
-from homeassistant.core import HomeAssistant
-from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import ConfigEntryAuthFailed, ConfigEntryNotReady
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from homeassistant.helpers.device_registry import CONNECTION_NETWORK_MAC
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.typing import ConfigType
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
-
-from .const import CONF_LANGUAGE, DOMAIN, LANGUAGES, MEL_DEVICES, Language
-
-ATTR_STATE_DEVICE_ID = "device_id"
-ATTR_STATE_DEVICE_SERIAL = "device_serial"
-ATTR_STATE_DEVICE_MAC = "device_mac"
-ATTR_STATE_DEVICE_LAST_SEEN = "last_communication"
-
-ATTR_STATE_UMODEL = "model"
-ATTR_STATE_USERIAL = "serial_number"
+from homeassistant.helpers.update_coordinator import (
+    CoordinatorEntity,
+    DataUpdateCoordinator,
+)
+from homeassistant.util import dt as dt_util
+
+from .analytics import DEFROST_ENDED, DEFROST_STARTED, CopTracker, DefrostTracker
+from .archive import TelemetryArchive
+from .backfill import EnergyBackfill
+from .fleet import FleetAggregator
+from .histograms import DeviceHistograms, HistogramStore
+from .scheduler import ScheduleEngine
+from .services import async_setup_services
+from .const import (
+    CONF_LANGUAGE,
+    CONF_TELEMETRY_ARCHIVE,
+    CONF_TOKEN_EXPIRY,
+    DOMAIN,
+    ENERGY_BACKFILL,
+    ENTRY_OPTIONS,
+    FLEET_AGGREGATOR,
+    HISTOGRAM_STORE,
+    LANGUAGES,
+    MEL_DEVICES,
+    SCHEDULE_ENGINE,
+    TELEMETRY_ARCHIVE,
+    TOKEN_MANAGER,
+    Language,
+)
 
-ATTR_STATE_DEVICE_UNIT = [
-    {
-        ATTR_STATE_UMODEL: "unit",
-        ATTR_STATE_USERIAL: "unit_serial",
-    },
-    {
-        ATTR_STATE_UMODEL: "ext_unit",
-        ATTR_STATE_USERIAL: "ext_unit_serial",
-    },
-]
+EVENT_DEFROST_STARTED = f"{DOMAIN}_defrost_started"
+EVENT_DEFROST_ENDED = f"{DOMAIN}_defrost_ended"
 
 _LOGGER = logging.getLogger(__name__)
 
 SCAN_INTERVAL = timedelta(seconds=60)
 
+# Ask for the password again this long before the token expires.
+TOKEN_REFRESH_MARGIN = timedelta(days=2)
+
+# LoginData of a config flow handed over to the setup of the created entry.
+LOGIN_DATA_CACHE = f"{DOMAIN}_login_data"
+LOGIN_DATA_TTL = 300
+
 PLATFORMS = [
     Platform.BINARY_SENSOR,
     #Platform.CLIMATE,
@@ -86,6 +107,7 @@ class MelCloudAuthentication:
         self._password = password
         self._language = language
         self._context_key = None
+        self._login_data: dict[str, Any] | None = None
 
     async def login(self, hass: HomeAssistant):
         """Try login MelCloud with provided credential."""
@@ -116,6 +138,7 @@ class MelCloudAuthentication:
                 if "LoginData" in req:
                     if context_key := req["LoginData"].get("ContextKey"):
                         self._context_key = context_key
+                        self._login_data = req["LoginData"]
                         return True
 
         _LOGGER.error("Login to MELCloud failed!")
@@ -126,11 +149,120 @@ class MelCloudAuthentication:
         """Get the authorization token."""
         return self._context_key
 
+    @property
+    def login_data(self) -> dict[str, Any] | None:
+        """Return the LoginData of the last successful login."""
+        return self._login_data
+
+    @property
+    def token_expiry(self) -> datetime | None:
+        """Return the expiry of the token, None if not reported."""
+        if self._login_data is None or not (expiry := self._login_data.get("Expiry")):
+            return None
+        parsed = dt_util.parse_datetime(expiry)
+        if parsed is not None and parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=dt_util.UTC)
+        return parsed
+
+
+def token_entry_data(
+    mcauth: MelCloudAuthentication, username: str, language: str
+) -> dict[str, Any]:
+    """Return the config entry data of a successful login.
+
+    The password is not stored, a reauthentication asks for it again when the
+    token expires.
+    """
+    expiry = mcauth.token_expiry
+    return {
+        CONF_TOKEN: mcauth.auth_token,
+        CONF_TOKEN_EXPIRY: expiry.isoformat() if expiry else None,
+        CONF_USERNAME: username,
+        CONF_LANGUAGE: language,
+    }
+
+
+class TokenManager:
+    """Start the reauthentication of a config entry before its token expires.
+
+    The expiry is checked after every poll. Tokens without a reported expiry are
+    only replaced once MELCloud rejects them. The token is not refreshed
+    unattended: MELCloud has no refresh endpoint and a new token needs the
+    password, which is not stored.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
+        """Initialize the manager of a config entry."""
+        self._hass = hass
+        self._entry = entry
+        self._reauth_started = False
+
+    @callback
+    def async_add_devices(self, mel_devices: list[MelCloudDevice]) -> None:
+        """Register the devices using the token."""
+        for mel_device in mel_devices:
+            mel_device.token_manager = self
+
+    @property
+    def expiry(self) -> datetime | None:
+        """Return the stored token expiry."""
+        if not (expiry := self._entry.data.get(CONF_TOKEN_EXPIRY)):
+            return None
+        return dt_util.parse_datetime(expiry)
+
+    @callback
+    def async_check_expiry(self) -> None:
+        """Start the reauthentication once if the token expires soon."""
+        if self._reauth_started or (expiry := self.expiry) is None:
+            return
+        if expiry - dt_util.utcnow() < TOKEN_REFRESH_MARGIN:
+            _LOGGER.info(
+                "The MELCloud token of %s expires on %s, reauthentication required",
+                self._entry.title,
+                expiry,
+            )
+            self._reauth_started = True
+            self._entry.async_start_reauth(self._hass)
+
+
+@callback
+def async_cache_login_data(
+    hass: HomeAssistant, account: str, login_data: dict[str, Any] | None
+) -> None:
+    """Keep the LoginData of a config flow for the setup of its entry."""
+    if login_data is None:
+        return
+    hass.data.setdefault(LOGIN_DATA_CACHE, {})[account] = (
+        time.monotonic(),
+        login_data,
+    )
+
+
+@callback
+def _async_pop_login_data(
+    hass: HomeAssistant, account: str, token: str
+) -> dict[str, Any] | None:
+    """Return the cached LoginData of an account if fresh and for the token."""
+    cache: dict[str, tuple[float, dict[str, Any]]] = hass.data.get(
+        LOGIN_DATA_CACHE, {}
+    )
+    cached = cache.pop(account, None)
+    if not cache:
+        hass.data.pop(LOGIN_DATA_CACHE, None)
+    if cached is None:
+        return None
+    cached_at, login_data = cached
+    if time.monotonic() - cached_at > LOGIN_DATA_TTL:
+        return None
+    if login_data.get("ContextKey") != token:
+        return None
+    return login_data
+
 
 async def _async_migrate_config(
     hass: HomeAssistant,
     entry: ConfigEntry,
-) -> None:
+) -> str:
     """Migrate config entry storing token instead of username and password"""
     conf = entry.data
     username = conf[CONF_USERNAME]
@@ -153,13 +285,16 @@ async def _async_migrate_config(
     except Exception as ex:
         raise ConfigEntryNotReady() from ex
 
-    token = mcauth.auth_token
-    hass.config_entries.async_update_entry(entry, data={CONF_TOKEN: token})
-    return token
+    hass.config_entries.async_update_entry(
+        entry, data=token_entry_data(mcauth, username, language)
+    )
+    return mcauth.auth_token
 
 
 async def async_setup(hass: HomeAssistant, config: ConfigType):
     """Establish connection with MELCloud."""
+    async_setup_services(hass)
+
     if DOMAIN not in config:
         return True
 
@@ -182,30 +317,135 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
         token = await _async_migrate_config(hass, entry)
     else:
         token = conf[CONF_TOKEN]
+        if CONF_PASSWORD in conf:
+            # Entries created by older versions kept the password.
+            data = dict(conf)
+            data.pop(CONF_PASSWORD)
+            hass.config_entries.async_update_entry(entry, data=data)
 
-    mel_devices = await mel_devices_setup(hass, token)
-    hass.data.setdefault(DOMAIN, {}).setdefault(entry.entry_id, {}).update(
-        {
-            MEL_DEVICES: mel_devices,
-        }
-    )
-    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    account = _client_account(entry)
+    login_data = _async_pop_login_data(hass, account, token)
+    mel_devices = await mel_devices_setup(hass, token, account, login_data)
+
+    energy_backfill = schedule_engine = telemetry_archive = None
+    try:
+        energy_backfill = EnergyBackfill(hass, entry.entry_id)
+        await energy_backfill.async_load()
+        for devices in mel_devices.values():
+            for mel_device in devices:
+                mel_device.energy_backfill = energy_backfill
+                energy_backfill.async_schedule(mel_device)
+
+        histogram_store = HistogramStore(hass, entry.entry_id)
+        await histogram_store.async_load()
+        for mel_device in mel_devices.get(DEVICE_TYPE_ATW, []):
+            mel_device.histograms = histogram_store.get(mel_device.device_id)
+            mel_device.histogram_store = histogram_store
+
+        token_manager = TokenManager(hass, entry)
+        for devices in mel_devices.values():
+            token_manager.async_add_devices(devices)
+
+        fleet = FleetAggregator()
+        for devices in mel_devices.values():
+            for mel_device in devices:
+                mel_device.fleet = fleet
+                fleet.async_update_device(mel_device)
+
+        schedule_engine = ScheduleEngine(hass, entry.entry_id)
+        await schedule_engine.async_load()
+        for devices in mel_devices.values():
+            for mel_device in devices:
+                mel_device.schedule_engine = schedule_engine
+                schedule_engine.async_add_device(mel_device)
+        schedule_engine.async_start()
+
+        if entry.options.get(CONF_TELEMETRY_ARCHIVE, False):
+            telemetry_archive = TelemetryArchive(hass)
+            telemetry_archive.async_start()
+            for mel_device in mel_devices.get(DEVICE_TYPE_ATW, []):
+                mel_device.telemetry_archive = telemetry_archive
+
+        hass.data.setdefault(DOMAIN, {}).setdefault(entry.entry_id, {}).update(
+            {
+                MEL_DEVICES: mel_devices,
+                ENERGY_BACKFILL: energy_backfill,
+                FLEET_AGGREGATOR: fleet,
+                HISTOGRAM_STORE: histogram_store,
+                SCHEDULE_ENGINE: schedule_engine,
+                TELEMETRY_ARCHIVE: telemetry_archive,
+                TOKEN_MANAGER: token_manager,
+                ENTRY_OPTIONS: dict(entry.options),
+            }
+        )
+        entry.async_on_unload(entry.add_update_listener(_async_update_listener))
+        await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    except BaseException:
+        # Undo the setup, a retry acquires the shared client again.
+        hass.data.get(DOMAIN, {}).pop(entry.entry_id, None)
+        if not hass.data.get(DOMAIN, True):
+            hass.data.pop(DOMAIN)
+        if schedule_engine is not None:
+            schedule_engine.async_stop()
+        if telemetry_archive is not None:
+            await telemetry_archive.async_stop()
+        if energy_backfill is not None:
+            await energy_backfill.async_cancel()
+        await release_client(account)
+        raise
 
     return True
 
 
+def _client_account(entry: ConfigEntry) -> str:
+    """Return the key sharing the MELCloud client between entries of an account."""
+    return entry.unique_id or entry.entry_id
+
+
+async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload the config entry when its options changed.
+
+    Token refreshes update the entry data and must not reload the entry.
+    """
+    entry_data = hass.data.get(DOMAIN, {}).get(entry.entry_id, {})
+    if entry_data.get(ENTRY_OPTIONS) == dict(entry.options):
+        return
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, config_entry: ConfigEntry):
     """Unload a config entry."""
     if unload_ok := await hass.config_entries.async_unload_platforms(
         config_entry, PLATFORMS
     ):
-        hass.data[DOMAIN].pop(config_entry.entry_id)
+        entry_data = hass.data[DOMAIN].pop(config_entry.entry_id)
+        await release_client(_client_account(config_entry))
+        await entry_data[ENERGY_BACKFILL].async_cancel()
+        await entry_data[HISTOGRAM_STORE].async_save()
+        entry_data[SCHEDULE_ENGINE].async_stop()
+        if (telemetry_archive := entry_data[TELEMETRY_ARCHIVE]) is not None:
+            await telemetry_archive.async_stop()
         if not hass.data[DOMAIN]:
             hass.data.pop(DOMAIN)
 
     return unload_ok
 
 
+def _changed_keys(
+    old: Mapping[str, Any] | None, new: Mapping[str, Any] | None
+) -> set[str]:
+    """Return the keys whose value differs between two MELCloud payloads."""
+    if old is new:
+        return set()
+    old = old or {}
+    new = new or {}
+    changed = {
+        key for key, value in new.items() if key not in old or old[key] != value
+    }
+    changed.update(key for key in old if key not in new)
+    return changed
+
+
 class MelCloudDevice:
     """MELCloud Device instance."""
 
@@ -213,20 +453,141 @@ class MelCloudDevice:
         """Construct a device wrapper."""
         self.device = device
         self.name: str | None = device.name
-        self._extra_attributes = None
-        self._dev_conf = None
         self._coordinator: DataUpdateCoordinator | None = None
+        self.last_update_duration: float | None = None
+        self.last_update_success: datetime | None = None
+        self._prev_conf: dict[str, Any] | None = None
+        self._prev_state: Mapping[str, Any] | None = None
+        self._changed: frozenset[str] | None = None
+        self.cop_tracker: CopTracker | None = None
+        self.defrost_tracker: DefrostTracker | None = None
+        self.energy_backfill: EnergyBackfill | None = None
+        self.fleet: FleetAggregator | None = None
+        self.histograms: DeviceHistograms | None = None
+        self.histogram_store: HistogramStore | None = None
+        self.schedule_engine: ScheduleEngine | None = None
+        self.telemetry_archive: TelemetryArchive | None = None
+        self.token_manager: TokenManager | None = None
+        if device.device_type == DEVICE_TYPE_ATW:
+            self.cop_tracker = CopTracker()
+            self.defrost_tracker = DefrostTracker()
+        self._hass: HomeAssistant | None = None
+        # Coordinator data, bumped whenever the device data changed.
+        self._revision = 0
+
+    async def _async_update(self) -> int:
+        """Pull the latest data from MELCloud.
+
+        Returns a revision that only changes with the device data, the coordinator
+        skips notifying the entities when it stays the same.
+        """
+        # Notify every entity if the update fails or recovers from a failure.
+        self._changed = None
+        started = time.monotonic()
+        try:
+            updated = await self.device.update()
+        except ClientResponseError as ex:
+            if ex.status in (HTTPStatus.UNAUTHORIZED, HTTPStatus.FORBIDDEN):
+                raise ConfigEntryAuthFailed from ex
+            raise
+        if updated:
+            self._revision += 1
+        self.last_update_duration = time.monotonic() - started
+        self.last_update_success = dt_util.utcnow()
+
+        conf_updated = self._prev_conf is not self.device._device_conf
+        changed = self._diff_raw_data()
+        if self._coordinator is not None and self._coordinator.last_update_success:
+            self._changed = changed
+        if self.cop_tracker is not None and conf_updated:
+            self.cop_tracker.add_sample(self.device._device_props, time.time())
+        if self.defrost_tracker is not None:
+            self._track_defrost()
+        if self.histograms is not None:
+            self.histograms.add_sample(self.device._device_props, time.time())
+            self.histogram_store.async_schedule_save()
+        if self.telemetry_archive is not None and conf_updated:
+            # The conf is refreshed every few polls, only archive fresh values.
+            self.telemetry_archive.async_append(
+                self.device_id, time.time(), self.device._device_props
+            )
+        if self.fleet is not None:
+            self.fleet.async_update_device(self)
+        if self.energy_backfill is not None:
+            # Catch up on the days missed while MELCloud was unreachable.
+            self.energy_backfill.async_schedule(self)
+        if self.token_manager is not None:
+            self.token_manager.async_check_expiry()
+        return self._revision
+
+    def _track_defrost(self) -> None:
+        """Feed the defrost state machine and fire an event on transitions."""
+        device_props = self.device._device_props
+        # The conf DefrostMode can be minutes older than the polled state.
+        defrosting = self.device.status == STATUS_DEFROST
+        # Cumulative Wh counter, 0 when the unit has no reading.
+        counter = device_props.get("CurrentEnergyConsumed") or None
+        now = dt_util.utcnow()
+        tracker = self.defrost_tracker
+        transition = tracker.add_sample(
+            now.timestamp(),
+            dt_util.as_local(now).date(),
+            defrosting,
+            counter / 1000.0 if counter is not None else None,
+        )
+        if transition is None or self._hass is None:
+            return
 
-    async def _async_update(self):
-        """Pull the latest data from MELCloud."""
-        self._dev_conf = None
-        await self.device.update()
+        data = {"device_id": self.device_id, "name": self.name}
+        if transition == DEFROST_STARTED:
+            self._hass.bus.async_fire(EVENT_DEFROST_STARTED, data)
+        elif transition == DEFROST_ENDED:
+            data["duration"] = tracker.last_duration
+            data["energy"] = tracker.last_energy
+            self._hass.bus.async_fire(EVENT_DEFROST_ENDED, data)
+
+    def _diff_raw_data(self) -> frozenset[str]:
+        """Compute the conf and state keys changed since the previous diff.
+
+        The library replaces the conf and state on every fetch instead of mutating
+        them, keeping references to the previous ones is enough to diff them.
+        """
+        conf = self.device._device_conf
+        state = self.device._state
+        changed = _changed_keys(self._prev_conf, conf)
+        if self._prev_conf is not conf:
+            changed |= _changed_keys(
+                (self._prev_conf or {}).get("Device"), self.device._device_props
+            )
+        changed |= _changed_keys(self._prev_state, state)
+        self._prev_conf = conf
+        self._prev_state = state
+        return frozenset(changed)
+
+    def has_changed(self, keys: frozenset[str] | None) -> bool:
+        """Return True if any of the raw keys changed during the last update.
+
+        Entities without source keys are always considered changed.
+        """
+        if keys is None or self._changed is None:
+            return True
+        return not self._changed.isdisjoint(keys)
+
+    def cop(self, mode: str, window: str) -> float | None:
+        """Return the rolling coefficient of performance of an operation mode."""
+        if self.cop_tracker is None:
+            return None
+        cop = self.cop_tracker.cop(mode, window, time.time())
+        if cop is None:
+            return None
+        return round(cop, 2)
 
     async def async_create_coordinator(self, hass: HomeAssistant) -> None:
         """Get the coordinator for a specific device."""
         if self._coordinator:
             return
 
+        self._hass = hass
         coordinator = DataUpdateCoordinator(
             hass,
             _LOGGER,
@@ -234,25 +595,37 @@ class MelCloudDevice:
             update_method=self._async_update,
             # Polling interval. Will only be polled if there are subscribers.
             update_interval=SCAN_INTERVAL,
+            always_update=False,
         )
         await coordinator.async_refresh()
         self._coordinator = coordinator
 
-    async def async_set(self, properties: Dict[str, Any]):
-        """Write state changes to the MELCloud API."""
+    async def async_set(self, properties: Dict[str, Any]) -> bool:
+        """Write state changes to the MELCloud API.
+
+        Returns False if the write failed.
+        """
         try:
             await self.device.set(properties)
         except (ClientConnectionError, ClientResponseError):
             _LOGGER.warning("Set status failed for %s", self.name)
-            return
+            return False
         if self._coordinator:
-            self._coordinator.async_set_updated_data(None)
+            self._changed = self._diff_raw_data()
+            self._revision += 1
+            self._coordinator.async_set_updated_data(self._revision)
+        return True
 
     @property
     def coordinator(self) -> DataUpdateCoordinator | None:
         """Return coordinator associated."""
         return self._coordinator
 
+    @property
+    def client(self):
+        """Return the MELCloud client shared by the devices of the account."""
+        return self.device._client
+
     @property
     def device_id(self):
         """Return device ID."""
@@ -266,13 +639,7 @@ class MelCloudDevice:
     @property
     def device_conf(self):
         """Return device_conf of the device."""
-        if self._dev_conf is None:
-            dev_conf = self.device._device_conf
-            if dev_conf is None:
-                self._dev_conf = {}
-            else:
-                self._dev_conf = dev_conf.get("Device", {})
-        return self._dev_conf
+        return self.device._device_props
 
     @property
     def wifi_signal(self) -> Optional[int]:
@@ -291,59 +658,74 @@ class MelCloudDevice:
         """Return has wide van info."""
         return self.device_conf.get("HasWideVane", False)
 
+    @property
+    def registry_identifier(self) -> str:
+        """Return the identifier of the device in the device registry."""
+        return f"{self.device.mac}-{self.device.serial}"
+
     @property
     def device_info(self) -> DeviceInfo:
-        """Return a device description for device registry."""
+        """Return a device description for device registry.
+
+        The static identity of the device lives here rather than in the state
+        attributes of its entities, where it would be recorded with every state.
+        """
         _device_info = DeviceInfo(
-            identifiers={(DOMAIN, f"{self.device.mac}-{self.device.serial}")},
+            identifiers={(DOMAIN, self.registry_identifier)},
             manufacturer="Mitsubishi Electric",
             name=self.name,
             connections={(CONNECTION_NETWORK_MAC, self.device.mac)},
+            serial_number=self.device.serial,
         )
         model = f"MELCloud IF (MAC: {self.device.mac})"
         unit_infos = self.device.units
         if unit_infos is not None:
+            # serial_number is the serial of the device, the serials of its
+            # indoor and outdoor units go with their models.
             model = (
                 model
                 + " - "
-                + ", ".join([x["model"] for x in unit_infos if x["model"]])
+                + ", ".join(
+                    f"{x['model']} (S/N {x['serial_number']})"
+                    if x["serial_number"]
+                    else x["model"]
+                    for x in unit_infos
+                    if x["model"]
+                )
             )
         _device_info[ATTR_MODEL] = model
 
         return _device_info
 
-    @property
-    def extra_attributes(self):
-        """Return the optional state attributes."""
-        if self._extra_attributes:
-            return self._extra_attributes
-
-        data = {
-            ATTR_STATE_DEVICE_ID: self.device_id,
-            ATTR_STATE_DEVICE_SERIAL: self.device.serial,
-            ATTR_STATE_DEVICE_MAC: self.device.mac,
-            # data[ATTR_DEVICE_LAST_SEEN] = self._api.device.last_seen
-        }
 
-        unit_infos = self.device.units
-        if unit_infos is not None:
-            for i, u in enumerate(unit_infos):
-                if i < 2:
-                    data[ATTR_STATE_DEVICE_UNIT[i][ATTR_STATE_UMODEL]] = u[
-                        ATTR_STATE_UMODEL
-                    ]
-                    data[ATTR_STATE_DEVICE_UNIT[i][ATTR_STATE_USERIAL]] = u[
-                        ATTR_STATE_USERIAL
-                    ]
-            self._extra_attributes = data
+class MelCloudEntity(CoordinatorEntity):
+    """Coordinator entity writing its state only when its source data changed.
+
+    Subclasses list the raw conf or state keys they read in _source_keys. Leaving it
+    to None writes the state on every coordinator update.
+    """
+
+    _api: MelCloudDevice
+    _source_keys: frozenset[str] | None = None
 
-        return data
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the state if the source keys of the entity changed."""
+        if self._api.has_changed(self._source_keys):
+            self.async_write_ha_state()
 
 
 async def mel_devices_setup(
-    hass: HomeAssistant, token: str
+    hass: HomeAssistant,
+    token: str,
+    account: str,
+    login_data: dict[str, Any] | None = None,
 ) -> dict[str, list[MelCloudDevice]]:
-    """Query connected devices from MELCloud."""
+    """Query connected devices from MELCloud.
+
+    The client is shared with the other entries of the account and must be
+    released with release_client on unload.
+    """
     session = async_get_clientsession(hass)
     try:
         async with timeout(10):
@@ -352,16 +734,27 @@ async def mel_devices_setup(
                 session,
                 conf_update_interval=timedelta(minutes=5),
                 device_set_debounce=timedelta(seconds=1),
+                account=account,
+                energy_report_ttl=timedelta(minutes=5),
+                login_data=login_data,
             )
-    except (asyncio.TimeoutError, ClientConnectionError, ClientResponseError) as ex:
+    except ClientResponseError as ex:
+        if ex.status in (HTTPStatus.UNAUTHORIZED, HTTPStatus.FORBIDDEN):
+            raise ConfigEntryAuthFailed from ex
+        raise ConfigEntryNotReady() from ex
+    except (asyncio.TimeoutError, ClientConnectionError) as ex:
         raise ConfigEntryNotReady() from ex
 
     wrapped_devices: dict[str, list[MelCloudDevice]] = {}
-    for device_type, devices in all_devices.items():
-        wrapped_types = []
-        for device in devices:
-            mel_device = MelCloudDevice(device)
-            await mel_device.async_create_coordinator(hass)
-            wrapped_types.append(mel_device)
-        wrapped_devices[device_type] = wrapped_types
+    try:
+        for device_type, devices in all_devices.items():
+            wrapped_types = []
+            for device in devices:
+                mel_device = MelCloudDevice(device)
+                await mel_device.async_create_coordinator(hass)
+                wrapped_types.append(mel_device)
+            wrapped_devices[device_type] = wrapped_types
+    except BaseException:
+        await release_client(account)
+        raise
     return wrapped_devices
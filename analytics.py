@@ -0,0 +1,212 @@
+"""Streaming analytics of MELCloud Air-to-Water devices.
+
+MELCloud reports consumed and produced energy of the current day per operation
+mode. The counters are diffed sample by sample and the deltas are accumulated in
+fixed-width buckets, keeping every window update O(1) without querying the
+recorder. Defrost cycles are detected from the successive polls in the same way.
+"""
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Mapping
+from datetime import date, timedelta
+from typing import Any
+
+MODE_HEATING = "heating"
+MODE_COOLING = "cooling"
+MODE_HOT_WATER = "hot_water"
+
+WINDOW_HOURLY = "hourly"
+WINDOW_DAILY = "daily"
+WINDOW_WEEKLY = "weekly"
+
+# Consumed and produced Device conf counters of each operation mode.
+MODE_COUNTERS: dict[str, tuple[str, str]] = {
+    MODE_HEATING: ("DailyHeatingEnergyConsumed", "DailyHeatingEnergyProduced"),
+    MODE_COOLING: ("DailyCoolingEnergyConsumed", "DailyCoolingEnergyProduced"),
+    MODE_HOT_WATER: ("DailyHotWaterEnergyConsumed", "DailyHotWaterEnergyProduced"),
+}
+
+# Window length and bucket width. The window slides by one bucket at a time.
+WINDOWS: dict[str, tuple[timedelta, timedelta]] = {
+    WINDOW_HOURLY: (timedelta(hours=1), timedelta(minutes=5)),
+    WINDOW_DAILY: (timedelta(days=1), timedelta(hours=1)),
+    WINDOW_WEEKLY: (timedelta(days=7), timedelta(hours=6)),
+}
+
+# Windows with less consumed energy give meaningless ratios.
+MIN_CONSUMED_ENERGY = 0.1
+
+
+class RollingEnergyWindow:
+    """Consumed and produced energy summed over a sliding window."""
+
+    __slots__ = ("_bucket_width", "_bucket_count", "_buckets", "consumed", "produced")
+
+    def __init__(self, length: timedelta, bucket_width: timedelta) -> None:
+        """Initialize an empty window."""
+        self._bucket_width = bucket_width.total_seconds()
+        self._bucket_count = max(1, int(length / bucket_width))
+        # [bucket index, consumed, produced], oldest first.
+        self._buckets: deque[list[float]] = deque()
+        self.consumed = 0.0
+        self.produced = 0.0
+
+    def add(self, timestamp: float, consumed: float, produced: float) -> None:
+        """Add energy deltas sampled at timestamp."""
+        index = int(timestamp // self._bucket_width)
+        self._expire(index)
+        if self._buckets and self._buckets[-1][0] == index:
+            bucket = self._buckets[-1]
+            bucket[1] += consumed
+            bucket[2] += produced
+        else:
+            self._buckets.append([index, consumed, produced])
+        self.consumed += consumed
+        self.produced += produced
+
+    def cop(self, timestamp: float) -> float | None:
+        """Return the produced to consumed energy ratio of the window."""
+        self._expire(int(timestamp // self._bucket_width))
+        if self.consumed < MIN_CONSUMED_ENERGY:
+            return None
+        return self.produced / self.consumed
+
+    def _expire(self, index: int) -> None:
+        """Drop the buckets that slid out of the window."""
+        oldest = index - self._bucket_count + 1
+        buckets = self._buckets
+        while buckets and buckets[0][0] < oldest:
+            _, consumed, produced = buckets.popleft()
+            self.consumed -= consumed
+            self.produced -= produced
+        if not buckets:
+            # Reset the running sums to avoid accumulating float drift.
+            self.consumed = 0.0
+            self.produced = 0.0
+
+
+class CopTracker:
+    """Rolling coefficient of performance per operation mode of a device."""
+
+    def __init__(self) -> None:
+        """Initialize the tracker without samples."""
+        self._last: dict[str, tuple[float, float]] = {}
+        self._windows: dict[tuple[str, str], RollingEnergyWindow] = {
+            (mode, window): RollingEnergyWindow(length, width)
+            for mode in MODE_COUNTERS
+            for window, (length, width) in WINDOWS.items()
+        }
+
+    def add_sample(self, device_props: Mapping[str, Any], timestamp: float) -> None:
+        """Accumulate the counter deltas since the previous sample.
+
+        The daily counters restart from zero at midnight. A counter lower than the
+        previous sample is treated as a reset and its whole value as the delta.
+        """
+        for mode, (consumed_key, produced_key) in MODE_COUNTERS.items():
+            consumed = device_props.get(consumed_key)
+            produced = device_props.get(produced_key)
+            if consumed is None or produced is None:
+                continue
+            last = self._last.get(mode)
+            self._last[mode] = (consumed, produced)
+            if last is None:
+                continue
+            consumed_delta = _counter_delta(last[0], consumed)
+            produced_delta = _counter_delta(last[1], produced)
+            if consumed_delta == 0 and produced_delta == 0:
+                continue
+            for window in WINDOWS:
+                self._windows[(mode, window)].add(
+                    timestamp, consumed_delta, produced_delta
+                )
+
+    def cop(self, mode: str, window: str, timestamp: float) -> float | None:
+        """Return the coefficient of performance of a mode over a window."""
+        return self._windows[(mode, window)].cop(timestamp)
+
+
+def _counter_delta(previous: float, current: float) -> float:
+    """Return the increase of a counter, handling resets."""
+    if current < previous:
+        return current
+    return current - previous
+
+
+DEFROST_STARTED = "started"
+DEFROST_ENDED = "ended"
+
+
+class DefrostTracker:
+    """Detect defrost cycles across polls and keep statistics about them.
+
+    MELCloud only moves the consumed energy counter every few hours, so its
+    increase during a cycle mostly covers the time before the cycle. When the
+    counter moves within a cycle, the cycle is credited its share of the increase
+    at the average power since the previous move. Cycles during which the counter
+    does not move have no energy. Durations are only as precise as the poll
+    interval.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the tracker outside of a defrost cycle."""
+        self.active = False
+        self.day: date | None = None
+        self.cycles_today = 0
+        self.energy_today = 0.0
+        self.last_duration: float | None = None
+        self.last_interval: float | None = None
+        self.last_energy: float | None = None
+        self._started_at: float | None = None
+        self._cycle_energy: float | None = None
+        self._last_counter: float | None = None
+        self._counter_moved_at: float | None = None
+
+    def add_sample(
+        self, timestamp: float, day: date, defrosting: bool, counter: float | None
+    ) -> str | None:
+        """Advance the state machine with a poll.
+
+        The counter is the consumed energy in kWh, None when unknown. Returns
+        DEFROST_STARTED or DEFROST_ENDED when the poll starts or ends a cycle.
+        """
+        if day != self.day:
+            self.day = day
+            self.cycles_today = 0
+            self.energy_today = 0.0
+
+        if counter is not None and counter != self._last_counter:
+            self._count_move(timestamp, counter)
+
+        if defrosting == self.active:
+            return None
+
+        self.active = defrosting
+        if defrosting:
+            if self._started_at is not None:
+                self.last_interval = timestamp - self._started_at
+            self._started_at = timestamp
+            self._cycle_energy = None
+            self.cycles_today += 1
+            return DEFROST_STARTED
+
+        self.last_duration = timestamp - self._started_at
+        self.last_energy = self._cycle_energy
+        if self._cycle_energy is not None:
+            self.energy_today += self._cycle_energy
+        return DEFROST_ENDED
+
+    def _count_move(self, timestamp: float, counter: float) -> None:
+        """Credit the active cycle its share of a counter increase."""
+        moved_at = self._counter_moved_at
+        if self.active and self._last_counter is not None and moved_at is not None:
+            covered = timestamp - moved_at
+            share = timestamp - max(moved_at, self._started_at)
+            if covered > 0:
+                delta = _counter_delta(self._last_counter, counter)
+                self._cycle_energy = (self._cycle_energy or 0.0) + (
+                    delta * share / covered
+                )
+        self._last_counter = counter
+        self._counter_moved_at = timestamp
@@ -0,0 +1,178 @@
+"""Columnar on-disk archive of polled MELCloud telemetry.
+
+Every device gets one directory per UTC day holding one file per column. A file
+is a plain array of native-endian float64 values, the rows of a day being
+aligned across the columns of the day. Missing values are stored as NaN.
+
+Rows are buffered in memory and appended in batches from the executor, the files
+can be memory-mapped for analysis with load_day.
+"""
+from __future__ import annotations
+
+from array import array
+import asyncio
+from collections.abc import Mapping
+from datetime import date, datetime, timedelta, timezone
+import logging
+import mmap
+import os
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+TIMESTAMP_COLUMN = "timestamp"
+
+# Device conf keys archived next to the poll timestamp.
+COLUMNS = (
+    "FlowTemperature",
+    "ReturnTemperature",
+    "TankWaterTemperature",
+    "OutdoorTemperature",
+    "HeatPumpFrequency",
+    "DemandPercentage",
+)
+
+FLUSH_ROWS = 60
+FLUSH_INTERVAL = timedelta(minutes=15)
+
+_NAN = float("nan")
+
+
+def _day_dir(base_dir: str, device_id: Any, day: date) -> str:
+    return os.path.join(base_dir, str(device_id), day.isoformat())
+
+
+def _write_rows(base_dir: str, device_id: Any, rows: list[tuple[float, ...]]) -> None:
+    """Append rows to the column files of their day."""
+    by_day: dict[date, list[tuple[float, ...]]] = {}
+    for row in rows:
+        day = datetime.fromtimestamp(row[0], timezone.utc).date()
+        by_day.setdefault(day, []).append(row)
+
+    for day, day_rows in by_day.items():
+        path = _day_dir(base_dir, device_id, day)
+        os.makedirs(path, exist_ok=True)
+        file_paths = [
+            os.path.join(path, f"{column}.f64")
+            for column in (TIMESTAMP_COLUMN, *COLUMNS)
+        ]
+        _realign_columns(file_paths)
+        for index, file_path in enumerate(file_paths):
+            values = array("d", (row[index] for row in day_rows))
+            with open(file_path, "ab") as file:
+                values.tofile(file)
+
+
+def _realign_columns(file_paths: list[str]) -> None:
+    """Truncate the columns of a day to their shortest complete length.
+
+    A write interrupted between two columns, by a crash or a full disk, leaves
+    columns of different lengths. The rows missing from some columns are dropped
+    before appending, so that the rows stay aligned.
+    """
+    sizes = [
+        os.path.getsize(file_path) if os.path.exists(file_path) else 0
+        for file_path in file_paths
+    ]
+    length = min(sizes) - min(sizes) % 8
+    for file_path, size in zip(file_paths, sizes):
+        if size > length:
+            os.truncate(file_path, length)
+
+
+def load_day(base_dir: str, device_id: Any, day: date) -> dict[str, memoryview]:
+    """Memory-map the columns of a device day as float64 views.
+
+    This does blocking I/O, run it in the executor. The views stay valid until
+    released.
+    """
+    path = _day_dir(base_dir, device_id, day)
+    mapped_columns: dict[str, mmap.mmap] = {}
+    views: dict[str, memoryview] = {}
+    try:
+        for column in (TIMESTAMP_COLUMN, *COLUMNS):
+            file_path = os.path.join(path, f"{column}.f64")
+            if not os.path.exists(file_path) or os.path.getsize(file_path) == 0:
+                continue
+            with open(file_path, "rb") as file:
+                mapped_columns[column] = mmap.mmap(
+                    file.fileno(), 0, access=mmap.ACCESS_READ
+                )
+        if len(mapped_columns) != len(COLUMNS) + 1:
+            # Without every column there is no complete row.
+            return views
+        # Ignore the rows missing from some columns and a partially written value.
+        usable = min(len(mapped) for mapped in mapped_columns.values())
+        usable -= usable % 8
+        views = {
+            column: memoryview(mapped)[:usable].cast("d")
+            for column, mapped in mapped_columns.items()
+        }
+        return views
+    finally:
+        if not views:
+            # The maps are only kept alive by the returned views.
+            for mapped in mapped_columns.values():
+                mapped.close()
+
+
+class TelemetryArchive:
+    """Buffered writer of the telemetry archive of a config entry."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the archive under the configuration directory."""
+        self._hass = hass
+        self.base_dir = hass.config.path(DOMAIN, "archive")
+        self._buffers: dict[Any, list[tuple[float, ...]]] = {}
+        # Serializes the writes, keeping the columns of a day aligned.
+        self._write_lock = asyncio.Lock()
+        self._unsub_timer = None
+
+    @callback
+    def async_start(self) -> None:
+        """Flush the buffers periodically."""
+        self._unsub_timer = async_track_time_interval(
+            self._hass, self._async_flush_all, FLUSH_INTERVAL
+        )
+
+    async def async_stop(self) -> None:
+        """Stop the periodic flush and write the buffered rows."""
+        if self._unsub_timer is not None:
+            self._unsub_timer()
+            self._unsub_timer = None
+        await self._async_flush_all()
+
+    @callback
+    def async_append(
+        self, device_id: Any, timestamp: float, device_props: Mapping[str, Any]
+    ) -> None:
+        """Buffer a row, writing the buffer of the device once it is full."""
+        row = (timestamp,) + tuple(
+            float(value) if isinstance(value, (int, float)) else _NAN
+            for value in (device_props.get(column) for column in COLUMNS)
+        )
+        buffer = self._buffers.setdefault(device_id, [])
+        buffer.append(row)
+        if len(buffer) >= FLUSH_ROWS:
+            self._hass.async_create_task(self._async_flush(device_id))
+
+    async def _async_flush_all(self, *_: Any) -> None:
+        for device_id in list(self._buffers):
+            await self._async_flush(device_id)
+
+    async def _async_flush(self, device_id: Any) -> None:
+        rows = self._buffers.pop(device_id, None)
+        if not rows:
+            return
+        try:
+            async with self._write_lock:
+                await self._hass.async_add_executor_job(
+                    _write_rows, self.base_dir, device_id, rows
+                )
+        except OSError as ex:
+            _LOGGER.warning("Failed to archive telemetry of %s: %s", device_id, ex)
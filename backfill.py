@@ -0,0 +1,260 @@
+"""Backfill MELCloud energy reports into Home Assistant long-term statistics.
+
+The regular polling only fetches a couple of days of energy report. Days missed
+while Home Assistant was offline are fetched here in large chunks and imported as
+external statistics, resuming from a checkpoint stored per device.
+"""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+from datetime import date, datetime, timedelta
+import logging
+import time
+from typing import TYPE_CHECKING, Any
+
+from aiohttp import ClientConnectionError, ClientResponseError
+
+from homeassistant.const import UnitOfEnergy
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+
+if TYPE_CHECKING:
+    from . import MelCloudDevice
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+
+# Days fetched on the first run and per EnergyCost/Report request.
+MAX_HISTORY = timedelta(days=365)
+CHUNK_SIZE = timedelta(days=31)
+# Wait before retrying a device after a failed run.
+RETRY_DELAY = 3600
+
+# Energy report arrays of consumed energy, one bucket per day or hour.
+REPORT_MODES = ("Heating", "Cooling", "Auto", "Dry", "Fan", "Other", "HotWater")
+
+
+def statistic_id(mel_device: MelCloudDevice) -> str:
+    """Return the external statistic id of the consumed energy of a device."""
+    return f"{DOMAIN}:device_{mel_device.device_id}_energy_consumed"
+
+
+def _day_starts(start: date, days: int) -> list[datetime]:
+    """Return the local midnights of the days from start."""
+    return [
+        dt_util.start_of_local_day(start + timedelta(days=index))
+        for index in range(days)
+    ]
+
+
+def _hour_starts(start: date, days: int) -> list[datetime]:
+    """Return the hours of the days from start.
+
+    The hours are stepped in UTC, days changing the clocks having 23 or 25 of
+    them.
+    """
+    hour = dt_util.as_utc(dt_util.start_of_local_day(start))
+    end = dt_util.as_utc(dt_util.start_of_local_day(start + timedelta(days=days)))
+    starts = []
+    while hour < end:
+        starts.append(hour)
+        hour += timedelta(hours=1)
+    return starts
+
+
+def _match_labels(
+    labels: list[Any], candidates: list[datetime], key: Callable[[datetime], int]
+) -> list[datetime] | None:
+    """Match labels in order to the first following candidate with that key."""
+    remaining = iter(candidates)
+    starts = []
+    for label in labels:
+        for candidate in remaining:
+            if key(candidate) == label:
+                starts.append(candidate)
+                break
+        else:
+            return None
+    return starts
+
+
+def _bucket_starts(
+    report: dict[str, Any], length: int, start: date, days: int
+) -> list[datetime] | None:
+    """Return the start of each bucket of a report, None if they cannot be told.
+
+    MELCloud labels daily buckets with their day of month and hourly buckets with
+    their local hour, and leaves out the buckets without data. Reports without
+    labels are assumed complete, the bucket width is inferred from their length.
+    """
+    labels = report.get("Labels")
+    if not labels:
+        if length >= days * 24:
+            return _hour_starts(start, days)
+        if length >= days:
+            return _day_starts(start, days)
+        return None
+    try:
+        labels = [int(label) for label in labels]
+    except (TypeError, ValueError):
+        return None
+    if length > len(labels):
+        return None
+
+    if len(labels) <= days:
+        starts = _match_labels(labels, _day_starts(start, days), lambda day: day.day)
+        if starts is not None:
+            return starts
+    return _match_labels(
+        labels, _hour_starts(start, days), lambda hour: dt_util.as_local(hour).hour
+    )
+
+
+def _report_buckets(
+    report: dict[str, Any], start: date, days: int
+) -> list[tuple[datetime, float]] | None:
+    """Return the consumed energy buckets of a report starting at start.
+
+    Reports whose buckets cannot be aligned to the requested days are skipped.
+    """
+    length = max((len(report.get(mode) or ()) for mode in REPORT_MODES), default=0)
+    if length == 0:
+        return []
+    starts = _bucket_starts(report, length, start, days)
+    if starts is None:
+        return None
+
+    buckets: list[tuple[datetime, float]] = []
+    for index, bucket_start in enumerate(starts):
+        value = 0.0
+        for mode in REPORT_MODES:
+            values = report.get(mode) or ()
+            if index < len(values) and values[index]:
+                value += values[index]
+        buckets.append((bucket_start, value))
+    return buckets
+
+
+class EnergyBackfill:
+    """Resumable import of energy history for the devices of a config entry."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the backfill without loading the checkpoints."""
+        self._hass = hass
+        self._store: Store = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.energy_backfill"
+        )
+        # Per device id: last imported day and running sum of the statistic.
+        self._checkpoints: dict[str, dict[str, Any]] = {}
+        self._tasks: dict[str, asyncio.Task] = {}
+        self._failed_at: dict[str, float] = {}
+
+    async def async_load(self) -> None:
+        """Load the stored checkpoints."""
+        self._checkpoints = await self._store.async_load() or {}
+
+    @callback
+    def async_schedule(self, mel_device: MelCloudDevice) -> None:
+        """Start a backfill of the device if complete days are missing."""
+        key = str(mel_device.device_id)
+        if key in self._tasks or "recorder" not in self._hass.config.components:
+            return
+        failed_at = self._failed_at.get(key)
+        if failed_at is not None and time.monotonic() - failed_at < RETRY_DELAY:
+            return
+        if self._first_missing_day(key) > self._last_complete_day():
+            return
+
+        task = self._hass.async_create_task(self._async_backfill(mel_device))
+        self._tasks[key] = task
+        task.add_done_callback(lambda _: self._tasks.pop(key, None))
+
+    async def async_cancel(self) -> None:
+        """Cancel the running backfills."""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _last_complete_day(self) -> date:
+        return dt_util.now().date() - timedelta(days=1)
+
+    def _first_missing_day(self, key: str) -> date:
+        checkpoint = self._checkpoints.get(key)
+        if checkpoint is None:
+            return dt_util.now().date() - MAX_HISTORY
+        return date.fromisoformat(checkpoint["date"]) + timedelta(days=1)
+
+    async def _async_backfill(self, mel_device: MelCloudDevice) -> None:
+        """Import the missing days of a device chunk by chunk."""
+        # Imported lazily, the recorder is an optional dependency.
+        # pylint: disable-next=import-outside-toplevel
+        from homeassistant.components.recorder.models import (
+            StatisticData,
+            StatisticMetaData,
+        )
+
+        # pylint: disable-next=import-outside-toplevel
+        from homeassistant.components.recorder.statistics import (
+            async_add_external_statistics,
+        )
+
+        key = str(mel_device.device_id)
+        metadata = StatisticMetaData(
+            has_mean=False,
+            has_sum=True,
+            name=f"{mel_device.name} Energy Consumed",
+            source=DOMAIN,
+            statistic_id=statistic_id(mel_device),
+            unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        )
+        start = self._first_missing_day(key)
+        end = self._last_complete_day()
+        total = self._checkpoints.get(key, {}).get("sum", 0.0)
+
+        while start <= end:
+            chunk_end = min(start + CHUNK_SIZE - timedelta(days=1), end)
+            days = (chunk_end - start).days + 1
+            try:
+                report = await mel_device.client.fetch_energy_report(
+                    mel_device.device, start, chunk_end
+                )
+            except (ClientConnectionError, ClientResponseError) as ex:
+                _LOGGER.warning(
+                    "Energy backfill of %s failed at %s: %s", mel_device.name, start, ex
+                )
+                self._failed_at[key] = time.monotonic()
+                return
+
+            buckets = _report_buckets(report or {}, start, days)
+            if buckets is None:
+                # Keep the checkpoint before the chunk, it is retried later.
+                _LOGGER.warning(
+                    "Energy report of %s from %s has an unexpected layout, "
+                    "retrying later",
+                    mel_device.name,
+                    start,
+                )
+                self._failed_at[key] = time.monotonic()
+                return
+
+            statistics = []
+            for bucket_start, value in buckets:
+                total += value
+                statistics.append(
+                    StatisticData(start=bucket_start, state=value, sum=total)
+                )
+            if statistics:
+                async_add_external_statistics(self._hass, metadata, statistics)
+
+            self._checkpoints[key] = {"date": chunk_end.isoformat(), "sum": total}
+            await self._store.async_save(self._checkpoints)
+            start = chunk_end + timedelta(days=1)
+
+        self._failed_at.pop(key, None)
+        _LOGGER.debug("Energy backfill of %s is up to date", mel_device.name)
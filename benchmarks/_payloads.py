@@ -0,0 +1,154 @@
+"""Synthetic MELCloud payloads shared by the benchmarks.
+
+Importing this module makes the bundled library importable as pymelcloud.
+"""
+from pathlib import Path
+import random
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+
+def atw_device_props(rng: random.Random) -> dict:
+    """Return the Device dict of an Air-to-Water device conf."""
+    props = {
+        "DeviceType": 1,
+        "CanHeat": True,
+        "CanCool": False,
+        "HasHotWaterTank": True,
+        "HasZone2": True,
+        "HasThermostatZone1": True,
+        "HasThermostatZone2": True,
+        "HasEnergyConsumedMeter": True,
+        "TemperatureIncrement": 0.5,
+        "FlowTemperature": rng.uniform(25, 45),
+        "ReturnTemperature": rng.uniform(20, 40),
+        "TankWaterTemperature": rng.uniform(40, 55),
+        "OutdoorTemperature": rng.uniform(-10, 15),
+        "HeatPumpFrequency": rng.randrange(0, 120),
+        "DemandPercentage": rng.randrange(0, 100),
+        "WifiSignalStrength": rng.randrange(-90, -40),
+        "RoomTemperatureZone1": rng.uniform(18, 23),
+        "RoomTemperatureZone2": rng.uniform(18, 23),
+        "DailyHeatingEnergyConsumed": rng.uniform(0, 30),
+        "DailyHeatingEnergyProduced": rng.uniform(0, 90),
+        "DailyHotWaterEnergyConsumed": rng.uniform(0, 10),
+        "DailyHotWaterEnergyProduced": rng.uniform(0, 25),
+        "CurrentEnergyConsumed": rng.randrange(0, 5000),
+        "MaxTankTemperature": 60,
+        "OperationMode": 2,
+    }
+    # The real Device dict carries well over a hundred keys, mostly unused.
+    props.update({f"Unused{index}": rng.random() for index in range(120)})
+    return props
+
+
+def device_conf(device_id: int, building_id: int, rng: random.Random) -> dict:
+    """Return the conf of a device as listed by ListDevices."""
+    return {
+        "DeviceID": device_id,
+        "DeviceName": f"Heat pump {device_id}",
+        "BuildingID": building_id,
+        "MacAddress": f"aa:bb:cc:{device_id >> 16 & 255:02x}:"
+        f"{device_id >> 8 & 255:02x}:{device_id & 255:02x}",
+        "SerialNumber": str(2800000000 + device_id),
+        "AccessLevel": 4,
+        "Type": 1,
+        "Zone1Name": "Ground floor",
+        "Zone2Name": "First floor",
+        "Device": atw_device_props(rng),
+    }
+
+
+def atw_state(device_id: int, rng: random.Random) -> dict:
+    """Return the Device/Get state of an Air-to-Water device."""
+    return {
+        "DeviceID": device_id,
+        "EffectiveFlags": 0,
+        "Power": True,
+        "OperationMode": 2,
+        "OperationModeZone1": 0,
+        "OperationModeZone2": 1,
+        "SetTemperatureZone1": 21.0,
+        "SetTemperatureZone2": 20.5,
+        "SetHeatFlowTemperatureZone1": 35.0,
+        "SetHeatFlowTemperatureZone2": 32.0,
+        "SetCoolFlowTemperatureZone1": 18.0,
+        "SetCoolFlowTemperatureZone2": 18.0,
+        "RoomTemperatureZone1": rng.uniform(18, 23),
+        "RoomTemperatureZone2": rng.uniform(18, 23),
+        "IdleZone1": False,
+        "IdleZone2": True,
+        "ProhibitZone1": False,
+        "ProhibitZone2": False,
+        "TankWaterTemperature": rng.uniform(40, 55),
+        "SetTankWaterTemperature": 50.0,
+        "ForcedHotWaterMode": False,
+        "OutdoorTemperature": rng.uniform(-10, 15),
+        "LastCommunication": "2026-10-19T12:00:00.123",
+        "NextCommunication": "2026-10-19T12:01:00.123",
+        "HasPendingCommand": False,
+        "Offline": False,
+    }
+
+
+REPORT_MODES = ("Heating", "Cooling", "Auto", "Dry", "Fan", "Other", "HotWater")
+
+
+def energy_report(rng: random.Random, days: int = 5) -> dict:
+    """Return an EnergyCost/Report response with hourly buckets."""
+    report = {
+        mode: [rng.uniform(0, 2) for _ in range(days * 24)] for mode in REPORT_MODES
+    }
+    report.update(
+        {f"Total{mode}Consumed": rng.uniform(0, 50) for mode in REPORT_MODES}
+    )
+    report.update({"CO2": rng.uniform(0, 10), "Cost": rng.uniform(0, 10)})
+    return report
+
+
+def device_units(rng: random.Random) -> list:
+    """Return the Device/ListDeviceUnits response of a device."""
+    return [
+        {
+            "ID": unit,
+            "Model": model,
+            "ModelNumber": rng.randrange(1000),
+            "SerialNumber": f"{rng.randrange(10**7):07d}",
+            "Description": "x" * 40,
+            "IsIndoor": unit == 0,
+        }
+        for unit, model in enumerate(("EHST20D-VM2D", "PUZ-WM85VAA"))
+    ]
+
+
+def list_devices(device_count: int, seed: int = 0) -> list:
+    """Return a ListDevices response spreading the devices over buildings."""
+    rng = random.Random(seed)
+    buildings = []
+    for building_index in range(max(1, device_count // 10)):
+        building_id = 1000 + building_index
+        buildings.append(
+            {
+                "ID": building_id,
+                "Name": f"Building {building_index}",
+                "Structure": {
+                    "Devices": [],
+                    "Areas": [],
+                    "Floors": [
+                        {
+                            "ID": building_id * 10,
+                            "Name": "Floor",
+                            "Devices": [],
+                            "Areas": [],
+                        }
+                    ],
+                },
+            }
+        )
+    for device_index in range(device_count):
+        building = buildings[device_index % len(buildings)]
+        building["Structure"]["Floors"][0]["Devices"].append(
+            device_conf(device_index + 1, building["ID"], rng)
+        )
+    return buildings
@@ -0,0 +1,85 @@
+"""Property-read cost per coordinator tick, before and after the bound accessors.
+
+Before, every device conf read walked _device_conf.get("Device", {}) and every
+zone read formatted its key. The before side replays those reads inline, the
+after side goes through the library. Run with: python benchmarks/bench_accessors.py
+"""
+import random
+from timeit import repeat
+from types import SimpleNamespace
+
+import _payloads  # noqa: F401
+from pymelcloud.atw_device import AtwDevice
+from pymelcloud.snapshot import PayloadSnapshot
+
+DEVICES = 100
+
+# Device conf keys read by the sensors on every tick.
+CONF_KEYS = (
+    "FlowTemperature",
+    "ReturnTemperature",
+    "TankWaterTemperature",
+    "OutdoorTemperature",
+    "HeatPumpFrequency",
+    "DemandPercentage",
+    "WifiSignalStrength",
+    "RoomTemperatureZone1",
+    "RoomTemperatureZone2",
+    "DailyHeatingEnergyConsumed",
+    "DailyHeatingEnergyProduced",
+    "DailyHotWaterEnergyConsumed",
+    "DailyHotWaterEnergyProduced",
+    "CurrentEnergyConsumed",
+    "HasZone2",
+)
+
+
+def _devices():
+    rng = random.Random(0)
+    client = SimpleNamespace(account=None)
+    devices = []
+    for device_id in range(1, DEVICES + 1):
+        device = AtwDevice(_payloads.device_conf(device_id, 1, rng), client)
+        device._state = PayloadSnapshot(_payloads.atw_state(device_id, rng))
+        devices.append(device)
+    return devices
+
+
+def tick_before(devices):
+    """Replay the reads of a tick the way the library did them before."""
+    for device in devices:
+        conf = device._device_conf
+        state = device._state
+        for key in CONF_KEYS:
+            conf.get("Device", {}).get(key)
+        for index in (1, 2):
+            conf.get(f"Zone{index}Name")
+            state.get(f"ProhibitZone{index}")
+            state.get(f"RoomTemperatureZone{index}")
+            state.get(f"SetTemperatureZone{index}")
+            state.get(f"SetHeatFlowTemperatureZone{index}")
+
+
+def tick_after(devices):
+    """Do the reads of a tick through the bound accessors."""
+    for device in devices:
+        for key in CONF_KEYS:
+            device.get_device_prop(key)
+        for zone in device.zones:
+            zone.name
+            zone.prohibit
+            zone.room_temperature
+            zone.target_temperature
+            zone.target_heat_flow_temperature
+
+
+def main():
+    devices = _devices()
+    assert len(devices[0].zones) == 2
+    for name, tick in (("before", tick_before), ("after", tick_after)):
+        best = min(repeat(lambda: tick(devices), number=200, repeat=5)) / 200
+        print(f"{name:>6}: {best * 1e6:8.1f} us per tick of {DEVICES} devices")
+
+
+if __name__ == "__main__":
+    main()
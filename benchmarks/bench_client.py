@@ -0,0 +1,119 @@
+"""Request header cost and connections opened by a poll loop of 100 devices.
+
+The header part compares the headers dict the client built for every request,
+which aiohttp converts to a CIMultiDict, with the prebuilt read-only headers.
+
+The connection part polls every device of a local MELCloud stand-in for a few
+ticks, all devices at once as the coordinators do after setup. It compares a
+default ClientSession, whose connections idle out after 15 s, with the session
+created by dedicated_session. The ticks are further apart than 15 s by default,
+so the run takes a minute or two. Run with:
+python benchmarks/bench_client.py [tick interval in seconds]
+"""
+import asyncio
+import json
+import random
+import sys
+from timeit import repeat
+
+from aiohttp import ClientSession, web
+
+import _payloads
+from pymelcloud import DEVICE_TYPE_ATW, client, get_devices
+
+DEVICES = 100
+TICKS = 3
+TICK_INTERVAL = 20.0
+TOKEN = "0123456789abcdef0123456789abcdef"
+
+
+async def bench_headers():
+    """Print the header cost of a request, from building them to aiohttp's merge."""
+    session = ClientSession()
+    frozen = client._frozen_headers(TOKEN)
+    cases = (
+        ("dict", lambda: session._prepare_headers(client._headers(TOKEN))),
+        ("frozen", lambda: session._prepare_headers(frozen)),
+    )
+    for name, prepare in cases:
+        best = min(repeat(prepare, number=20000, repeat=5)) / 20000
+        print(f"{name:>8}: {best * 1e6:6.2f} us of header handling per request")
+    await session.close()
+
+
+def _server_app(peers: set) -> web.Application:
+    rng = random.Random(0)
+    list_devices = json.dumps(_payloads.list_devices(DEVICES)).encode()
+    states = {
+        device_id: json.dumps(_payloads.atw_state(device_id, rng)).encode()
+        for device_id in range(1, DEVICES + 1)
+    }
+    report = json.dumps(_payloads.energy_report(rng)).encode()
+    units = json.dumps(_payloads.device_units(rng)).encode()
+
+    @web.middleware
+    async def count_peers(request, handler):
+        peers.add(request.transport.get_extra_info("peername"))
+        return await handler(request)
+
+    def body(payload):
+        async def handler(request):
+            return web.Response(body=payload, content_type="application/json")
+
+        return handler
+
+    async def device_state(request):
+        return web.Response(
+            body=states[int(request.query["id"])], content_type="application/json"
+        )
+
+    app = web.Application(middlewares=[count_peers])
+    app.router.add_get("/User/ListDevices", body(list_devices))
+    app.router.add_get("/User/GetUserDetails", body(b"{}"))
+    app.router.add_get("/Device/Get", device_state)
+    app.router.add_post("/EnergyCost/Report", body(report))
+    app.router.add_post("/Device/ListDeviceUnits", body(units))
+    return app
+
+
+async def _poll(session: ClientSession, dedicated_session: bool, interval: float):
+    peers: set = set()
+    runner = web.AppRunner(_server_app(peers))
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    host, port = runner.addresses[0][:2]
+    client.BASE_URL = f"http://{host}:{port}"
+
+    devices = await get_devices(TOKEN, session, dedicated_session=dedicated_session)
+    devices = devices[DEVICE_TYPE_ATW]
+    assert len(devices) == DEVICES
+    opened = []
+    for tick in range(TICKS):
+        if tick:
+            await asyncio.sleep(interval)
+        await asyncio.gather(*(device.update() for device in devices))
+        opened.append(len(peers))
+
+    await devices[0]._client.close()
+    await runner.cleanup()
+    return opened
+
+
+async def bench_connections(interval: float):
+    """Print the connections opened after each tick of the poll loop."""
+    for name, dedicated_session in (("default", False), ("dedicated", True)):
+        async with ClientSession() as session:
+            opened = await _poll(session, dedicated_session, interval)
+        ticks = ", ".join(str(count) for count in opened)
+        print(f"{name:>9}: {ticks} connections opened after each tick")
+
+
+def main():
+    interval = float(sys.argv[1]) if len(sys.argv) > 1 else TICK_INTERVAL
+    asyncio.run(bench_headers())
+    asyncio.run(bench_connections(interval))
+
+
+if __name__ == "__main__":
+    main()
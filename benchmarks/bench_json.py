@@ -0,0 +1,42 @@
+"""JSON decoding and encoding cost of the MELCloud bodies, before and after the codec.
+
+Before, aiohttp decoded every response body to str and handed it to json.loads,
+and encoded request bodies with json.dumps before turning them into bytes. After,
+the client decodes the bytes with json_loads and encodes with json_dumps, which
+use orjson when it is installed. Run with: python benchmarks/bench_json.py
+"""
+import json
+import random
+from timeit import repeat
+
+import _payloads
+from pymelcloud import client
+
+DEVICES = 100
+
+
+def _best(func, number):
+    return min(repeat(func, number=number, repeat=5)) / number
+
+
+def main():
+    print(f"orjson installed: {client.orjson is not None}")
+    body = json.dumps(_payloads.list_devices(DEVICES)).encode()
+    print(f"ListDevices of {DEVICES} devices: {len(body) / 1024:.0f} KiB")
+    for name, loads in (
+        ("str", lambda: json.loads(body.decode("utf-8"))),
+        ("bytes", lambda: json.loads(body)),
+        ("codec", lambda: client.json_loads(body)),
+    ):
+        print(f"{name:>6}: {_best(loads, 20) * 1e3:7.2f} ms to decode")
+
+    state = _payloads.atw_state(1, random.Random(0))
+    for name, dumps in (
+        ("str", lambda: json.dumps(state).encode("utf-8")),
+        ("codec", lambda: client.json_dumps(state)),
+    ):
+        print(f"{name:>6}: {_best(dumps, 20000) * 1e6:7.2f} us to encode a state")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Memory kept per device for its payloads, raw versus snapshots.
+
+Run with: python benchmarks/bench_memory.py
+"""
+import json
+import random
+import tracemalloc
+
+import _payloads
+from pymelcloud.snapshot import EnergyReportSnapshot, PayloadSnapshot, decode_units
+
+DEVICES = 200
+
+
+def _bodies():
+    rng = random.Random(0)
+    return [
+        (
+            json.dumps(_payloads.energy_report(rng)).encode(),
+            json.dumps(_payloads.device_units(rng)).encode(),
+            json.dumps(_payloads.device_conf(index, 1, rng)).encode(),
+            json.dumps(_payloads.atw_state(index, rng)).encode(),
+        )
+        for index in range(DEVICES)
+    ]
+
+
+def _measure(keep) -> float:
+    """Return the bytes per device retained by keep."""
+    bodies = _bodies()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = [keep(*body) for body in bodies]
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del kept
+    return retained / DEVICES
+
+
+def raw(report, units, conf, state):
+    return json.loads(report), json.loads(units)
+
+
+def snapshots(report, units, conf, state):
+    return EnergyReportSnapshot(json.loads(report)), decode_units(json.loads(units))
+
+
+def state_raw(report, units, conf, state):
+    return json.loads(state)
+
+
+def state_snapshot(report, units, conf, state):
+    return PayloadSnapshot(json.loads(state))
+
+
+def conf_raw(report, units, conf, state):
+    return json.loads(conf)
+
+
+def conf_snapshot(report, units, conf, state):
+    conf = json.loads(conf)
+    conf["Device"] = PayloadSnapshot(conf["Device"])
+    return conf
+
+
+def main():
+    for name, keep in (
+        ("energy report and units, raw", raw),
+        ("energy report and units, snapshots", snapshots),
+        ("state, raw", state_raw),
+        ("state, snapshot", state_snapshot),
+        ("conf, raw", conf_raw),
+        ("conf, snapshot", conf_snapshot),
+    ):
+        print(f"{name:>34}: {_measure(keep) / 1024:6.1f} KiB per device")
+
+
+if __name__ == "__main__":
+    main()
@@ -12,9 +12,8 @@ from homeassistant.components.binary_sensor import (
     BinarySensorEntity,
     BinarySensorEntityDescription,
 )
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from . import MelCloudDevice
+from . import MelCloudDevice, MelCloudEntity
 from .const import DOMAIN, MEL_DEVICES
 
 
@@ -32,6 +31,8 @@ class MelcloudBinarySensorEntityDescription(
 ):
     """Describes Melcloud binary sensor entity."""
 
+    source_keys: frozenset[str] | None = None
+
 
 ATA_BINARY_SENSORS: tuple[MelcloudBinarySensorEntityDescription, ...] = (
     MelcloudBinarySensorEntityDescription(
@@ -39,6 +40,7 @@ ATA_BINARY_SENSORS: tuple[MelcloudBinarySensorEntityDescription, ...] = (
         name="Error State",
         device_class=BinarySensorDeviceClass.PROBLEM,
         value_fn=lambda x: x.error_state,
+        source_keys=frozenset({"HasError"}),
         enabled=lambda x: True,
     ),
 )
@@ -63,7 +65,7 @@ async def async_setup_entry(hass, entry, async_add_entities):
     async_add_entities(entities, False)
 
 
-class MelDeviceBinarySensor(CoordinatorEntity, BinarySensorEntity):
+class MelDeviceBinarySensor(MelCloudEntity, BinarySensorEntity):
     """Representation of a Binary Sensor."""
 
     entity_description: MelcloudBinarySensorEntityDescription
@@ -77,6 +79,7 @@ class MelDeviceBinarySensor(CoordinatorEntity, BinarySensorEntity):
         super().__init__(api.coordinator)
         self._api = api
         self.entity_description = description
+        self._source_keys = description.source_keys
 
         self._attr_name = f"{api.name} {description.name}"
         self._attr_unique_id = f"{api.device.serial}-{api.device.mac}-{description.key}"
@@ -90,8 +93,3 @@ class MelDeviceBinarySensor(CoordinatorEntity, BinarySensorEntity):
     def device_info(self):
         """Return a device description for device registry."""
         return self._api.device_info
-
-    @property
-    def extra_state_attributes(self):
-        """Return the optional state attributes."""
-        return self._api.extra_attributes
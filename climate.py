@@ -134,6 +134,9 @@ class MelCloudClimate(CoordinatorEntity, ClimateEntity):
 class AtaDeviceClimate(MelCloudClimate):
     """Air-to-Air climate device."""
 
+    # The swing mode, which is recorded, follows the vane last set.
+    _unrecorded_attributes = frozenset({ATTR_VANE_HORIZONTAL, ATTR_VANE_VERTICAL})
+
     def __init__(self, device: MelCloudDevice, ata_device: AtaDevice):
         """Initialize the climate."""
         super().__init__(device)
@@ -335,6 +338,7 @@ class AtwDeviceZoneClimate(MelCloudClimate):
     _attr_max_temp = 30
     _attr_min_temp = 10
     _attr_supported_features = ClimateEntityFeature.TARGET_TEMPERATURE
+    # The zone status stays recorded, no other entity exposes it.
 
     def __init__(self, device: MelCloudDevice, atw_device: AtwDevice, atw_zone: Zone):
         """Initialize the climate."""
@@ -1,20 +1,33 @@
 """Config flow for the MELCloud platform."""
 import asyncio
+from collections.abc import Mapping
 from http import HTTPStatus
 import logging
+from typing import Any
 
 from aiohttp import ClientError, ClientResponseError
 from async_timeout import timeout
-# from .src.pymelcloud import *
-import pymelcloud
+import voluptuous as vol
 
 from homeassistant import config_entries
-from homeassistant.const import CONF_PASSWORD, CONF_TOKEN, CONF_USERNAME
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
 from homeassistant.core import callback
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
-from . import MELCLOUD_SCHEMA, MelCloudAuthentication
-from .const import CONF_LANGUAGE, DOMAIN, LANGUAGES  # pylint: disable=unused-import
+from . import (
+    MELCLOUD_SCHEMA,
+    MelCloudAuthentication,
+    async_cache_login_data,
+    token_entry_data,
+)
+from .const import (  # pylint: disable=unused-import
+    CONF_LANGUAGE,
+    CONF_TELEMETRY_ARCHIVE,
+    DOMAIN,
+    LANGUAGES,
+)
+
+# Language of the entries created before the language was stored.
+DEFAULT_LANGUAGE = "EN"
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -25,17 +38,29 @@ class FlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
     VERSION = 1
     CONNECTION_CLASS = config_entries.CONN_CLASS_CLOUD_POLL
 
-    async def _create_entry(self, username: str, token: str):
+    _reauth_entry: config_entries.ConfigEntry | None = None
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry):
+        """Get the options flow for this handler."""
+        return OptionsFlowHandler(config_entry)
+
+    async def _create_entry(self, username: str, data: dict):
         """Register new entry."""
         await self.async_set_unique_id(username)
-        self._abort_if_unique_id_configured({CONF_TOKEN: token})
+        self._abort_if_unique_id_configured(data)
         return self.async_create_entry(
             title=username,
-            data={CONF_TOKEN: token},
+            data=data,
         )
 
     async def _create_client(self, user_input):
-        """Create client."""
+        """Validate the credentials and create the entry.
+
+        The login response is enough to validate the credentials. Its LoginData is
+        handed over to the entry setup, which then only has to list the devices.
+        """
         username = user_input[CONF_USERNAME]
         password = user_input[CONF_PASSWORD]
         language = user_input[CONF_LANGUAGE]
@@ -47,13 +72,9 @@ class FlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
 
         try:
             async with timeout(10):
-                token = await self._test_authorization(username, password, language)
-                if not token:
+                mcauth = await self._test_authorization(username, password, language)
+                if mcauth is None:
                     return self._show_form({"base": "invalid_auth"})
-                await pymelcloud.get_devices(
-                    token,
-                    async_get_clientsession(self.hass),
-                )
 
         except ClientResponseError as err:
             if err.status in (HTTPStatus.UNAUTHORIZED, HTTPStatus.FORBIDDEN):
@@ -62,12 +83,17 @@ class FlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
         except (asyncio.TimeoutError, ClientError):
             return self._show_form({"base": "cannot_connect"})
 
-        return await self._create_entry(username, token)
+        result = await self._create_entry(
+            username, token_entry_data(mcauth, username, language)
+        )
+        # Only cache once the entry is created, an aborted flow sets nothing up.
+        async_cache_login_data(self.hass, username, mcauth.login_data)
+        return result
 
     async def _test_authorization(self, username, password, language):
         mcauth = MelCloudAuthentication(username, password, LANGUAGES[language])
         if await mcauth.login(self.hass):
-            return mcauth.auth_token
+            return mcauth
         return None
 
     async def async_step_user(self, user_input=None):
@@ -85,6 +111,59 @@ class FlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
                 return self.async_abort(reason="already_imported")
         return await self._create_client(import_config)
 
+    async def async_step_reauth(self, entry_data: Mapping[str, Any]):
+        """Ask for the password again when the token expires or is rejected."""
+        self._reauth_entry = self.hass.config_entries.async_get_entry(
+            self.context["entry_id"]
+        )
+        return await self.async_step_reauth_confirm()
+
+    async def async_step_reauth_confirm(self, user_input=None):
+        """Log in with the new password and store the new token.
+
+        Entries created by older versions only hold the token. Their account is
+        the unique id of the entry and their language is asked again.
+        """
+        entry = self._reauth_entry
+        username = entry.data.get(CONF_USERNAME) or entry.unique_id or entry.title
+        errors = {}
+        if user_input is not None:
+            language = user_input[CONF_LANGUAGE]
+            try:
+                async with timeout(10):
+                    mcauth = await self._test_authorization(
+                        username, user_input[CONF_PASSWORD], language
+                    )
+            except ClientResponseError as err:
+                if err.status in (HTTPStatus.UNAUTHORIZED, HTTPStatus.FORBIDDEN):
+                    errors["base"] = "invalid_auth"
+                else:
+                    errors["base"] = "cannot_connect"
+            except (asyncio.TimeoutError, ClientError):
+                errors["base"] = "cannot_connect"
+            else:
+                if mcauth is None:
+                    errors["base"] = "invalid_auth"
+                else:
+                    return self.async_update_reload_and_abort(
+                        entry, data=token_entry_data(mcauth, username, language)
+                    )
+
+        return self.async_show_form(
+            step_id="reauth_confirm",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(CONF_PASSWORD): str,
+                    vol.Required(
+                        CONF_LANGUAGE,
+                        default=entry.data.get(CONF_LANGUAGE, DEFAULT_LANGUAGE),
+                    ): vol.In(LANGUAGES.keys()),
+                }
+            ),
+            description_placeholders={CONF_USERNAME: username},
+            errors=errors,
+        )
+
     @callback
     def _show_form(self, errors=None):
         """Show the form to the user."""
@@ -94,3 +173,28 @@ class FlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
             data_schema=MELCLOUD_SCHEMA,
             errors=errors if errors else {},
         )
+
+
+class OptionsFlowHandler(config_entries.OptionsFlow):
+    """Handle MELCloud options."""
+
+    def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
+        """Initialize the options flow."""
+        self._entry = config_entry
+
+    async def async_step_init(self, user_input=None):
+        """Manage the options."""
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Optional(
+                        CONF_TELEMETRY_ARCHIVE,
+                        default=self._entry.options.get(CONF_TELEMETRY_ARCHIVE, False),
+                    ): bool,
+                }
+            ),
+        )
@@ -2,8 +2,17 @@
 
 DOMAIN = "melcloud_custom"
 MEL_DEVICES = "mel_devices"
+ENERGY_BACKFILL = "energy_backfill"
+TELEMETRY_ARCHIVE = "telemetry_archive"
+HISTOGRAM_STORE = "histogram_store"
+TOKEN_MANAGER = "token_manager"
+ENTRY_OPTIONS = "entry_options"
+FLEET_AGGREGATOR = "fleet_aggregator"
+SCHEDULE_ENGINE = "schedule_engine"
 
 CONF_LANGUAGE = "language"
+CONF_TELEMETRY_ARCHIVE = "telemetry_archive"
+CONF_TOKEN_EXPIRY = "token_expiry"
 
 ATTR_STATUS = "status"
 ATTR_VANE_VERTICAL = "vane_vertical"
@@ -0,0 +1,84 @@
+"""Diagnostics support for MELCloud."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_PASSWORD, CONF_TOKEN, CONF_USERNAME
+from homeassistant.core import HomeAssistant
+
+from . import MelCloudDevice
+from .const import DOMAIN, MEL_DEVICES
+
+TO_REDACT = {
+    CONF_PASSWORD,
+    CONF_TOKEN,
+    CONF_USERNAME,
+    "Address1",
+    "Address2",
+    "City",
+    "ContextKey",
+    "EmailAddress",
+    "Latitude",
+    "Longitude",
+    "Location",
+    "MacAddress",
+    "OwnerEmail",
+    "OwnerID",
+    "OwnerName",
+    "Postcode",
+    "SerialNumber",
+}
+
+
+def _coordinator_diagnostics(mel_device: MelCloudDevice) -> dict[str, Any]:
+    """Return polling statistics of a device coordinator."""
+    coordinator = mel_device.coordinator
+    data: dict[str, Any] = {
+        "last_update_duration": mel_device.last_update_duration,
+        "last_update_success_time": mel_device.last_update_success,
+    }
+    if coordinator is not None:
+        data.update(
+            {
+                "update_interval": coordinator.update_interval,
+                "last_update_success": coordinator.last_update_success,
+                "last_exception": repr(coordinator.last_exception)
+                if coordinator.last_exception
+                else None,
+            }
+        )
+    return data
+
+
+def _device_diagnostics(mel_device: MelCloudDevice) -> dict[str, Any]:
+    """Return the cached data of a device without querying MELCloud."""
+    device = mel_device.device
+    return {
+        "device_type": device.device_type,
+        "device_conf": async_redact_data(device._device_conf or {}, TO_REDACT),
+        "state": async_redact_data(device._state or {}, TO_REDACT),
+        "pending_writes": device.pending_writes,
+        "coordinator": _coordinator_diagnostics(mel_device),
+    }
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    mel_devices = hass.data[DOMAIN][entry.entry_id].get(MEL_DEVICES, {})
+
+    devices: dict[str, list[dict[str, Any]]] = {}
+    clients = {}
+    for device_type, type_devices in mel_devices.items():
+        devices[device_type] = [_device_diagnostics(d) for d in type_devices]
+        for mel_device in type_devices:
+            clients[id(mel_device.client)] = mel_device.client
+
+    return {
+        "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+        "clients": [client.stats for client in clients.values()],
+        "devices": devices,
+    }
@@ -0,0 +1,130 @@
+"""Site-wide aggregates of the devices of a MELCloud config entry.
+
+Every device contributes a fixed tuple of values to the aggregates. When a device
+updates, only the difference with its previous contribution is applied to the
+entry totals and to the totals of its building, keeping an update O(1) however
+many devices the entry has.
+"""
+from __future__ import annotations
+
+from collections.abc import Callable
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import CALLBACK_TYPE, callback
+
+from .analytics import MODE_COUNTERS
+
+if TYPE_CHECKING:
+    from . import MelCloudDevice
+
+METRIC_ENERGY_CONSUMED = "daily_energy_consumed"
+METRIC_ENERGY_PRODUCED = "daily_energy_produced"
+METRIC_UNITS_IN_ERROR = "units_in_error"
+METRIC_UNITS_DEFROSTING = "units_defrosting"
+
+# Order of the values of a contribution.
+METRICS = (
+    METRIC_ENERGY_CONSUMED,
+    METRIC_ENERGY_PRODUCED,
+    METRIC_UNITS_IN_ERROR,
+    METRIC_UNITS_DEFROSTING,
+)
+
+_EMPTY = (0.0,) * len(METRICS)
+
+
+def device_contribution(mel_device: MelCloudDevice) -> tuple[float, ...]:
+    """Return the values a device adds to the aggregates."""
+    device_props = mel_device.device_conf
+    if mel_device.cop_tracker is not None:
+        consumed = produced = 0.0
+        for consumed_key, produced_key in MODE_COUNTERS.values():
+            consumed += device_props.get(consumed_key) or 0.0
+            produced += device_props.get(produced_key) or 0.0
+    else:
+        consumed = mel_device.device.daily_energy_consumed or 0.0
+        produced = 0.0
+    defrost_tracker = mel_device.defrost_tracker
+    return (
+        consumed,
+        produced,
+        1.0 if mel_device.error_state else 0.0,
+        1.0 if defrost_tracker is not None and defrost_tracker.active else 0.0,
+    )
+
+
+class FleetAggregator:
+    """Running sums of the device contributions of a config entry."""
+
+    def __init__(self) -> None:
+        """Initialize the aggregator without devices."""
+        self._totals = list(_EMPTY)
+        self._contributions: dict[Any, tuple[float, ...]] = {}
+        self._device_buildings: dict[Any, Any] = {}
+        self._building_totals: dict[Any, list[float]] = {}
+        self._building_names: dict[Any, str] = {}
+        self._listeners: list[CALLBACK_TYPE] = []
+
+    @callback
+    def async_update_device(self, mel_device: MelCloudDevice) -> None:
+        """Apply the change of the contribution of a device since its last update."""
+        device_id = mel_device.device_id
+        contribution = device_contribution(mel_device)
+        previous = self._contributions.get(device_id, _EMPTY)
+        if contribution == previous and device_id in self._contributions:
+            return
+
+        building = mel_device.building_id
+        location = mel_device.client.device_locations.get(device_id)
+        if location is not None and location.building_name:
+            self._building_names[building] = location.building_name
+        if self._device_buildings.get(device_id, building) != building:
+            # The device moved, withdraw it from its previous building.
+            self._apply(self._device_buildings[device_id], previous, _EMPTY)
+            previous = _EMPTY
+        self._device_buildings[device_id] = building
+        self._apply(building, previous, contribution)
+        self._contributions[device_id] = contribution
+
+        for update_callback in list(self._listeners):
+            update_callback()
+
+    def _apply(
+        self, building: Any, previous: tuple[float, ...], current: tuple[float, ...]
+    ) -> None:
+        building_totals = self._building_totals.setdefault(building, list(_EMPTY))
+        for index, (old, new) in enumerate(zip(previous, current)):
+            delta = new - old
+            self._totals[index] += delta
+            building_totals[index] += delta
+
+    def total(self, metric: str) -> float:
+        """Return the total of a metric over the devices of the entry."""
+        return _rounded(self._totals[METRICS.index(metric)])
+
+    def by_building(self, metric: str) -> dict[str, float]:
+        """Return the total of a metric per building, keyed by building name."""
+        index = METRICS.index(metric)
+        return {
+            self._building_names.get(building, str(building)): _rounded(totals[index])
+            for building, totals in self._building_totals.items()
+        }
+
+    @callback
+    def async_add_listener(
+        self, update_callback: CALLBACK_TYPE
+    ) -> Callable[[], None]:
+        """Listen for aggregate changes, returning a function removing the listener."""
+        self._listeners.append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            self._listeners.remove(update_callback)
+
+        return remove_listener
+
+
+def _rounded(value: float) -> float:
+    """Round away the float drift accumulated by the deltas."""
+    # Adding zero turns a negative zero left by the drift into zero.
+    return round(value, 3) + 0.0
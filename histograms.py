@@ -0,0 +1,156 @@
+"""Persisted compressor frequency and demand histograms of MELCloud devices."""
+from __future__ import annotations
+
+from array import array
+from collections.abc import Mapping
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+
+STORAGE_VERSION = 1
+SAVE_DELAY = 300
+
+HISTOGRAM_FREQUENCY = "heat_pump_frequency"
+HISTOGRAM_DEMAND = "demand_percentage"
+
+# Device conf key, lower bound, band width and band count of each histogram.
+HISTOGRAMS: dict[str, tuple[str, float, float, int]] = {
+    HISTOGRAM_FREQUENCY: ("HeatPumpFrequency", 0, 10, 13),
+    HISTOGRAM_DEMAND: ("DemandPercentage", 0, 10, 10),
+}
+
+# Longest time a polled value is assumed to hold. A longer gap between two polls,
+# the integration being stopped or the cloud unreachable, is not accounted.
+MAX_HOLD = 600
+
+
+class TimeWeightedHistogram:
+    """Time spent by a polled value in fixed-width bands.
+
+    Each poll holds its value until the next poll, unless the next poll comes more
+    than MAX_HOLD later. Values beyond the last band are accounted in the last band,
+    values below the first band in the first one.
+    """
+
+    __slots__ = ("lower", "width", "seconds", "_last_value", "_last_timestamp")
+
+    def __init__(self, lower: float, width: float, count: int) -> None:
+        """Initialize an empty histogram of count bands starting at lower."""
+        self.lower = lower
+        self.width = width
+        self.seconds = array("d", bytes(8 * count))
+        self._last_value: float | None = None
+        self._last_timestamp: float | None = None
+
+    def add(self, value: float | None, timestamp: float) -> None:
+        """Account the time elapsed since the previous poll and hold value."""
+        last_value = self._last_value
+        if last_value is not None:
+            elapsed = timestamp - self._last_timestamp
+            if 0 < elapsed <= MAX_HOLD:
+                self.seconds[self._band(last_value)] += elapsed
+        self._last_value = value
+        self._last_timestamp = timestamp
+
+    def _band(self, value: float) -> int:
+        index = int((value - self.lower) // self.width)
+        return min(max(index, 0), len(self.seconds) - 1)
+
+    def load(self, seconds: list[float]) -> None:
+        """Restore persisted band durations if the layout still matches."""
+        if len(seconds) == len(self.seconds):
+            self.seconds = array("d", seconds)
+
+    def distribution(self) -> dict[str, float]:
+        """Return the hours spent in each band, keyed by band label."""
+        last = len(self.seconds) - 1
+        result: dict[str, float] = {}
+        for index, seconds in enumerate(self.seconds):
+            start = self.lower + index * self.width
+            if index == last:
+                label = f"{start:g}+"
+            else:
+                label = f"{start:g}-{start + self.width:g}"
+            result[label] = round(seconds / 3600, 2)
+        return result
+
+
+class DeviceHistograms:
+    """Histograms of a single device."""
+
+    def __init__(self, stored: Mapping[str, list[float]] | None = None) -> None:
+        """Initialize the histograms, restoring the stored band durations."""
+        self.histograms = {
+            name: TimeWeightedHistogram(lower, width, count)
+            for name, (_, lower, width, count) in HISTOGRAMS.items()
+        }
+        for name, seconds in (stored or {}).items():
+            if name in self.histograms:
+                self.histograms[name].load(seconds)
+
+    def add_sample(self, device_props: Mapping[str, Any], timestamp: float) -> None:
+        """Account a poll of the device."""
+        for name, (key, *_) in HISTOGRAMS.items():
+            value = device_props.get(key)
+            if not isinstance(value, (int, float)):
+                value = None
+            self.histograms[name].add(value, timestamp)
+
+    def distribution(self, name: str) -> dict[str, float]:
+        """Return the hours spent in each band of a histogram."""
+        return self.histograms[name].distribution()
+
+    def as_dict(self) -> dict[str, list[float]]:
+        """Return the band durations to persist."""
+        return {name: list(h.seconds) for name, h in self.histograms.items()}
+
+
+class HistogramStore:
+    """Histograms of the devices of a config entry, persisted across restarts."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the store without loading it."""
+        self._store: Store = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.histograms"
+        )
+        self._stored: dict[str, dict[str, list[float]]] = {}
+        self._devices: dict[str, DeviceHistograms] = {}
+        self._save_pending = False
+
+    async def async_load(self) -> None:
+        """Load the stored histograms."""
+        self._stored = await self._store.async_load() or {}
+
+    def get(self, device_id: Any) -> DeviceHistograms:
+        """Return the histograms of a device."""
+        key = str(device_id)
+        if key not in self._devices:
+            self._devices[key] = DeviceHistograms(self._stored.get(key))
+        return self._devices[key]
+
+    @callback
+    def async_schedule_save(self) -> None:
+        """Save the histograms after a delay, coalescing frequent updates.
+
+        Every delayed save postpones the pending one. Polls come more often than
+        SAVE_DELAY, so a save is only requested when none is pending, or the
+        histograms would only be written on shutdown.
+        """
+        if self._save_pending:
+            return
+        self._save_pending = True
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    async def async_save(self) -> None:
+        """Save the histograms now."""
+        await self._store.async_save(self._data_to_save())
+
+    @callback
+    def _data_to_save(self) -> dict[str, dict[str, list[float]]]:
+        self._save_pending = False
+        data = dict(self._stored)
+        data.update({key: h.as_dict() for key, h in self._devices.items()})
+        return data
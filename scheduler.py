@@ -0,0 +1,203 @@
+"""Local execution of planned setpoint changes of MELCloud devices.
+
+A plan is a list of weekly recurring steps, each writing a set of properties at a
+local time of day. The next run of every step is computed once, when the plan is
+set or after the step ran, and kept in a heap. A single timer waits for the
+earliest run. When it fires, every step due within the merge window is executed,
+the steps of a device being merged into a single write.
+"""
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping
+from datetime import datetime, time as dt_time, timedelta
+import heapq
+import itertools
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_point_in_utc_time
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+
+if TYPE_CHECKING:
+    from . import MelCloudDevice
+
+STORAGE_VERSION = 1
+SAVE_DELAY = 10
+
+# Steps due within this window of the earliest one run together.
+MERGE_WINDOW = timedelta(minutes=1)
+
+ALL_WEEKDAYS = frozenset(range(7))
+
+
+class PlanStep(NamedTuple):
+    """Properties written at a local time on some weekdays, Monday being 0."""
+
+    at: dt_time
+    weekdays: frozenset[int]
+    properties: Mapping[str, Any]
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the step to persist."""
+        return {
+            "at": self.at.isoformat(),
+            "weekdays": sorted(self.weekdays),
+            "properties": dict(self.properties),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> PlanStep:
+        """Restore a persisted step."""
+        return cls(
+            dt_time.fromisoformat(data["at"]),
+            frozenset(data["weekdays"]),
+            data["properties"],
+        )
+
+
+def next_run(step: PlanStep, after: datetime) -> datetime | None:
+    """Return the first run of a step strictly after a time."""
+    local = dt_util.as_local(after)
+    for days in range(8):
+        day = local.date() + timedelta(days=days)
+        if day.weekday() not in step.weekdays:
+            continue
+        candidate = dt_util.start_of_local_day(day).replace(
+            hour=step.at.hour, minute=step.at.minute, second=step.at.second
+        )
+        if candidate > after:
+            return candidate
+    return None
+
+
+class ScheduleEngine:
+    """Plans of the devices of a config entry, persisted across restarts."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the engine without loading the plans."""
+        self._hass = hass
+        self._store: Store = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.schedules"
+        )
+        self._plans: dict[str, list[PlanStep]] = {}
+        self._devices: dict[str, MelCloudDevice] = {}
+        # Plans replaced since a heap entry was pushed are skipped when popped.
+        self._generations: dict[str, int] = {}
+        # (timestamp, sequence, device key, plan generation, step index)
+        self._heap: list[tuple[float, int, str, int, int]] = []
+        self._sequence = itertools.count()
+        self._unsub_timer: CALLBACK_TYPE | None = None
+
+    async def async_load(self) -> None:
+        """Load the stored plans."""
+        stored = await self._store.async_load() or {}
+        self._plans = {
+            key: [PlanStep.from_dict(step) for step in steps]
+            for key, steps in stored.items()
+        }
+
+    @callback
+    def async_add_device(self, mel_device: MelCloudDevice) -> None:
+        """Execute the stored plan of a device."""
+        key = mel_device.registry_identifier
+        self._devices[key] = mel_device
+        self._schedule_plan(key, dt_util.utcnow())
+
+    @callback
+    def async_start(self) -> None:
+        """Wait for the earliest run."""
+        self._arm()
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop executing the plans."""
+        if self._unsub_timer is not None:
+            self._unsub_timer()
+            self._unsub_timer = None
+
+    def get_plan(self, mel_device: MelCloudDevice) -> list[PlanStep]:
+        """Return the plan of a device."""
+        return list(self._plans.get(mel_device.registry_identifier, ()))
+
+    @callback
+    def async_set_plan(
+        self, mel_device: MelCloudDevice, steps: Iterable[PlanStep]
+    ) -> None:
+        """Replace the plan of a device, an empty plan removing it.
+
+        Raises ValueError if a step holds an invalid property or value.
+        """
+        steps = list(steps)
+        for step in steps:
+            mel_device.device.encode_writes(step.properties)
+
+        key = mel_device.registry_identifier
+        self._devices[key] = mel_device
+        if steps:
+            self._plans[key] = steps
+        else:
+            self._plans.pop(key, None)
+        self._schedule_plan(key, dt_util.utcnow())
+        self._arm()
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    def _schedule_plan(self, key: str, after: datetime) -> None:
+        """Push the next run of every step of a plan."""
+        generation = self._generations.get(key, 0) + 1
+        self._generations[key] = generation
+        for index, step in enumerate(self._plans.get(key, ())):
+            self._push(key, generation, index, step, after)
+
+    def _push(
+        self, key: str, generation: int, index: int, step: PlanStep, after: datetime
+    ) -> None:
+        run = next_run(step, after)
+        if run is not None:
+            heapq.heappush(
+                self._heap,
+                (run.timestamp(), next(self._sequence), key, generation, index),
+            )
+
+    def _arm(self) -> None:
+        """Set the timer to the earliest run, dropping replaced plans first."""
+        heap = self._heap
+        while heap and heap[0][3] != self._generations.get(heap[0][2]):
+            heapq.heappop(heap)
+        self.async_stop()
+        if heap:
+            self._unsub_timer = async_track_point_in_utc_time(
+                self._hass, self._async_run, dt_util.utc_from_timestamp(heap[0][0])
+            )
+
+    @callback
+    def _async_run(self, now: datetime) -> None:
+        """Execute the steps due within the merge window, one write per device."""
+        self._unsub_timer = None
+        horizon = now.timestamp() + MERGE_WINDOW.total_seconds()
+        writes: dict[str, dict[str, Any]] = {}
+        heap = self._heap
+        while heap and heap[0][0] <= horizon:
+            timestamp, _, key, generation, index = heapq.heappop(heap)
+            if generation != self._generations.get(key):
+                continue
+            step = self._plans[key][index]
+            # Popped by run time, later steps override the earlier ones.
+            writes.setdefault(key, {}).update(step.properties)
+            self._push(
+                key, generation, index, step, dt_util.utc_from_timestamp(timestamp)
+            )
+
+        for key, properties in writes.items():
+            if (mel_device := self._devices.get(key)) is not None:
+                self._hass.async_create_task(mel_device.async_set(properties))
+        self._arm()
+
+    @callback
+    def _data_to_save(self) -> dict[str, list[dict[str, Any]]]:
+        return {
+            key: [step.as_dict() for step in steps]
+            for key, steps in self._plans.items()
+        }
@@ -3,12 +3,12 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 import logging
-from datetime import datetime, timezone
-from typing import Any, Callable, Optional
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable
 
 
-from .src.pymelcloud import DEVICE_TYPE_ATA, DEVICE_TYPE_ATW, AtwDevice
-from .src.pymelcloud.atw_device import Zone
+from .src.pymelcloud import DEVICE_TYPE_ATA, DEVICE_TYPE_ATW
 
 from homeassistant.components.sensor import (
     SensorDeviceClass,
@@ -21,15 +21,54 @@ from homeassistant.const import (
     UnitOfEnergy,
     UnitOfTemperature,
     UnitOfFrequency,
+    UnitOfTime,
     PERCENTAGE,
 
 )
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
-from homeassistant.helpers.entity import EntityCategory
+from homeassistant.core import CALLBACK_TYPE, callback
+from homeassistant.helpers.device_registry import DeviceEntryType
+from homeassistant.helpers.entity import DeviceInfo, EntityCategory
+from homeassistant.helpers.event import async_call_later
+from homeassistant.util import dt as dt_util
+
+
+from . import MelCloudDevice, MelCloudEntity
+from .analytics import (
+    MODE_COOLING,
+    MODE_HEATING,
+    MODE_HOT_WATER,
+    WINDOW_DAILY,
+    WINDOW_HOURLY,
+    WINDOW_WEEKLY,
+)
+from .const import DOMAIN, FLEET_AGGREGATOR, MEL_DEVICES
+from .fleet import (
+    METRIC_ENERGY_CONSUMED,
+    METRIC_ENERGY_PRODUCED,
+    METRIC_UNITS_DEFROSTING,
+    METRIC_UNITS_IN_ERROR,
+    FleetAggregator,
+)
+from .histograms import HISTOGRAM_DEMAND, HISTOGRAM_FREQUENCY
+
+
+@dataclass(frozen=True)
+class PublishFilter:
+    """Deadband and rate limit applied before publishing a numeric state.
 
+    A new value is published when it moved at least deadband away from the last
+    published value and min_interval elapsed since the last publish. The current
+    value is always published once heartbeat elapsed.
+    """
 
-from . import MelCloudDevice
-from .const import DOMAIN, MEL_DEVICES
+    deadband: float = 0.0
+    min_interval: timedelta = timedelta(0)
+    heartbeat: timedelta = timedelta(minutes=30)
+
+
+TEMPERATURE_FILTER = PublishFilter(deadband=0.3, min_interval=timedelta(minutes=2))
+FREQUENCY_FILTER = PublishFilter(deadband=3, min_interval=timedelta(minutes=2))
+DEMAND_FILTER = PublishFilter(deadband=5, min_interval=timedelta(minutes=2))
 
 
 @dataclass
@@ -46,6 +85,57 @@ class MelcloudSensorEntityDescription(
 ):
     """Describes Melcloud sensor entity."""
 
+    source_keys: frozenset[str] | None = None
+    publish_filter: PublishFilter | None = None
+    available_fn: Callable[[Any], bool] | None = None
+    icon_fn: Callable[[Any], str] | None = None
+    attributes_fn: Callable[[Any], dict[str, Any] | None] | None = None
+
+
+def _always(_: MelCloudDevice) -> bool:
+    """Return True for sensors available on every device."""
+    return True
+
+
+def _conf_flags(*keys: str) -> Callable[[MelCloudDevice], bool]:
+    """Return a capability predicate requiring all the Device conf flags."""
+    return lambda x: all(x.device_conf.get(key) for key in keys)
+
+
+def _conf_value(key: str, ndigits: int | None = None) -> Callable[[Any], Any]:
+    """Return an accessor reading a key of the Device conf."""
+    if ndigits is None:
+        return lambda x: x.device_conf.get(key)
+
+    def _rounded(x: MelCloudDevice) -> float | None:
+        value = x.device_conf.get(key)
+        if value is None:
+            return None
+        return round(value, ndigits)
+
+    return _rounded
+
+
+def _conf_switch(key: str, on: str = "On", off: str = "Off") -> Callable[[Any], str]:
+    """Return an accessor mapping a boolean Device conf key to a label."""
+    return lambda x: on if x.device_conf.get(key) else off
+
+
+def _histogram(name: str) -> Callable[[MelCloudDevice], dict[str, Any] | None]:
+    """Return an accessor of the hours spent in each band of a histogram."""
+
+    def _attributes(x: MelCloudDevice) -> dict[str, Any] | None:
+        if x.histograms is None:
+            return None
+        return {"hours_by_band": x.histograms.distribution(name)}
+
+    return _attributes
+
+
+def _pump_icon(key: str) -> Callable[[MelCloudDevice], str]:
+    """Return an icon selector following the status of a water pump."""
+    return lambda x: "mdi:pump" if x.device_conf.get(key) else "mdi:pump-off"
+
 
 ATA_SENSORS: tuple[MelcloudSensorEntityDescription, ...] = (
     MelcloudSensorEntityDescription(
@@ -56,6 +146,7 @@ ATA_SENSORS: tuple[MelcloudSensorEntityDescription, ...] = (
         state_class=SensorStateClass.MEASUREMENT,
         device_class=SensorDeviceClass.SIGNAL_STRENGTH,
         value_fn=lambda x: x.wifi_signal,
+        source_keys=frozenset({"WifiSignalStrength"}),
         enabled=lambda x: True,
         entity_registry_enabled_default=True,
     ),
@@ -67,6 +158,8 @@ ATA_SENSORS: tuple[MelcloudSensorEntityDescription, ...] = (
         state_class=SensorStateClass.MEASUREMENT,
         device_class=SensorDeviceClass.TEMPERATURE,
         value_fn=lambda x: x.device.room_temperature,
+        source_keys=frozenset({"RoomTemperature"}),
+        publish_filter=TEMPERATURE_FILTER,
         enabled=lambda x: True,
         entity_registry_enabled_default=True,
     ),
@@ -78,6 +171,7 @@ ATA_SENSORS: tuple[MelcloudSensorEntityDescription, ...] = (
         state_class=SensorStateClass.TOTAL_INCREASING,
         device_class=SensorDeviceClass.ENERGY,
         value_fn=lambda x: x.device.total_energy_consumed,
+        source_keys=frozenset({"CurrentEnergyConsumed"}),
         enabled=lambda x: x.device.has_energy_consumed_meter,
         entity_registry_enabled_default=True,
     ),
@@ -94,6 +188,541 @@ ATA_SENSORS: tuple[MelcloudSensorEntityDescription, ...] = (
 )
 
 
+ATW_SENSORS: tuple[MelcloudSensorEntityDescription, ...] = (
+    MelcloudSensorEntityDescription(
+        key="last_update",
+        name="Last Update",
+        icon="mdi:update",
+        device_class=SensorDeviceClass.TIMESTAMP,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda x: x.device.last_seen,
+        source_keys=frozenset({"LastCommunication"}),
+        enabled=_always,
+    ),
+    # Heat pump temperatures
+    MelcloudSensorEntityDescription(
+        key="condensing_temperature",
+        name="Condensing Temperature",
+        icon="mdi:thermometer",
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        state_class=SensorStateClass.MEASUREMENT,
+        device_class=SensorDeviceClass.TEMPERATURE,
+        value_fn=_conf_value("CondensingTemperature", 1),
+        source_keys=frozenset({"CondensingTemperature"}),
+        publish_filter=TEMPERATURE_FILTER,
+        enabled=_always,
+    ),
+    MelcloudSensorEntityDescription(
+        key="outside_temperature",
+        name="Outside Temperature",
+        icon="mdi:thermometer",
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        state_class=SensorStateClass.MEASUREMENT,
+        device_class=SensorDeviceClass.TEMPERATURE,
+        value_fn=_conf_value("OutdoorTemperature", 1),
+        source_keys=frozenset({"OutdoorTemperature"}),
+        enabled=_always,
+    ),
+    MelcloudSensorEntityDescription(
+        key="flow_temperature",
+        name="Flow Temperature",
+        icon="mdi:thermometer",
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        state_class=SensorStateClass.MEASUREMENT,
+        device_class=SensorDeviceClass.TEMPERATURE,
+        value_fn=_conf_value("FlowTemperature"),
+        source_keys=frozenset({"FlowTemperature"}),
+        publish_filter=TEMPERATURE_FILTER,
+        enabled=_always,
+    ),
+    MelcloudSensorEntityDescription(
+        key="return_temperature",
+        name="Return Temperature",
+        icon="mdi:thermometer",
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        state_class=SensorStateClass.MEASUREMENT,
+        device_class=SensorDeviceClass.TEMPERATURE,
+        value_fn=_conf_value("ReturnTemperature"),
+        source_keys=frozenset({"ReturnTemperature"}),
+        publish_filter=TEMPERATURE_FILTER,
+        enabled=_always,
+    ),
+    MelcloudSensorEntityDescription(
+        key="mixing_tank_water_temperature",
+        name="Mixing Tank Water Temperature",
+        icon="mdi:thermometer",
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        state_class=SensorStateClass.MEASUREMENT,
+        device_class=SensorDeviceClass.TEMPERATURE,
+        value_fn=_conf_value("MixingTankWaterTemperature", 1),
+        source_keys=frozenset({"MixingTankWaterTemperature"}),
+        publish_filter=TEMPERATURE_FILTER,
+        # A constant 25°C reading means that the THW10 probe is not fitted.
+        enabled=lambda x: x.device_conf.get("MixingTankWaterTemperature") != 25,
+        available_fn=lambda x: x.device_conf.get("MixingTankWaterTemperature", 0) > 25,
+    ),
+    MelcloudSensorEntityDescription(
+        key="tank_temperature",
+        name="Tank Temperature",
+        icon="mdi:thermometer",
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        state_class=SensorStateClass.MEASUREMENT,
+        device_class=SensorDeviceClass.TEMPERATURE,
+        value_fn=_conf_value("TankWaterTemperature"),
+        source_keys=frozenset({"HasHotWaterTank", "TankWaterTemperature"}),
+        enabled=_conf_flags("HasHotWaterTank"),
+        available_fn=_conf_flags("HasHotWaterTank"),
+    ),
+    # Heat pump parameters
+    MelcloudSensorEntityDescription(
+        key="demand_percentage",
+        name="Demand percentage",
+        icon="mdi:sine-wave",
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        device_class=SensorDeviceClass.POWER_FACTOR,
+        value_fn=_conf_value("DemandPercentage"),
+        source_keys=frozenset({"DemandPercentage"}),
+        publish_filter=DEMAND_FILTER,
+        attributes_fn=_histogram(HISTOGRAM_DEMAND),
+        enabled=_always,
+    ),
+    MelcloudSensorEntityDescription(
+        key="heat_pump_frequency",
+        name="Heat Pump Frequency",
+        icon="mdi:sine-wave",
+        native_unit_of_measurement=UnitOfFrequency.HERTZ,
+        state_class=SensorStateClass.MEASUREMENT,
+        device_class=SensorDeviceClass.FREQUENCY,
+        value_fn=_conf_value("HeatPumpFrequency"),
+        source_keys=frozenset({"HeatPumpFrequency"}),
+        publish_filter=FREQUENCY_FILTER,
+        attributes_fn=_histogram(HISTOGRAM_FREQUENCY),
+        enabled=_always,
+    ),
+    MelcloudSensorEntityDescription(
+        key="heat_pump_operation_mode",
+        name="Operation Mode",
+        icon="mdi:list-box",
+        value_fn=lambda x: x.device.status,
+        source_keys=frozenset({"OperationMode"}),
+        enabled=_always,
+    ),
+    MelcloudSensorEntityDescription(
+        key="wifi_signal",
+        name="WiFi Signal",
+        icon="mdi:signal",
+        native_unit_of_measurement=SIGNAL_STRENGTH_DECIBELS_MILLIWATT,
+        state_class=SensorStateClass.MEASUREMENT,
+        device_class=SensorDeviceClass.SIGNAL_STRENGTH,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=_conf_value("WifiSignalStrength"),
+        source_keys=frozenset({"WifiSignalStrength"}),
+        enabled=_always,
+    ),
+    MelcloudSensorEntityDescription(
+        key="error_code",
+        name="Error Code",
+        icon="mdi:alert-circle",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda x: x.device.error_code,
+        source_keys=frozenset({"ErrorCode"}),
+        enabled=_always,
+    ),
+    MelcloudSensorEntityDescription(
+        key="error_message",
+        name="Error Message",
+        icon="mdi:alert-circle",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda x: x.device.error_message,
+        source_keys=frozenset({"ErrorMessage"}),
+        enabled=_always,
+    ),
+    MelcloudSensorEntityDescription(
+        key="defrost_mode",
+        name="Defrost Mode",
+        icon="mdi:snowflake-melt",
+        value_fn=_conf_value("DefrostMode"),
+        source_keys=frozenset({"DefrostMode"}),
+        enabled=_always,
+    ),
+    MelcloudSensorEntityDescription(
+        key="booster_heater_1_status",
+        name="Booster Heater 1 Status",
+        icon="mdi:lightning-bolt",
+        value_fn=_conf_switch("BoosterHeater1Status"),
+        source_keys=frozenset({"BoosterHeater1Status"}),
+        enabled=_always,
+    ),
+    MelcloudSensorEntityDescription(
+        key="booster_heater_2_status",
+        name="Booster Heater 2 Status",
+        icon="mdi:lightning-bolt",
+        value_fn=_conf_switch("BoosterHeater2Status"),
+        source_keys=frozenset({"BoosterHeater2Status"}),
+        enabled=_always,
+    ),
+    MelcloudSensorEntityDescription(
+        key="water_pump_1_status",
+        name="Water Pump 1 Status",
+        value_fn=_conf_switch("WaterPump1Status"),
+        icon_fn=_pump_icon("WaterPump1Status"),
+        source_keys=frozenset({"WaterPump1Status"}),
+        enabled=_always,
+    ),
+    MelcloudSensorEntityDescription(
+        key="water_pump_2_status",
+        name="Water Pump 2 Status",
+        value_fn=_conf_switch("WaterPump2Status"),
+        icon_fn=_pump_icon("WaterPump2Status"),
+        source_keys=frozenset({"WaterPump2Status"}),
+        enabled=_conf_flags("HasThermostatZone1"),
+    ),
+    MelcloudSensorEntityDescription(
+        key="water_pump_3_status",
+        name="Water Pump 3 Status",
+        value_fn=_conf_switch("WaterPump3Status"),
+        icon_fn=_pump_icon("WaterPump3Status"),
+        source_keys=frozenset({"WaterPump3Status"}),
+        enabled=_conf_flags("HasThermostatZone2", "HasZone2"),
+    ),
+    MelcloudSensorEntityDescription(
+        key="valve_status_3_way",
+        name="3 Way Valve",
+        icon="mdi:pipe-valve",
+        value_fn=_conf_switch("ValveStatus3Way", "ECS", "Chauffage"),
+        source_keys=frozenset({"ValveStatus3Way"}),
+        enabled=_conf_flags("HasHotWaterTank", "HasThermostatZone1"),
+    ),
+    MelcloudSensorEntityDescription(
+        key="forced_hot_water_mode",
+        name="Forced Hot Water Mode",
+        icon="mdi:thermometer-water",
+        value_fn=_conf_switch("ForcedHotWaterMode"),
+        source_keys=frozenset({"ForcedHotWaterMode"}),
+        enabled=_conf_flags("HasHotWaterTank"),
+    ),
+    # Energy
+    MelcloudSensorEntityDescription(
+        key="current_energy_consumed",
+        name="Current Energy Consumed",
+        icon="mdi:factory",
+        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        state_class=SensorStateClass.MEASUREMENT,
+        device_class=SensorDeviceClass.ENERGY,
+        value_fn=_conf_value("CurrentEnergyConsumed"),
+        source_keys=frozenset({"CurrentEnergyConsumed"}),
+        enabled=_always,
+    ),
+    MelcloudSensorEntityDescription(
+        key="current_energy_produced",
+        name="Current Energy Produced",
+        icon="mdi:factory",
+        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        state_class=SensorStateClass.MEASUREMENT,
+        device_class=SensorDeviceClass.ENERGY,
+        value_fn=_conf_value("CurrentEnergyProduced"),
+        source_keys=frozenset({"CurrentEnergyProduced"}),
+        enabled=_always,
+    ),
+    MelcloudSensorEntityDescription(
+        key="daily_heating_energy_consumed",
+        name="Daily Heating Energy Consumed",
+        icon="mdi:factory",
+        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        device_class=SensorDeviceClass.ENERGY,
+        value_fn=_conf_value("DailyHeatingEnergyConsumed"),
+        source_keys=frozenset({"DailyHeatingEnergyConsumed"}),
+        enabled=_conf_flags("CanHeat"),
+    ),
+    MelcloudSensorEntityDescription(
+        key="daily_heating_energy_produced",
+        name="Daily Heating Energy Produced",
+        icon="mdi:factory",
+        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        state_class=SensorStateClass.MEASUREMENT,
+        device_class=SensorDeviceClass.ENERGY,
+        value_fn=_conf_value("DailyHeatingEnergyProduced"),
+        source_keys=frozenset({"DailyHeatingEnergyProduced"}),
+        enabled=_conf_flags("CanHeat"),
+    ),
+    MelcloudSensorEntityDescription(
+        key="daily_cooling_energy_consumed",
+        name="Daily Cooling Energy Consumed",
+        icon="mdi:factory",
+        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        state_class=SensorStateClass.MEASUREMENT,
+        device_class=SensorDeviceClass.ENERGY,
+        value_fn=_conf_value("DailyCoolingEnergyConsumed"),
+        source_keys=frozenset({"DailyCoolingEnergyConsumed"}),
+        enabled=_conf_flags("CanCool"),
+    ),
+    MelcloudSensorEntityDescription(
+        key="daily_cooling_energy_produced",
+        name="Daily Cooling Energy Produced",
+        icon="mdi:factory",
+        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        state_class=SensorStateClass.MEASUREMENT,
+        device_class=SensorDeviceClass.ENERGY,
+        value_fn=_conf_value("DailyCoolingEnergyProduced"),
+        source_keys=frozenset({"DailyCoolingEnergyProduced"}),
+        enabled=_conf_flags("CanCool"),
+    ),
+    MelcloudSensorEntityDescription(
+        key="daily_hot_water_energy_consumed",
+        name="Daily Hot Water Energy Consumed",
+        icon="mdi:factory",
+        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        state_class=SensorStateClass.MEASUREMENT,
+        device_class=SensorDeviceClass.ENERGY,
+        value_fn=_conf_value("DailyHotWaterEnergyConsumed"),
+        source_keys=frozenset({"DailyHotWaterEnergyConsumed"}),
+        enabled=_conf_flags("HasHotWaterTank"),
+    ),
+    MelcloudSensorEntityDescription(
+        key="daily_hot_water_energy_produced",
+        name="Daily Hot Water Energy Produced",
+        icon="mdi:factory",
+        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        state_class=SensorStateClass.MEASUREMENT,
+        device_class=SensorDeviceClass.ENERGY,
+        value_fn=_conf_value("DailyHotWaterEnergyProduced"),
+        source_keys=frozenset({"DailyHotWaterEnergyProduced"}),
+        enabled=_conf_flags("HasHotWaterTank"),
+    ),
+    # Zone 1
+    MelcloudSensorEntityDescription(
+        key="zone_1_target_hc_temperature",
+        name="Zone 1 Target Temperature",
+        icon="mdi:thermometer",
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        state_class=SensorStateClass.MEASUREMENT,
+        device_class=SensorDeviceClass.TEMPERATURE,
+        value_fn=_conf_value("TargetHCTemperatureZone1"),
+        source_keys=frozenset({"TargetHCTemperatureZone1"}),
+        enabled=_conf_flags("HasThermostatZone1"),
+    ),
+    MelcloudSensorEntityDescription(
+        key="zone_1_flow_temperature",
+        name="Zone 1 Flow Temperature",
+        icon="mdi:thermometer",
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        state_class=SensorStateClass.MEASUREMENT,
+        device_class=SensorDeviceClass.TEMPERATURE,
+        value_fn=_conf_value("FlowTemperatureZone1"),
+        source_keys=frozenset({"FlowTemperatureZone1"}),
+        publish_filter=TEMPERATURE_FILTER,
+        enabled=_conf_flags("HasThermostatZone1"),
+    ),
+    MelcloudSensorEntityDescription(
+        key="zone_1_return_temperature",
+        name="Zone 1 Return Temperature",
+        icon="mdi:thermometer",
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        state_class=SensorStateClass.MEASUREMENT,
+        device_class=SensorDeviceClass.TEMPERATURE,
+        value_fn=_conf_value("ReturnTemperatureZone1"),
+        source_keys=frozenset({"ReturnTemperatureZone1"}),
+        publish_filter=TEMPERATURE_FILTER,
+        enabled=_conf_flags("HasThermostatZone1"),
+    ),
+    MelcloudSensorEntityDescription(
+        key="zone_1_room_temperature",
+        name="Zone 1 Room Temperature",
+        icon="mdi:thermometer",
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        state_class=SensorStateClass.MEASUREMENT,
+        device_class=SensorDeviceClass.TEMPERATURE,
+        value_fn=_conf_value("RoomTemperatureZone1"),
+        source_keys=frozenset({"RoomTemperatureZone1"}),
+        publish_filter=TEMPERATURE_FILTER,
+        enabled=_conf_flags("HasThermostatZone1"),
+    ),
+    # Zone 2
+    MelcloudSensorEntityDescription(
+        key="zone_2_target_hc_temperature",
+        name="Zone 2 Target Temperature",
+        icon="mdi:thermometer",
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        state_class=SensorStateClass.MEASUREMENT,
+        device_class=SensorDeviceClass.TEMPERATURE,
+        value_fn=_conf_value("TargetHCTemperatureZone2"),
+        source_keys=frozenset({"TargetHCTemperatureZone2"}),
+        enabled=_conf_flags("HasThermostatZone2", "HasZone2"),
+    ),
+    MelcloudSensorEntityDescription(
+        key="zone_2_flow_temperature",
+        name="Zone 2 Flow Temperature",
+        icon="mdi:thermometer",
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        state_class=SensorStateClass.MEASUREMENT,
+        device_class=SensorDeviceClass.TEMPERATURE,
+        value_fn=_conf_value("FlowTemperatureZone2"),
+        source_keys=frozenset({"FlowTemperatureZone2"}),
+        publish_filter=TEMPERATURE_FILTER,
+        enabled=_conf_flags("HasThermostatZone2", "HasZone2"),
+    ),
+    MelcloudSensorEntityDescription(
+        key="zone_2_return_temperature",
+        name="Zone 2 Return Temperature",
+        icon="mdi:thermometer",
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        state_class=SensorStateClass.MEASUREMENT,
+        device_class=SensorDeviceClass.TEMPERATURE,
+        value_fn=_conf_value("ReturnTemperatureZone2"),
+        source_keys=frozenset({"ReturnTemperatureZone2"}),
+        publish_filter=TEMPERATURE_FILTER,
+        enabled=_conf_flags("HasThermostatZone2", "HasZone2"),
+    ),
+    MelcloudSensorEntityDescription(
+        key="zone_2_room_temperature",
+        name="Zone 2 Room Temperature",
+        icon="mdi:thermometer",
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        state_class=SensorStateClass.MEASUREMENT,
+        device_class=SensorDeviceClass.TEMPERATURE,
+        value_fn=_conf_value("RoomTemperatureZone2"),
+        source_keys=frozenset({"RoomTemperatureZone2"}),
+        publish_filter=TEMPERATURE_FILTER,
+        enabled=_conf_flags("HasThermostatZone2", "HasZone2"),
+    ),
+)
+
+
+def _cop_sensor(
+    mode: str, mode_name: str, capability: str, window: str, window_name: str
+) -> MelcloudSensorEntityDescription:
+    """Describe a rolling coefficient of performance sensor."""
+    return MelcloudSensorEntityDescription(
+        key=f"{mode}_cop_{window}",
+        name=f"{mode_name} COP {window_name}",
+        icon="mdi:heat-pump",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda x: x.cop(mode, window),
+        enabled=_conf_flags(capability),
+        entity_registry_enabled_default=window == WINDOW_DAILY,
+    )
+
+
+ATW_COP_SENSORS: tuple[MelcloudSensorEntityDescription, ...] = tuple(
+    _cop_sensor(mode, mode_name, capability, window, window_name)
+    for mode, mode_name, capability in (
+        (MODE_HEATING, "Heating", "CanHeat"),
+        (MODE_COOLING, "Cooling", "CanCool"),
+        (MODE_HOT_WATER, "Hot Water", "HasHotWaterTank"),
+    )
+    for window, window_name in (
+        (WINDOW_HOURLY, "1h"),
+        (WINDOW_DAILY, "24h"),
+        (WINDOW_WEEKLY, "7d"),
+    )
+)
+
+
+
+def _defrost_value(
+    attribute: str, scale: float = 1.0, ndigits: int = 2
+) -> Callable[[MelCloudDevice], float | None]:
+    """Return an accessor reading a statistic of the defrost tracker."""
+
+    def _value(x: MelCloudDevice) -> float | None:
+        if x.defrost_tracker is None:
+            return None
+        value = getattr(x.defrost_tracker, attribute)
+        if value is None:
+            return None
+        if ndigits == 0:
+            return round(value * scale)
+        return round(value * scale, ndigits)
+
+    return _value
+
+
+ATW_DEFROST_SENSORS: tuple[MelcloudSensorEntityDescription, ...] = (
+    MelcloudSensorEntityDescription(
+        key="defrost_cycles_today",
+        name="Defrost Cycles Today",
+        icon="mdi:snowflake-melt",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=_defrost_value("cycles_today", ndigits=0),
+        enabled=_always,
+    ),
+    MelcloudSensorEntityDescription(
+        key="last_defrost_duration",
+        name="Last Defrost Duration",
+        icon="mdi:timer-outline",
+        native_unit_of_measurement=UnitOfTime.MINUTES,
+        state_class=SensorStateClass.MEASUREMENT,
+        device_class=SensorDeviceClass.DURATION,
+        value_fn=_defrost_value("last_duration", 1 / 60, 1),
+        enabled=_always,
+    ),
+    MelcloudSensorEntityDescription(
+        key="time_between_defrosts",
+        name="Time Between Defrosts",
+        icon="mdi:timer-sand",
+        native_unit_of_measurement=UnitOfTime.MINUTES,
+        state_class=SensorStateClass.MEASUREMENT,
+        device_class=SensorDeviceClass.DURATION,
+        value_fn=_defrost_value("last_interval", 1 / 60, 0),
+        enabled=_always,
+    ),
+    MelcloudSensorEntityDescription(
+        key="last_defrost_energy",
+        name="Last Defrost Energy",
+        icon="mdi:lightning-bolt",
+        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        state_class=SensorStateClass.MEASUREMENT,
+        device_class=SensorDeviceClass.ENERGY,
+        value_fn=_defrost_value("last_energy", ndigits=3),
+        enabled=_always,
+    ),
+    MelcloudSensorEntityDescription(
+        key="defrost_energy_today",
+        name="Defrost Energy Today",
+        icon="mdi:lightning-bolt",
+        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        device_class=SensorDeviceClass.ENERGY,
+        value_fn=_defrost_value("energy_today", ndigits=3),
+        enabled=_always,
+    ),
+)
+
+FLEET_SENSORS: tuple[SensorEntityDescription, ...] = (
+    SensorEntityDescription(
+        key=METRIC_ENERGY_CONSUMED,
+        name="Daily Energy Consumed",
+        icon="mdi:factory",
+        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        device_class=SensorDeviceClass.ENERGY,
+        state_class=SensorStateClass.TOTAL,
+    ),
+    SensorEntityDescription(
+        key=METRIC_ENERGY_PRODUCED,
+        name="Daily Energy Produced",
+        icon="mdi:factory",
+        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        device_class=SensorDeviceClass.ENERGY,
+        state_class=SensorStateClass.TOTAL,
+    ),
+    SensorEntityDescription(
+        key=METRIC_UNITS_IN_ERROR,
+        name="Units In Error",
+        icon="mdi:alert-circle",
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=0,
+    ),
+    SensorEntityDescription(
+        key=METRIC_UNITS_DEFROSTING,
+        name="Units Defrosting",
+        icon="mdi:snowflake-melt",
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=0,
+    ),
+)
+
 _LOGGER = logging.getLogger(__name__)
 
 
@@ -110,76 +739,39 @@ async def async_setup_entry(hass, entry, async_add_entities):
             for mel_device in mel_devices[DEVICE_TYPE_ATA]
             if description.enabled(mel_device)
         ]
-        
-    )  
-    for mel_device in mel_devices[DEVICE_TYPE_ATW]:
-        entities.append(LastApiUpdate(mel_device, mel_device.device))
-        entities.append(CondensingTemperature(mel_device, mel_device.device))
-        entities.append(OutdoorTemperature(mel_device, mel_device.device))
-        entities.append(FlowTemperature(mel_device, mel_device.device))
-        entities.append(ReturnTemperature(mel_device, mel_device.device))
-
-        entities.append(DefrostMode(mel_device, mel_device.device))
-        entities.append(WaterPump1Status(mel_device, mel_device.device))
-        entities.append(BoosterHeater1Status(mel_device, mel_device.device))
-        entities.append(BoosterHeater2Status(mel_device, mel_device.device))
-
-        entities.append(DemandPercentage(mel_device, mel_device.device))
-        entities.append(HeatPumpFrequency(mel_device, mel_device.device))
-        entities.append(HeatPumpOperationMode(mel_device, mel_device.device))
-        entities.append(WifiSignal(mel_device, mel_device.device))
-        entities.append(ErrorCode(mel_device, mel_device.device))
-        entities.append(ErrorMessage(mel_device, mel_device.device))
-
-        entities.append(CurrentEnergyConsumed(mel_device, mel_device.device))
-        entities.append(CurrentEnergyProduced(mel_device, mel_device.device))
-
-        if mel_device.device._device_conf['Device']['CanHeat']:
-            entities.append(DailyHeatingEnergyConsumed(mel_device, mel_device.device))
-            entities.append(DailyHeatingEnergyProduced(mel_device, mel_device.device))
-
-        if mel_device.device._device_conf['Device']['CanCool']:
-            entities.append(DailyCoolingEnergyConsumed(mel_device, mel_device.device))
-            entities.append(DailyCoolingEnergyProduced(mel_device, mel_device.device))
-
-        if mel_device.device._device_conf['Device']['HasHotWaterTank']:
-            entities.append(DailyHotWaterEnergyConsumed(mel_device, mel_device.device))
-            entities.append(DailyHotWaterEnergyProduced(mel_device, mel_device.device))
-            entities.append(ForcedHotWaterMode(mel_device, mel_device.device))
-            entities.append(TankWaterTemperature(mel_device, mel_device.device))
-
-        if mel_device.device._device_conf['Device']['HasThermostatZone1']:
-            entities.append(TargetHCTemperatureZone1(mel_device, mel_device.device))
-            entities.append(FlowTemperatureZone1(mel_device, mel_device.device))
-            entities.append(ReturnTemperatureZone1(mel_device, mel_device.device))
-            entities.append(RoomTemperatureZone1(mel_device, mel_device.device))
-            entities.append(WaterPump2Status(mel_device, mel_device.device))
-        
-        if (mel_device.device._device_conf['Device']['HasThermostatZone2'] and 
-            mel_device.device._device_conf['Device']['HasZone2']): 
-            entities.append(TargetHCTemperatureZone2(mel_device, mel_device.device))
-            entities.append(FlowTemperatureZone2(mel_device, mel_device.device))
-            entities.append(ReturnTemperatureZone2(mel_device, mel_device.device))
-            entities.append(RoomTemperatureZone2(mel_device, mel_device.device))
-            entities.append(WaterPump3Status(mel_device, mel_device.device))
-        
-        if(mel_device.device._device_conf['Device']['HasHotWaterTank'] and
-            mel_device.device._device_conf['Device']['HasThermostatZone1']):
-            entities.append(ValveStatus3Way(mel_device, mel_device.device))
-        
-        if mel_device.device._device_conf['Device']['MixingTankWaterTemperature'] != 25:
-            entities.append(MixingTankTemperature(mel_device, mel_device.device))
-
-        
-
+    )
+    entities.extend(
+        [
+            MelDeviceSensor(mel_device, description)
+            for description in ATW_SENSORS + ATW_COP_SENSORS + ATW_DEFROST_SENSORS
+            for mel_device in mel_devices[DEVICE_TYPE_ATW]
+            if description.enabled(mel_device)
+        ]
+    )
+    fleet = entry_config[FLEET_AGGREGATOR]
+    entities.extend(
+        FleetSensor(fleet, entry, description) for description in FLEET_SENSORS
+    )
     async_add_entities(entities, False)
 
 
-class MelDeviceSensor(CoordinatorEntity, SensorEntity):
-    """Representation of a Sensor."""
+class MelDeviceSensor(MelCloudEntity, SensorEntity):
+    """Representation of a Sensor.
+
+    Noisy numeric values are filtered by the publish filter of the description
+    before being written to the state machine.
+    """
 
     entity_description: MelcloudSensorEntityDescription
 
+    # The band durations change on every poll, get_histograms returns them.
+    _unrecorded_attributes = frozenset({"hours_by_band"})
+
+    _published_value: Any = None
+    _published_available: bool | None = None
+    _published_at: float | None = None
+    _unsub_publish: CALLBACK_TYPE | None = None
+
     def __init__(
         self,
         api: MelCloudDevice,
@@ -189,6 +781,7 @@ class MelDeviceSensor(CoordinatorEntity, SensorEntity):
         super().__init__(api.coordinator)
         self._api = api
         self.entity_description = description
+        self._source_keys = description.source_keys
 
         self._attr_name = f"{api.name} {description.name}"
         self._attr_unique_id = f"{api.device.serial}-{api.device.mac}-{description.key}"
@@ -199,1002 +792,148 @@ class MelDeviceSensor(CoordinatorEntity, SensorEntity):
         return self.entity_description.value_fn(self._api)
 
     @property
-    def device_info(self):
-        """Return a device description for device registry."""
-        return self._api.device_info
+    def available(self) -> bool:
+        """Return True if entity is available."""
+        available_fn = self.entity_description.available_fn
+        return super().available and (available_fn is None or available_fn(self._api))
 
-    @property
-    def extra_state_attributes(self):
-        """Return the optional state attributes."""
-        return self._api.extra_attributes
-
-
-
-class LastApiUpdate(CoordinatorEntity, SensorEntity):
-    """Representation of the last api update."""
-
-    def __init__(self, api: MelCloudDevice, device: AtwDevice) -> None:
-        """Initialize  device."""
-        super().__init__(api.coordinator)
-        self._api = api
-        self._device = device
-        self._attr_icon = "mdi:update"
-        self._attr_name = f"{api.name} Last Update"
-        self._attr_unique_id = f"{api.device.serial}-{api.device.mac}-last_update"
-        self._attr_entity_category = EntityCategory.DIAGNOSTIC
-        self._attr_device_class = SensorDeviceClass.TIMESTAMP
-
-    @property
-    def native_value(self) -> Optional[datetime]:
-        """Return time charge complete."""
-        #return datetime.fromisoformat(self._device._device_conf['Device']['LastTimeStamp']).astimezone()
-        return self._api.device.last_seen.replace(tzinfo=timezone.utc).astimezone(tz=None)
-
-    @property
-    def device_info(self):
-        """Return a device description for device registry."""
-        return self._api.device_info
-
-
-
-### Heat Pump temperatures
-class CondensingTemperature(CoordinatorEntity, SensorEntity):
-    """Representation of the condening temperature TH2."""
-
-    def __init__(self, api: MelCloudDevice, device: AtwDevice) -> None:
-        """Initialize device."""
-        super().__init__(api.coordinator)
-        self._api = api
-        self._device = device
-        self._attr_icon = "mdi:thermometer"
-        self._attr_name = f"{api.name} Condensing Temperature"
-        self._attr_unique_id = f"{api.device.serial}-{api.device.mac}-condensing_temperature"
-        self._attr_device_class = SensorDeviceClass.TEMPERATURE
-        self._attr_state_class=SensorStateClass.MEASUREMENT
-        self._attr_native_unit_of_measurement=UnitOfTemperature.CELSIUS
- 
-    @property
-    def native_value(self) -> Optional[datetime]:
-        """Return condensing temperature."""
-        return round(self._device._device_conf['Device']['CondensingTemperature'], 1)   
-
-    @property
-    def device_info(self):
-        """Return a device description for device registry."""
-        return self._api.device_info
-
-class OutdoorTemperature(CoordinatorEntity, SensorEntity):
-    """Representation of the outside temperature TH7."""
-
-    def __init__(self, api: MelCloudDevice, device: AtwDevice) -> None:
-        """Initialize device."""
-        super().__init__(api.coordinator)
-        self._api = api
-        self._device = device
-        self._attr_icon = "mdi:thermometer"
-        self._attr_name = f"{api.name} Outside Temperature"
-        self._attr_unique_id = f"{api.device.serial}-{api.device.mac}-outside_temperature"
-        self._attr_device_class = SensorDeviceClass.TEMPERATURE
-        self._attr_state_class=SensorStateClass.MEASUREMENT
-        self._attr_native_unit_of_measurement=UnitOfTemperature.CELSIUS
- 
-    @property
-    def native_value(self) -> Optional[datetime]:
-        """Return outside temperature."""
-        return round(self._device._device_conf['Device']['OutdoorTemperature'], 1)
-        
-
-    @property
-    def device_info(self):
-        """Return a device description for device registry."""
-        return self._api.device_info
-
-class FlowTemperature(CoordinatorEntity, SensorEntity):
-    """Representation of flow temperature."""
-
-    def __init__(self, api: MelCloudDevice, device: AtwDevice) -> None:
-        """Initialize  device."""
-        super().__init__(api.coordinator)
-        self._api = api
-        self._device = device
-        self._attr_icon = "mdi:thermometer"
-        self._attr_name = f"{api.name} Flow Temperature"
-        self._attr_unique_id = f"{api.device.serial}-{api.device.mac}-flow_temperature"
-        self._attr_device_class = SensorDeviceClass.TEMPERATURE
-        self._attr_state_class=SensorStateClass.MEASUREMENT
-        self._attr_native_unit_of_measurement=UnitOfTemperature.CELSIUS
-    
-
-    @property
-    def native_value(self) -> Optional[datetime]:
-        """Return flow temperature."""
-        return self._device._device_conf['Device']['FlowTemperature']
-        
-
-    @property
-    def device_info(self):
-        """Return a device description for device registry."""
-        return self._api.device_info
-   
-class ReturnTemperature(CoordinatorEntity, SensorEntity):
-    """Representation of return temperature."""
-
-    def __init__(self, api: MelCloudDevice, device: AtwDevice) -> None:
-        """Initialize  device."""
-        super().__init__(api.coordinator)
-        self._api = api
-        self._device = device
-        self._attr_icon = "mdi:thermometer"
-        self._attr_name = f"{api.name} Return Temperature"
-        self._attr_unique_id = f"{api.device.serial}-{api.device.mac}-return_temperature"
-        self._attr_device_class = SensorDeviceClass.TEMPERATURE
-        self._attr_state_class=SensorStateClass.MEASUREMENT
-        self._attr_native_unit_of_measurement=UnitOfTemperature.CELSIUS
-    
-
-    @property
-    def native_value(self) -> Optional[datetime]:
-        """Return return temperature."""
-        return self._device._device_conf['Device']['ReturnTemperature']
-        
-
-    @property
-    def device_info(self):
-        """Return a device description for device registry."""
-        return self._api.device_info
-
-class MixingTankTemperature(CoordinatorEntity, SensorEntity):
-    """Representation of the mixing tank temperature THW10."""
-
-    def __init__(self, api: MelCloudDevice, device: AtwDevice) -> None:
-        """Initialize device."""
-        super().__init__(api.coordinator)
-        self._api = api
-        self._device = device
-        self._attr_icon = "mdi:thermometer"
-        self._attr_name = f"{api.name} Mixing Tank Water Temperature"
-        self._attr_unique_id = f"{api.device.serial}-{api.device.mac}-mixing_tank_water_temperature"
-        self._attr_device_class = SensorDeviceClass.TEMPERATURE
-        self._attr_state_class=SensorStateClass.MEASUREMENT
-        self._attr_native_unit_of_measurement=UnitOfTemperature.CELSIUS
- 
-    @property
-    def available(self) -> bool:
-        """Return True if Zone 1 exists."""
-        return self._device._device_conf['Device']['MixingTankWaterTemperature'] > 25
-
-    @property
-    def native_value(self) -> Optional[datetime]:
-        """Return mixing tank water temperature."""
-        return round(self._device._device_conf['Device']['MixingTankWaterTemperature'], 1)
-        
-    @property
-    def device_info(self):
-        """Return a device description for device registry."""
-        return self._api.device_info
-
-class TankWaterTemperature(CoordinatorEntity, SensorEntity):
-    """Representation of the tank water temperature THW5B."""
-
-    def __init__(self, api: MelCloudDevice, device: AtwDevice) -> None:
-        """Initialize device."""
-        super().__init__(api.coordinator)
-        self._api = api
-        self._device = device
-        self._attr_icon = "mdi:thermometer"
-        self._attr_name = f"{api.name} Tank Temperature"
-        self._attr_unique_id = f"{api.device.serial}-{api.device.mac}-tank_temperature"
-        self._attr_device_class = SensorDeviceClass.TEMPERATURE
-        self._attr_state_class=SensorStateClass.MEASUREMENT
-        self._attr_native_unit_of_measurement=UnitOfTemperature.CELSIUS
- 
-    @property
-    def available(self) -> bool:
-        """Return True if Zone 1 exists."""
-        return self._device._device_conf['Device']['HasHotWaterTank']
-    
-    @property
-    def native_value(self) -> Optional[datetime]:
-        """Return tank temperature."""
-        return self._device._device_conf['Device']['TankWaterTemperature']
-        
-
-    @property
-    def device_info(self):
-        """Return a device description for device registry."""
-        return self._api.device_info
-
-
-### Heat Pump parameters
-class DemandPercentage(CoordinatorEntity, SensorEntity):
-    """Representation of the demand percentage of the heat pump."""
-
-    def __init__(self, api: MelCloudDevice, device: AtwDevice) -> None:
-        """Initialize device."""
-        super().__init__(api.coordinator)
-        self._api = api
-        self._device = device
-        self._attr_icon = "mdi:sine-wave"
-        self._attr_name = f"{api.name} Demand percentage"
-        self._attr_unique_id = f"{api.device.serial}-{api.device.mac}-demand_percentage"
-        self._attr_device_class = SensorDeviceClass.POWER_FACTOR
-        self._attr_state_class=SensorStateClass.MEASUREMENT
-        self._attr_native_unit_of_measurement=PERCENTAGE
-
-    @property
-    def native_value(self) -> Optional[datetime]:
-        """Return mixing tank water temperature."""
-        return self._device._device_conf['Device']['DemandPercentage']
-        
-    @property
-    def device_info(self):
-        """Return a device description for device registry."""
-        return self._api.device_info
-
-class HeatPumpFrequency(CoordinatorEntity, SensorEntity):
-    """Representation of the frequency of the heat pump compressor."""
-
-    def __init__(self, api: MelCloudDevice, device: AtwDevice) -> None:
-        """Initialize device."""
-        super().__init__(api.coordinator)
-        self._api = api
-        self._device = device
-        self._attr_icon = "mdi:sine-wave"
-        self._attr_name = f"{api.name} Heat Pump Frequency"
-        self._attr_unique_id = f"{api.device.serial}-{api.device.mac}-heat_pump_frequency"
-        self._attr_device_class = SensorDeviceClass.FREQUENCY
-        self._attr_state_class=SensorStateClass.MEASUREMENT
-        self._attr_native_unit_of_measurement=UnitOfFrequency.HERTZ
-    
-    @property
-    def native_value(self) -> Optional[datetime]:
-        """Return tank temperature."""
-        return self._device._device_conf['Device']['HeatPumpFrequency']
-        
-
-    @property
-    def device_info(self):
-        """Return a device description for device registry."""
-        return self._api.device_info
-    
-class HeatPumpOperationMode(CoordinatorEntity, SensorEntity):
-    """Representation of the current operation mode of the heat pump."""
-
-    def __init__(self, api: MelCloudDevice, device: AtwDevice) -> None:
-        """Initialize device."""
-        super().__init__(api.coordinator)
-        self._api = api
-        self._device = device
-        self._attr_icon = "mdi:list-box"
-        self._attr_name = f"{api.name} Operation Mode"
-        self._attr_unique_id = f"{api.device.serial}-{api.device.mac}-heat_pump_operation_mode"
-        #self._attr_device_class = SensorDeviceClass.ENUM
-    
-    @property
-    def native_value(self) -> Optional[str]:
-        """Return tank temperature."""
-        return self._device.status
-
-    @property
-    def device_info(self):
-        """Return a device description for device registry."""
-        return self._api.device_info
-     
-class WifiSignal(CoordinatorEntity, SensorEntity):
-    """Representation of the WiFi signal strength."""
-
-    def __init__(self, api: MelCloudDevice, device: AtwDevice) -> None:
-        """Initialize device."""
-        super().__init__(api.coordinator)
-        self._api = api
-        self._device = device
-        self._attr_icon = "mdi:signal"
-        self._attr_name = f"{api.name} WiFi Signal"
-        self._attr_unique_id = f"{api.device.serial}-{api.device.mac}-wifi_signal"
-        self._attr_native_unit_of_measurement=SIGNAL_STRENGTH_DECIBELS_MILLIWATT
-        self._attr_state_class=SensorStateClass.MEASUREMENT
-        self._attr_device_class=SensorDeviceClass.SIGNAL_STRENGTH
-        self._attr_entity_category = EntityCategory.DIAGNOSTIC
-    
-    @property
-    def native_value(self) -> Optional[str]:
-        """Return wifi strength."""
-        return self._device.wifi_signal
-
-    @property
-    def device_info(self):
-        """Return a device description for device registry."""
-        return self._api.device_info
-    
-class ErrorCode(CoordinatorEntity, SensorEntity):
-    """Representation of the WiFi signal strength."""
-
-    def __init__(self, api: MelCloudDevice, device: AtwDevice) -> None:
-        """Initialize device."""
-        super().__init__(api.coordinator)
-        self._api = api
-        self._device = device
-        self._attr_icon = "mdi:alert-circle"
-        self._attr_name = f"{api.name} Error Code"
-        self._attr_unique_id = f"{api.device.serial}-{api.device.mac}-error_code"
-        self._attr_entity_category = EntityCategory.DIAGNOSTIC
-    
-    @property
-    def native_value(self) -> Optional[str]:
-        """Return wifi strength."""
-        return self._device.error_code
-
-    @property
-    def device_info(self):
-        """Return a device description for device registry."""
-        return self._api.device_info
-        
-class ErrorMessage(CoordinatorEntity, SensorEntity):
-    """Representation of the WiFi signal strength."""
-
-    def __init__(self, api: MelCloudDevice, device: AtwDevice) -> None:
-        """Initialize device."""
-        super().__init__(api.coordinator)
-        self._api = api
-        self._device = device
-        self._attr_icon = "mdi:alert-circle"
-        self._attr_name = f"{api.name} Error Message"
-        self._attr_unique_id = f"{api.device.serial}-{api.device.mac}-error_message"
-        self._attr_entity_category = EntityCategory.DIAGNOSTIC
-    
-    @property
-    def native_value(self) -> Optional[str]:
-        """Return error message."""
-        return self._device.error_message
-
-    @property
-    def device_info(self):
-        """Return a device description for device registry."""
-        return self._api.device_info
-
-
-class DefrostMode(CoordinatorEntity, SensorEntity):
-    """Representation of the defrost mode."""
-
-    def __init__(self, api: MelCloudDevice, device: AtwDevice) -> None:
-        """Initialize device."""
-        super().__init__(api.coordinator)
-        self._api = api
-        self._device = device
-        self._attr_icon = "mdi:snowflake-melt"
-        self._attr_name = f"{api.name} Defrost Mode"
-        self._attr_unique_id = f"{api.device.serial}-{api.device.mac}-defrost_mode"
-    
-    @property
-    def native_value(self) -> Optional[str]:
-        """Return tank temperature."""
-        return self._device._device_conf['Device']['DefrostMode']
-        
-
-    @property
-    def device_info(self):
-        """Return a device description for device registry."""
-        return self._api.device_info
- 
-class BoosterHeater1Status(CoordinatorEntity, SensorEntity):
-    """Representation of the booster heater 1 status."""
-
-    def __init__(self, api: MelCloudDevice, device: AtwDevice) -> None:
-        """Initialize device."""
-        super().__init__(api.coordinator)
-        self._api = api
-        self._device = device
-        self._attr_icon = "mdi:lightning-bolt"
-        self._attr_name = f"{api.name} Booster Heater 1 Status"
-        self._attr_unique_id = f"{api.device.serial}-{api.device.mac}-booster_heater_1_status"
-    
-    @property
-    def native_value(self) -> Optional[str]:
-        """Return tank temperature."""
-        if self._device._device_conf['Device']['BoosterHeater1Status']:
-            return "On"
-        return "Off"
-        
-
-    @property
-    def device_info(self):
-        """Return a device description for device registry."""
-        return self._api.device_info
- 
-class BoosterHeater2Status(CoordinatorEntity, SensorEntity):
-    """Representation of the booster heater 2 status."""
-
-    def __init__(self, api: MelCloudDevice, device: AtwDevice) -> None:
-        """Initialize device."""
-        super().__init__(api.coordinator)
-        self._api = api
-        self._device = device
-        self._attr_icon = "mdi:lightning-bolt"
-        self._attr_name = f"{api.name} Booster Heater 2 Status"
-        self._attr_unique_id = f"{api.device.serial}-{api.device.mac}-booster_heater_2_status"
-    
-    @property
-    def native_value(self) -> Optional[str]:
-        """Return tank temperature."""
-        if self._device._device_conf['Device']['BoosterHeater2Status']:
-            return "On"
-        return "Off"
-
-    @property
-    def device_info(self):
-        """Return a device description for device registry."""
-        return self._api.device_info
-  
-class WaterPump1Status(CoordinatorEntity, SensorEntity):
-    """Representation of the water pump 1 status."""
-
-    def __init__(self, api: MelCloudDevice, device: AtwDevice) -> None:
-        """Initialize device."""
-        super().__init__(api.coordinator)
-        self._api = api
-        self._device = device
-        self._attr_name = f"{api.name} Water Pump 1 Status"
-        self._attr_unique_id = f"{api.device.serial}-{api.device.mac}-water_pump_1_status"
-    
-    @property
-    def native_value(self) -> Optional[str]:
-        """Return tank temperature."""
-        if self._device._device_conf['Device']['WaterPump1Status']:
-            return "On"
-        return "Off"
-    
     @property
     def icon(self) -> str | None:
-        if self._device._device_conf['Device']['WaterPump1Status']:
-            return "mdi:pump"
-        return "mdi:pump-off"
-        
+        """Return the icon to use in the frontend."""
+        if (icon_fn := self.entity_description.icon_fn) is not None:
+            return icon_fn(self._api)
+        return super().icon
 
     @property
     def device_info(self):
         """Return a device description for device registry."""
         return self._api.device_info
 
-class WaterPump2Status(CoordinatorEntity, SensorEntity):
-    """Representation of the water pump 2 status."""
-
-    def __init__(self, api: MelCloudDevice, device: AtwDevice) -> None:
-        """Initialize device."""
-        super().__init__(api.coordinator)
-        self._api = api
-        self._device = device
-        self._attr_icon = "mdi:pump"
-        self._attr_name = f"{api.name} Water Pump 2 Status"
-        self._attr_unique_id = f"{api.device.serial}-{api.device.mac}-water_pump_2_status"
-    
-    @property
-    def native_value(self) -> Optional[str]:
-        """Return tank temperature."""
-        if self._device._device_conf['Device']['WaterPump2Status']:
-            return "On"
-        return "Off"
-        
-    @property
-    def icon(self) -> str | None:
-        if self._device._device_conf['Device']['WaterPump2Status']:
-            return "mdi:pump"
-        return "mdi:pump-off"
-
     @property
-    def device_info(self):
-        """Return a device description for device registry."""
-        return self._api.device_info
- 
-class WaterPump3Status(CoordinatorEntity, SensorEntity):
-    """Representation of the water pump 3 status."""
-
-    def __init__(self, api: MelCloudDevice, device: AtwDevice) -> None:
-        """Initialize device."""
-        super().__init__(api.coordinator)
-        self._api = api
-        self._device = device
-        self._attr_name = f"{api.name} Water Pump 3 Status"
-        self._attr_unique_id = f"{api.device.serial}-{api.device.mac}-water_pump_3_status"
-    
-    @property
-    def native_value(self) -> Optional[str]:
-        """Return tank temperature."""
-        if self._device._device_conf['Device']['WaterPump3Status']:
-            return "On"
-        return "Off"
-
-    @property
-    def icon(self) -> str | None:
-        if self._device._device_conf['Device']['WaterPump3Status']:
-            return "mdi:pump"
-        return "mdi:pump-off"
-        
-
-    @property
-    def device_info(self):
-        """Return a device description for device registry."""
-        return self._api.device_info
- 
-class ValveStatus3Way(CoordinatorEntity, SensorEntity):
-    """Representation of the 3 way valve status."""
-
-    def __init__(self, api: MelCloudDevice, device: AtwDevice) -> None:
-        """Initialize device."""
-        super().__init__(api.coordinator)
-        self._api = api
-        self._device = device
-        self._attr_icon = "mdi:pipe-valve"
-        self._attr_name = f"{api.name} 3 Way Valve"
-        self._attr_unique_id = f"{api.device.serial}-{api.device.mac}-valve_status_3_way"
-    
-    @property
-    def native_value(self) -> Optional[str]:
-        """Return tank temperature."""
-        if self._device._device_conf['Device']['ValveStatus3Way']:
-            return "ECS"
-        return "Chauffage"
-        
-
-    @property
-    def device_info(self):
-        """Return a device description for device registry."""
-        return self._api.device_info
- 
-class ForcedHotWaterMode(CoordinatorEntity, SensorEntity):
-    """Representation of the forced hot water mode."""
-
-    def __init__(self, api: MelCloudDevice, device: AtwDevice) -> None:
-        """Initialize device."""
-        super().__init__(api.coordinator)
-        self._api = api
-        self._device = device
-        self._attr_icon = "mdi:thermometer-water"
-        self._attr_name = f"{api.name} Forced Hot Water Mode"
-        self._attr_unique_id = f"{api.device.serial}-{api.device.mac}-forced_hot_water_mode"
-    
-    @property
-    def native_value(self) -> Optional[str]:
-        """Return tank temperature."""
-        if self._device._device_conf['Device']['ForcedHotWaterMode']:
-            return "On"
-        return "Off"  
-
-    @property
-    def device_info(self):
-        """Return a device description for device registry."""
-        return self._api.device_info
- 
- 
-
-
-## Energy
-
-class CurrentEnergyConsumed(CoordinatorEntity, SensorEntity):
-    """Representation of the current energy consumed."""
-
-    def __init__(self, api: MelCloudDevice, device: AtwDevice) -> None:
-        """Initialize device."""
-        super().__init__(api.coordinator)
-        self._api = api
-        self._device = device
-        self._attr_icon = "mdi:factory"
-        self._attr_name = f"{api.name} Current Energy Consumed"
-        self._attr_unique_id = f"{api.device.serial}-{api.device.mac}-current_energy_consumed"
-        self._attr_device_class = SensorDeviceClass.ENERGY
-        self._attr_state_class=SensorStateClass.MEASUREMENT
-        self._attr_native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR
-    
-    @property
-    def native_value(self) -> float:
-        """Return tank temperature."""
-        return self._device._device_conf['Device']['CurrentEnergyConsumed']
-        
-
-    @property
-    def device_info(self):
-        """Return a device description for device registry."""
-        return self._api.device_info
-
-class CurrentEnergyProduced(CoordinatorEntity, SensorEntity):
-    """Representation of the current energy produced."""
-
-    def __init__(self, api: MelCloudDevice, device: AtwDevice) -> None:
-        """Initialize device."""
-        super().__init__(api.coordinator)
-        self._api = api
-        self._device = device
-        self._attr_icon = "mdi:factory"
-        self._attr_name = f"{api.name} Current Energy Produced"
-        self._attr_unique_id = f"{api.device.serial}-{api.device.mac}-current_energy_produced"
-        self._attr_device_class = SensorDeviceClass.ENERGY
-        self._attr_state_class=SensorStateClass.MEASUREMENT
-        self._attr_native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR
-    
-    @property
-    def native_value(self) -> float:
-        """Return tank temperature."""
-        return self._device._device_conf['Device']['CurrentEnergyProduced']
-        
-
-    @property
-    def device_info(self):
-        """Return a device description for device registry."""
-        return self._api.device_info
-  
-class DailyHeatingEnergyConsumed(CoordinatorEntity, SensorEntity):
-    """Representation of the daily heating energy consumed."""
-
-    def __init__(self, api: MelCloudDevice, device: AtwDevice) -> None:
-        """Initialize device."""
-        super().__init__(api.coordinator)
-        self._api = api
-        self._device = device
-        self._attr_icon = "mdi:factory"
-        self._attr_name = f"{api.name} Daily Heating Energy Consumed"
-        self._attr_unique_id = f"{api.device.serial}-{api.device.mac}-daily_heating_energy_consumed"
-        self._attr_device_class = SensorDeviceClass.ENERGY
-        self._attr_state_class=SensorStateClass.TOTAL_INCREASING
-        self._attr_native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR
-    
-    @property
-    def native_value(self) -> float:
-        """Return value."""
-        return self._device._device_conf['Device']['DailyHeatingEnergyConsumed']
-        
-
-    @property
-    def device_info(self):
-        """Return a device description for device registry."""
-        return self._api.device_info
-
-class DailyHeatingEnergyProduced(CoordinatorEntity, SensorEntity):
-    """Representation of the daily heating energy produced."""
-
-    def __init__(self, api: MelCloudDevice, device: AtwDevice) -> None:
-        """Initialize device."""
-        super().__init__(api.coordinator)
-        self._api = api
-        self._device = device
-        self._attr_icon = "mdi:factory"
-        self._attr_name = f"{api.name} Daily Heating Energy Produced"
-        self._attr_unique_id = f"{api.device.serial}-{api.device.mac}-daily_heating_energy_produced"
-        self._attr_device_class = SensorDeviceClass.ENERGY
-        self._attr_state_class=SensorStateClass.MEASUREMENT
-        self._attr_native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR
-    
-    @property
-    def native_value(self) -> float:
-        """Return value."""
-        return self._device._device_conf['Device']['DailyHeatingEnergyProduced']
-        
-
-    @property
-    def device_info(self):
-        """Return a device description for device registry."""
-        return self._api.device_info
-   
-
-class DailyHotWaterEnergyConsumed(CoordinatorEntity, SensorEntity):
-    """Representation of the daily hot water energy consumed."""
-
-    def __init__(self, api: MelCloudDevice, device: AtwDevice) -> None:
-        """Initialize device."""
-        super().__init__(api.coordinator)
-        self._api = api
-        self._device = device
-        self._attr_icon = "mdi:factory"
-        self._attr_name = f"{api.name} Daily Hot Water Energy Consumed"
-        self._attr_unique_id = f"{api.device.serial}-{api.device.mac}-daily_hot_water_energy_consumed"
-        self._attr_device_class = SensorDeviceClass.ENERGY
-        self._attr_state_class=SensorStateClass.MEASUREMENT
-        self._attr_native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR
-    
-    @property
-    def native_value(self) -> float:
-        """Return value."""
-        return self._device._device_conf['Device']['DailyHotWaterEnergyConsumed']
-        
-
-    @property
-    def device_info(self):
-        """Return a device description for device registry."""
-        return self._api.device_info
-
-class DailyHotWaterEnergyProduced(CoordinatorEntity, SensorEntity):
-    """Representation of the daily heating energy produced."""
-
-    def __init__(self, api: MelCloudDevice, device: AtwDevice) -> None:
-        """Initialize device."""
-        super().__init__(api.coordinator)
-        self._api = api
-        self._device = device
-        self._attr_icon = "mdi:factory"
-        self._attr_name = f"{api.name} Daily Hot Water Energy Produced"
-        self._attr_unique_id = f"{api.device.serial}-{api.device.mac}-daily_hot_water_energy_produced"
-        self._attr_device_class = SensorDeviceClass.ENERGY
-        self._attr_state_class=SensorStateClass.MEASUREMENT
-        self._attr_native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR
-    
-    @property
-    def native_value(self) -> float:
-        """Return value."""
-        return self._device._device_conf['Device']['DailyHotWaterEnergyProduced']
-        
-
-    @property
-    def device_info(self):
-        """Return a device description for device registry."""
-        return self._api.device_info
-
-
-class DailyCoolingEnergyConsumed(CoordinatorEntity, SensorEntity):
-    """Representation of the daily cooling energy consumed."""
-
-    def __init__(self, api: MelCloudDevice, device: AtwDevice) -> None:
-        """Initialize device."""
-        super().__init__(api.coordinator)
-        self._api = api
-        self._device = device
-        self._attr_icon = "mdi:factory"
-        self._attr_name = f"{api.name} Daily Cooling Energy Consumed"
-        self._attr_unique_id = f"{api.device.serial}-{api.device.mac}-daily_cooling_energy_consumed"
-        self._attr_device_class = SensorDeviceClass.ENERGY
-        self._attr_state_class=SensorStateClass.MEASUREMENT
-        self._attr_native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR
-    
-    @property
-    def native_value(self) -> float:
-        """Return value."""
-        return self._device._device_conf['Device']['DailyCoolingEnergyConsumed']
-        
-
-    @property
-    def device_info(self):
-        """Return a device description for device registry."""
-        return self._api.device_info
-
-class DailyCoolingEnergyProduced(CoordinatorEntity, SensorEntity):
-    """Representation of the daily cooling energy produced."""
-
-    def __init__(self, api: MelCloudDevice, device: AtwDevice) -> None:
-        """Initialize device."""
-        super().__init__(api.coordinator)
-        self._api = api
-        self._device = device
-        self._attr_icon = "mdi:factory"
-        self._attr_name = f"{api.name} Daily Cooling Energy Produced"
-        self._attr_unique_id = f"{api.device.serial}-{api.device.mac}-daily_cooling_energy_produced"
-        self._attr_device_class = SensorDeviceClass.ENERGY
-        self._attr_state_class=SensorStateClass.MEASUREMENT
-        self._attr_native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR
-    
-    @property
-    def native_value(self) -> float:
-        """Return value."""
-        return self._device._device_conf['Device']['DailyCoolingEnergyProduced']
-        
-
-    @property
-    def device_info(self):
-        """Return a device description for device registry."""
-        return self._api.device_info
-     
-
-
-
-### Zone 1
-class TargetHCTemperatureZone1(CoordinatorEntity, SensorEntity):
-    """Representation of target temperature of Zone 1."""
-
-    def __init__(self, api: MelCloudDevice, device: AtwDevice) -> None:
-        """Initialize  device."""
-        super().__init__(api.coordinator)
-        self._api = api
-        self._device = device
-        self._attr_icon = "mdi:thermometer"
-        self._attr_name = f"{api.name} Zone 1 Target Temperature"
-        self._attr_unique_id = f"{api.device.serial}-{api.device.mac}-zone_1_target_hc_temperature"
-        self._attr_device_class = SensorDeviceClass.TEMPERATURE
-        self._attr_state_class=SensorStateClass.MEASUREMENT
-        self._attr_native_unit_of_measurement=UnitOfTemperature.CELSIUS
-    
-
-    @property
-    def native_value(self) -> Optional[datetime]:
-        """Return target temperature."""
-        return self._device._device_conf['Device']['TargetHCTemperatureZone1']
-        
-
-    @property
-    def device_info(self):
-        """Return a device description for device registry."""
-        return self._api.device_info
-
-class FlowTemperatureZone1(CoordinatorEntity, SensorEntity):
-    """Representation of flow temperature of Zone 1."""
-
-    def __init__(self, api: MelCloudDevice, device: AtwDevice) -> None:
-        """Initialize  device."""
-        super().__init__(api.coordinator)
-        self._api = api
-        self._device = device
-        self._attr_icon = "mdi:thermometer"
-        self._attr_name = f"{api.name} Zone 1 Flow Temperature"
-        self._attr_unique_id = f"{api.device.serial}-{api.device.mac}-zone_1_flow_temperature"
-        self._attr_device_class = SensorDeviceClass.TEMPERATURE
-        self._attr_state_class=SensorStateClass.MEASUREMENT
-        self._attr_native_unit_of_measurement=UnitOfTemperature.CELSIUS
-    
-
-    @property
-    def native_value(self) -> Optional[datetime]:
-        """Return flow temperature."""
-        return self._device._device_conf['Device']['FlowTemperatureZone1']
-        
-
-    @property
-    def device_info(self):
-        """Return a device description for device registry."""
-        return self._api.device_info
-   
-class ReturnTemperatureZone1(CoordinatorEntity, SensorEntity):
-    """Representation of retun temperature of Zone 1."""
-
-    def __init__(self, api: MelCloudDevice, device: AtwDevice) -> None:
-        """Initialize  device."""
-        super().__init__(api.coordinator)
-        self._api = api
-        self._device = device
-        self._attr_icon = "mdi:thermometer"
-        self._attr_name = f"{api.name} Zone 1 Return Temperature"
-        self._attr_unique_id = f"{api.device.serial}-{api.device.mac}-zone_1_return_temperature"
-        self._attr_device_class = SensorDeviceClass.TEMPERATURE
-        self._attr_state_class=SensorStateClass.MEASUREMENT
-        self._attr_native_unit_of_measurement=UnitOfTemperature.CELSIUS
-    
-
-    @property
-    def native_value(self) -> Optional[datetime]:
-        """Return return temperature."""
-        return self._device._device_conf['Device']['ReturnTemperatureZone1']
-        
-
-    @property
-    def device_info(self):
-        """Return a device description for device registry."""
-        return self._api.device_info
-      
-class RoomTemperatureZone1(CoordinatorEntity, SensorEntity):
-    """Representation of flow temperature of Zone 1."""
-
-    def __init__(self, api: MelCloudDevice, device: AtwDevice) -> None:
-        """Initialize  device."""
-        super().__init__(api.coordinator)
-        self._api = api
-        self._device = device
-        self._attr_icon = "mdi:thermometer"
-        self._attr_name = f"{api.name} Zone 1 Room Temperature"
-        self._attr_unique_id = f"{api.device.serial}-{api.device.mac}-zone_1_room_temperature"
-        self._attr_device_class = SensorDeviceClass.TEMPERATURE
-        self._attr_state_class=SensorStateClass.MEASUREMENT
-        self._attr_native_unit_of_measurement=UnitOfTemperature.CELSIUS
-    
-
-    @property
-    def native_value(self) -> Optional[datetime]:
-        """Return flow temperature."""
-        return self._device._device_conf['Device']['RoomTemperatureZone1']
-        
-
-    @property
-    def device_info(self):
-        """Return a device description for device registry."""
-        return self._api.device_info
-
-
-### Zone 2
-class TargetHCTemperatureZone2(CoordinatorEntity, SensorEntity):
-    """Representation of target temperature of Zone 2."""
-
-    def __init__(self, api: MelCloudDevice, device: AtwDevice) -> None:
-        super().__init__(api.coordinator)
-        self._api = api
-        self._device = device
-        self._attr_icon = "mdi:thermometer"
-        self._attr_name = f"{api.name} Zone 2 Target Temperature"
-        self._attr_unique_id = f"{api.device.serial}-{api.device.mac}-zone_2_target_hc_temperature"
-        self._attr_device_class = SensorDeviceClass.TEMPERATURE
-        self._attr_state_class=SensorStateClass.MEASUREMENT
-        self._attr_native_unit_of_measurement=UnitOfTemperature.CELSIUS
-    
-    @property
-    def native_value(self) -> Optional[datetime]:
-        """Return target temperature."""
-        return self._device._device_conf['Device']['TargetHCTemperatureZone2']
-        
-
-    @property
-    def device_info(self):
-        return self._api.device_info
-
-class FlowTemperatureZone2(CoordinatorEntity, SensorEntity):
-    """Representation of flow temperature of Zone 2."""
-
-    def __init__(self, api: MelCloudDevice, device: AtwDevice) -> None:
-        """Initialize  device."""
-        super().__init__(api.coordinator)
-        self._api = api
-        self._device = device
-        self._attr_icon = "mdi:thermometer"
-        self._attr_name = f"{api.name} Zone 2 Flow Temperature"
-        self._attr_unique_id = f"{api.device.serial}-{api.device.mac}-zone_2_flow_temperature"
-        self._attr_device_class = SensorDeviceClass.TEMPERATURE
-        self._attr_state_class=SensorStateClass.MEASUREMENT
-        self._attr_native_unit_of_measurement=UnitOfTemperature.CELSIUS
-    
-
-    @property
-    def native_value(self) -> Optional[datetime]:
-        """Return flow temperature."""
-        return self._device._device_conf['Device']['FlowTemperatureZone2']
-        
+    def extra_state_attributes(self):
+        """Return the optional state attributes."""
+        if (attributes_fn := self.entity_description.attributes_fn) is not None:
+            return attributes_fn(self._api)
+        return None
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the state if the value passes the publish filter.
+
+        A suppressed value is published once the filter lets it through, even if
+        its source keys do not change again in the meantime.
+        """
+        if self._unsub_publish is None and not self._api.has_changed(
+            self._source_keys
+        ):
+            return
+        self._async_publish()
+
+    @callback
+    def _async_publish(self, *_: Any) -> None:
+        """Write the state now or schedule it for when the filter allows it."""
+        if self._unsub_publish is not None:
+            self._unsub_publish()
+            self._unsub_publish = None
+        now = time.monotonic()
+        value = self.native_value
+        delay = self._filter_delay(value, now)
+        if delay is not None:
+            if value != self._published_value:
+                self._unsub_publish = async_call_later(
+                    self.hass, delay, self._async_publish
+                )
+            return
+        self._published_value = value
+        self._published_available = self.available
+        self._published_at = now
+        self.async_write_ha_state()
+
+    def _filter_delay(self, value: Any, now: float) -> float | None:
+        """Return the seconds the value is suppressed for, None if not suppressed.
+
+        A value within the deadband is suppressed until the heartbeat.
+        """
+        publish_filter = self.entity_description.publish_filter
+        last_value = self._published_value
+        if (
+            publish_filter is None
+            or self._published_at is None
+            or self._published_available != self.available
+            or not isinstance(value, (int, float))
+            or not isinstance(last_value, (int, float))
+        ):
+            return None
+
+        elapsed = now - self._published_at
+        heartbeat = publish_filter.heartbeat.total_seconds()
+        if elapsed >= heartbeat:
+            return None
+        min_interval = publish_filter.min_interval.total_seconds()
+        if elapsed < min_interval:
+            return min_interval - elapsed
+        if abs(value - last_value) < publish_filter.deadband:
+            return heartbeat - elapsed
+        return None
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Cancel the pending publish."""
+        if self._unsub_publish is not None:
+            self._unsub_publish()
+            self._unsub_publish = None
+        await super().async_will_remove_from_hass()
+
+
+class FleetSensor(SensorEntity):
+    """Aggregate of the devices of a config entry."""
+
+    _attr_should_poll = False
+    _unrecorded_attributes = frozenset({"by_building"})
 
-    @property
-    def device_info(self):
-        """Return a device description for device registry."""
-        return self._api.device_info
-   
-class ReturnTemperatureZone2(CoordinatorEntity, SensorEntity):
-    """Representation of retun temperature of Zone 1."""
+    def __init__(
+        self,
+        fleet: FleetAggregator,
+        entry,
+        description: SensorEntityDescription,
+    ) -> None:
+        """Initialize the sensor."""
+        self._fleet = fleet
+        self.entity_description = description
 
-    def __init__(self, api: MelCloudDevice, device: AtwDevice) -> None:
-        """Initialize  device."""
-        super().__init__(api.coordinator)
-        self._api = api
-        self._device = device
-        self._attr_icon = "mdi:thermometer"
-        self._attr_name = f"{api.name} Zone 2 Return Temperature"
-        self._attr_unique_id = f"{api.device.serial}-{api.device.mac}-zone_2_return_temperature"
-        self._attr_device_class = SensorDeviceClass.TEMPERATURE
-        self._attr_state_class=SensorStateClass.MEASUREMENT
-        self._attr_native_unit_of_measurement=UnitOfTemperature.CELSIUS
-    
+        self._attr_name = f"MELCloud {entry.title} {description.name}"
+        self._attr_unique_id = f"{entry.entry_id}-fleet-{description.key}"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, entry.entry_id)},
+            manufacturer="Mitsubishi Electric",
+            name=f"MELCloud {entry.title}",
+            entry_type=DeviceEntryType.SERVICE,
+        )
 
     @property
-    def native_value(self) -> Optional[datetime]:
-        """Return return temperature."""
-        return self._device._device_conf['Device']['ReturnTemperatureZone2']
-        
+    def native_value(self):
+        """Return the total over the devices of the entry."""
+        return self._fleet.total(self.entity_description.key)
 
     @property
-    def device_info(self):
-        """Return a device description for device registry."""
-        return self._api.device_info
-      
-class RoomTemperatureZone2(CoordinatorEntity, SensorEntity):
-    """Representation of flow temperature of Zone 1."""
+    def last_reset(self) -> datetime | None:
+        """Return the start of the day of the daily energy totals.
 
-    def __init__(self, api: MelCloudDevice, device: AtwDevice) -> None:
-        """Initialize  device."""
-        super().__init__(api.coordinator)
-        self._api = api
-        self._device = device
-        self._attr_icon = "mdi:thermometer"
-        self._attr_name = f"{api.name} Zone 2 Room Temperature"
-        self._attr_unique_id = f"{api.device.serial}-{api.device.mac}-zone_2_room_temperature"
-        self._attr_device_class = SensorDeviceClass.TEMPERATURE
-        self._attr_state_class=SensorStateClass.MEASUREMENT
-        self._attr_native_unit_of_measurement=UnitOfTemperature.CELSIUS
-    
+        The devices reset their counters around midnight, not all at once. The
+        drops of the devices resetting after the shared boundary are accounted as
+        decreases of the total, which TOTAL allows and TOTAL_INCREASING does not.
+        """
+        if self.entity_description.state_class != SensorStateClass.TOTAL:
+            return None
+        return dt_util.start_of_local_day()
 
     @property
-    def native_value(self) -> Optional[datetime]:
-        """Return flow temperature."""
-        return self._device._device_conf['Device']['RoomTemperatureZone2']
-        
-
-    @property
-    def device_info(self):
-        """Return a device description for device registry."""
-        return self._api.device_info
-  
\ No newline at end of file
+    def extra_state_attributes(self):
+        """Return the totals of each building."""
+        return {"by_building": self._fleet.by_building(self.entity_description.key)}
+
+    async def async_added_to_hass(self) -> None:
+        """Write the state whenever the aggregates change."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self._fleet.async_add_listener(self.async_write_ha_state)
+        )
@@ -0,0 +1,226 @@
+"""Services of the MELCloud integration."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import TYPE_CHECKING, Any
+
+import voluptuous as vol
+
+from homeassistant.const import WEEKDAYS
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+)
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv, device_registry as dr
+
+from .const import DOMAIN, MEL_DEVICES
+from .histograms import HISTOGRAMS
+from .scheduler import PlanStep
+
+if TYPE_CHECKING:
+    from . import MelCloudDevice
+
+_LOGGER = logging.getLogger(__name__)
+
+ATTR_DEVICE_ID = "device_id"
+ATTR_BUILDING_ID = "building_id"
+ATTR_FLOOR_ID = "floor_id"
+ATTR_AREA_ID = "area_id"
+ATTR_PROPERTIES = "properties"
+ATTR_STEPS = "steps"
+ATTR_AT = "at"
+ATTR_WEEKDAYS = "weekdays"
+
+SERVICE_GET_HISTOGRAMS = "get_histograms"
+SERVICE_SET_GROUP = "set_group"
+SERVICE_SET_SCHEDULE = "set_schedule"
+
+GET_HISTOGRAMS_SCHEMA = vol.Schema({vol.Required(ATTR_DEVICE_ID): cv.string})
+SET_GROUP_SCHEMA = vol.All(
+    vol.Schema(
+        {
+            vol.Optional(ATTR_BUILDING_ID): vol.Coerce(int),
+            vol.Optional(ATTR_FLOOR_ID): vol.Coerce(int),
+            vol.Optional(ATTR_AREA_ID): vol.Coerce(int),
+            vol.Required(ATTR_PROPERTIES): vol.All(dict, vol.Length(min=1)),
+        }
+    ),
+    cv.has_at_least_one_key(ATTR_BUILDING_ID, ATTR_FLOOR_ID, ATTR_AREA_ID),
+)
+STEP_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_AT): cv.time,
+        vol.Optional(ATTR_WEEKDAYS, default=WEEKDAYS): cv.weekdays,
+        vol.Required(ATTR_PROPERTIES): vol.All(dict, vol.Length(min=1)),
+    }
+)
+SET_SCHEDULE_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_DEVICE_ID): cv.string,
+        vol.Required(ATTR_STEPS): vol.All(cv.ensure_list, [STEP_SCHEMA]),
+    }
+)
+
+# Writes of a group running at once and delay between the start of two writes.
+GROUP_WRITE_CONCURRENCY = 8
+GROUP_WRITE_INTERVAL = 0.2
+
+RESULT_OK = "ok"
+RESULT_UNCHANGED = "unchanged"
+RESULT_FAILED = "failed"
+
+
+def _find_mel_device(hass: HomeAssistant, device_id: str) -> MelCloudDevice:
+    """Return the MELCloud device of a device registry entry."""
+    device_entry = dr.async_get(hass).async_get(device_id)
+    if device_entry is None:
+        raise HomeAssistantError(f"Unknown device {device_id}")
+    identifiers = {
+        identifier
+        for domain, identifier in device_entry.identifiers
+        if domain == DOMAIN
+    }
+    for entry_data in hass.data.get(DOMAIN, {}).values():
+        for devices in entry_data.get(MEL_DEVICES, {}).values():
+            for mel_device in devices:
+                if mel_device.registry_identifier in identifiers:
+                    return mel_device
+    raise HomeAssistantError(f"Device {device_id} is not a loaded MELCloud device")
+
+
+async def _async_get_histograms(call: ServiceCall) -> ServiceResponse:
+    """Return the frequency and demand distributions of a device in hours."""
+    mel_device = _find_mel_device(call.hass, call.data[ATTR_DEVICE_ID])
+    if mel_device.histograms is None:
+        raise HomeAssistantError(f"{mel_device.name} has no histograms")
+    return {
+        name: mel_device.histograms.distribution(name) for name in HISTOGRAMS
+    }
+
+
+def _find_group(
+    hass: HomeAssistant,
+    building_id: int | None,
+    floor_id: int | None,
+    area_id: int | None,
+) -> list[MelCloudDevice]:
+    """Return the loaded MELCloud devices located in a building, floor or area."""
+    group = []
+    for entry_data in hass.data.get(DOMAIN, {}).values():
+        for devices in entry_data.get(MEL_DEVICES, {}).values():
+            for mel_device in devices:
+                location = mel_device.client.device_locations.get(
+                    mel_device.device_id
+                )
+                if location is None:
+                    continue
+                if (
+                    (building_id is None or location.building_id == building_id)
+                    and (floor_id is None or location.floor_id == floor_id)
+                    and (area_id is None or location.area_id == area_id)
+                ):
+                    group.append(mel_device)
+    return group
+
+
+async def _async_set_group(call: ServiceCall) -> ServiceResponse:
+    """Write the same properties to every device of a building, floor or area.
+
+    The properties are validated against every device before anything is written.
+    Devices already in the requested state are skipped.
+    """
+    properties: dict[str, Any] = call.data[ATTR_PROPERTIES]
+    group = _find_group(
+        call.hass,
+        call.data.get(ATTR_BUILDING_ID),
+        call.data.get(ATTR_FLOOR_ID),
+        call.data.get(ATTR_AREA_ID),
+    )
+    if not group:
+        raise HomeAssistantError("No MELCloud device matches the target")
+
+    writes: list[tuple[MelCloudDevice, dict[str, Any]]] = []
+    for mel_device in group:
+        try:
+            mel_device.device.encode_writes(properties)
+            writes.append((mel_device, mel_device.device.diff_writes(properties)))
+        except (TypeError, ValueError) as ex:
+            raise HomeAssistantError(f"{mel_device.name}: {ex}") from ex
+
+    semaphore = asyncio.Semaphore(GROUP_WRITE_CONCURRENCY)
+
+    async def _async_write(
+        index: int, mel_device: MelCloudDevice, changes: dict[str, Any]
+    ) -> str:
+        # Spread the starts to stay below the MELCloud rate limits.
+        await asyncio.sleep(index * GROUP_WRITE_INTERVAL)
+        async with semaphore:
+            if await mel_device.async_set(changes):
+                return RESULT_OK
+            return RESULT_FAILED
+
+    pending = [(mel_device, changes) for mel_device, changes in writes if changes]
+    results = await asyncio.gather(
+        *(
+            _async_write(index, mel_device, changes)
+            for index, (mel_device, changes) in enumerate(pending)
+        ),
+        return_exceptions=True,
+    )
+    response = {
+        str(mel_device.device_id): {"name": mel_device.name, "result": RESULT_UNCHANGED}
+        for mel_device, changes in writes
+    }
+    for (mel_device, _), result in zip(pending, results):
+        if isinstance(result, BaseException):
+            _LOGGER.warning("Writing to %s failed: %s", mel_device.name, result)
+            result = RESULT_FAILED
+        response[str(mel_device.device_id)]["result"] = result
+    return {"devices": response}
+
+
+async def _async_set_schedule(call: ServiceCall) -> None:
+    """Replace the planned setpoint changes of a device."""
+    mel_device = _find_mel_device(call.hass, call.data[ATTR_DEVICE_ID])
+    if mel_device.schedule_engine is None:
+        raise HomeAssistantError(f"{mel_device.name} cannot be scheduled")
+    steps = [
+        PlanStep(
+            step[ATTR_AT],
+            frozenset(WEEKDAYS.index(weekday) for weekday in step[ATTR_WEEKDAYS]),
+            step[ATTR_PROPERTIES],
+        )
+        for step in call.data[ATTR_STEPS]
+    ]
+    try:
+        mel_device.schedule_engine.async_set_plan(mel_device, steps)
+    except (TypeError, ValueError) as ex:
+        raise HomeAssistantError(f"{mel_device.name}: {ex}") from ex
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the integration services."""
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_HISTOGRAMS,
+        _async_get_histograms,
+        schema=GET_HISTOGRAMS_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SET_GROUP,
+        _async_set_group,
+        schema=SET_GROUP_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SET_SCHEDULE,
+        _async_set_schedule,
+        schema=SET_SCHEDULE_SCHEMA,
+    )
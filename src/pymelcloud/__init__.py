@@ -1,6 +1,6 @@
 """MELCloud client library."""
 from datetime import timedelta
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional
 
 from aiohttp import ClientSession
 
@@ -9,6 +9,7 @@ from .atw_device import AtwDevice
 from .erv_device import ErvDevice
 from .client import Client as _Client
 from .client import login as _login
+from .client import registry as _registry
 from .const import DEVICE_TYPE_ATA, DEVICE_TYPE_ATW, DEVICE_TYPE_ERV
 from .device import Device
 
@@ -24,12 +25,22 @@ async def login(
     return _client.token
 
 
+async def release_client(account: str):
+    """Release the Client shared for an account by get_devices."""
+    await _registry.release(account)
+
+
 async def get_devices(
     token: str,
     session: Optional[ClientSession] = None,
     *,
     conf_update_interval=timedelta(minutes=5),
     device_set_debounce=timedelta(seconds=1),
+    keep_raw_payloads=False,
+    account: Optional[str] = None,
+    energy_report_ttl=timedelta(0),
+    login_data: Optional[Dict[str, Any]] = None,
+    dedicated_session=False,
 ) -> Dict[str, List[Device]]:
     """Initialize Devices available with the token.
 
@@ -40,27 +51,63 @@ async def get_devices(
     Keyword arguments:
         conf_update_interval -- rate limit for fetching device confs. (default = 5 min)
         device_set_debounce -- debounce time for writing device state. (default = 1 s)
+        keep_raw_payloads -- keep raw energy reports next to the decoded snapshots.
+            (default = False)
+        account -- share the Client with every caller passing the same account.
+            Call release_client with the account once the devices are discarded.
+            (default = None, not shared)
+        energy_report_ttl -- cache time of the energy reports. (default = disabled)
+        login_data -- LoginData of a fresh login response, used as account details
+            instead of fetching them. (default = None)
+        dedicated_session -- use a session of the client with a connector tuned
+            for MELCloud instead of the given session. (default = False)
     """
-    _client = _Client(
-        token,
-        session,
-        conf_update_interval=conf_update_interval,
-        device_set_debounce=device_set_debounce,
-    )
-    await _client.update_confs()
+    client_kwargs = {
+        "conf_update_interval": conf_update_interval,
+        "device_set_debounce": device_set_debounce,
+        "energy_report_ttl": energy_report_ttl,
+        "dedicated_session": dedicated_session,
+    }
+    if account is None:
+        _client = _Client(token, session, **client_kwargs)
+    else:
+        _client = _registry.acquire(account, token, session, **client_kwargs)
+    if login_data is not None:
+        _client.seed_account(login_data)
+    try:
+        await _client.update_confs()
+    except BaseException:
+        if account is not None:
+            await _registry.release(account)
+        raise
     return {
         DEVICE_TYPE_ATA: [
-            AtaDevice(conf, _client, set_debounce=device_set_debounce)
+            AtaDevice(
+                conf,
+                _client,
+                set_debounce=device_set_debounce,
+                keep_raw_payloads=keep_raw_payloads,
+            )
             for conf in _client.device_confs
             if conf.get("Device", {}).get("DeviceType") == 0
         ],
         DEVICE_TYPE_ATW: [
-            AtwDevice(conf, _client, set_debounce=device_set_debounce)
+            AtwDevice(
+                conf,
+                _client,
+                set_debounce=device_set_debounce,
+                keep_raw_payloads=keep_raw_payloads,
+            )
             for conf in _client.device_confs
             if conf.get("Device", {}).get("DeviceType") == 1
         ],
         DEVICE_TYPE_ERV: [
-            ErvDevice(conf, _client, set_debounce=device_set_debounce)
+            ErvDevice(
+                conf,
+                _client,
+                set_debounce=device_set_debounce,
+                keep_raw_payloads=keep_raw_payloads,
+            )
             for conf in _client.device_confs
             if conf.get("Device", {}).get("DeviceType") == 3
         ],
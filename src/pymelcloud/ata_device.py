@@ -2,7 +2,13 @@
 from datetime import timedelta
 from typing import Any, Dict, List, Optional
 
-from .device import EFFECTIVE_FLAGS, Device
+from .device import (
+    Device,
+    PropertyCodec,
+    build_codecs,
+    reverse_lookup,
+    round_temperature_encoder,
+)
 from .client import Client
 
 PROPERTY_TARGET_TEMPERATURE = "target_temperature"
@@ -83,11 +89,7 @@ def _operation_mode_from(mode: int) -> str:
     return _OPERATION_MODE_LOOKUP.get(mode, OPERATION_MODE_UNDEFINED)
 
 
-def _operation_mode_to(mode: str) -> int:
-    for k, value in _OPERATION_MODE_LOOKUP.items():
-        if value == mode:
-            return k
-    raise ValueError(f"Invalid operation_mode [{mode}]")
+_operation_mode_to = reverse_lookup(_OPERATION_MODE_LOOKUP, "operation_mode")
 
 
 _H_VANE_POSITION_LOOKUP = {
@@ -106,11 +108,9 @@ def _horizontal_vane_from(position: int) -> str:
     return _H_VANE_POSITION_LOOKUP.get(position, H_VANE_POSITION_UNDEFINED)
 
 
-def _horizontal_vane_to(position: str) -> int:
-    for k, value in _H_VANE_POSITION_LOOKUP.items():
-        if value == position:
-            return k
-    raise ValueError(f"Invalid horizontal vane position [{position}]")
+_horizontal_vane_to = reverse_lookup(
+    _H_VANE_POSITION_LOOKUP, "horizontal vane position"
+)
 
 
 _V_VANE_POSITION_LOOKUP = {
@@ -128,57 +128,68 @@ def _vertical_vane_from(position: int) -> str:
     return _V_VANE_POSITION_LOOKUP.get(position, V_VANE_POSITION_UNDEFINED)
 
 
-def _vertical_vane_to(position: str) -> int:
-    for k, value in _V_VANE_POSITION_LOOKUP.items():
-        if value == position:
-            return k
-    raise ValueError(f"Invalid vertical vane position [{position}]")
+_vertical_vane_to = reverse_lookup(_V_VANE_POSITION_LOOKUP, "vertical vane position")
+
+
+_CODECS = build_codecs(
+    Device._codecs,
+    {
+        PROPERTY_TARGET_TEMPERATURE: PropertyCodec(
+            "SetTemperature", 0x04, round_temperature_encoder
+        ),
+        PROPERTY_OPERATION_MODE: PropertyCodec(
+            "OperationMode",
+            0x02,
+            lambda _, value: _operation_mode_to(value),
+            _operation_mode_from,
+        ),
+        PROPERTY_FAN_SPEED: PropertyCodec(
+            "SetFanSpeed",
+            0x08,
+            lambda _, value: _fan_speed_to(value),
+            _fan_speed_from,
+        ),
+        PROPERTY_VANE_HORIZONTAL: PropertyCodec(
+            "VaneHorizontal",
+            0x100,
+            lambda _, value: _horizontal_vane_to(value),
+            _horizontal_vane_from,
+        ),
+        PROPERTY_VANE_VERTICAL: PropertyCodec(
+            "VaneVertical",
+            0x10,
+            lambda _, value: _vertical_vane_to(value),
+            _vertical_vane_from,
+        ),
+    },
+)
 
 
 class AtaDevice(Device):
     """Air-to-Air device."""
 
+    _codecs = _CODECS
+
     def __init__(
         self,
         device_conf: Dict[str, Any],
         client: Client,
         set_debounce=timedelta(seconds=1),
+        keep_raw_payloads: bool = False,
     ):
         """Initialize an ATA device."""
-        super().__init__(device_conf, client, set_debounce)
+        super().__init__(
+            device_conf,
+            client,
+            set_debounce=set_debounce,
+            keep_raw_payloads=keep_raw_payloads,
+        )
         self.last_energy_value = None
 
-    def apply_write(self, state: Dict[str, Any], key: str, value: Any):
-        """Apply writes to state object.
-
-        Used for property validation, do not modify device state.
-        """
-        flags = state.get(EFFECTIVE_FLAGS, 0)
-
-        if key == PROPERTY_TARGET_TEMPERATURE:
-            state["SetTemperature"] = self.round_temperature(value)
-            flags = flags | 0x04
-        elif key == PROPERTY_OPERATION_MODE:
-            state["OperationMode"] = _operation_mode_to(value)
-            flags = flags | 0x02
-        elif key == PROPERTY_FAN_SPEED:
-            state["SetFanSpeed"] = _fan_speed_to(value)
-            flags = flags | 0x08
-        elif key == PROPERTY_VANE_HORIZONTAL:
-            state["VaneHorizontal"] = _horizontal_vane_to(value)
-            flags = flags | 0x100
-        elif key == PROPERTY_VANE_VERTICAL:
-            state["VaneVertical"] = _vertical_vane_to(value)
-            flags = flags | 0x10
-        else:
-            raise ValueError(f"Cannot set {key}, invalid property")
-
-        state[EFFECTIVE_FLAGS] = flags
-
     @property
     def has_energy_consumed_meter(self) -> bool:
         """Return True if the device has an energy consumption meter."""
-        return self._device_conf.get("Device", {}).get("HasEnergyConsumedMeter", False)
+        return self._device_props.get("HasEnergyConsumedMeter", False)
 
     @property
     def total_energy_consumed(self) -> Optional[float]:
@@ -187,10 +198,7 @@ class AtaDevice(Device):
         The update interval is extremely slow and inconsistent. Empirical evidence
         suggests that it can vary between 1h 30min and 3h.
         """
-        if self._device_conf is None:
-            return None
-        device = self._device_conf.get("Device", {})
-        value = device.get("CurrentEnergyConsumed", None)
+        value = self._device_props.get("CurrentEnergyConsumed", None)
         if value is None:
             return None
 
@@ -224,7 +232,7 @@ class AtaDevice(Device):
         """Return maximum target temperature for the currently active operation mode."""
         if self._state is None:
             return None
-        return self._device_conf.get("Device", {}).get(
+        return self._device_props.get(
             _OPERATION_MODE_MIN_TEMP_LOOKUP.get(self.operation_mode), 10
         )
 
@@ -233,7 +241,7 @@ class AtaDevice(Device):
         """Return maximum target temperature for the currently active operation mode."""
         if self._state is None:
             return None
-        return self._device_conf.get("Device", {}).get(
+        return self._device_props.get(
             _OPERATION_MODE_MAX_TEMP_LOOKUP.get(self.operation_mode), 31
         )
 
@@ -249,7 +257,7 @@ class AtaDevice(Device):
         """Return available operation modes."""
         modes: List[str] = []
 
-        conf_dev = self._device_conf.get("Device", {})
+        conf_dev = self._device_props
         if conf_dev.get("CanHeat", False):
             modes.append(OPERATION_MODE_HEAT)
 
@@ -299,7 +307,7 @@ class AtaDevice(Device):
         if self._state is None:
             return None
         speeds = []
-        if self._device_conf.get("Device", {}).get("HasAutomaticFanSpeed", False):
+        if self._device_props.get("HasAutomaticFanSpeed", False):
             speeds.append(FAN_SPEED_AUTO)
 
         num_fan_speeds = self._state.get("NumberOfFanSpeeds", 0)
@@ -320,7 +328,7 @@ class AtaDevice(Device):
         """Return available horizontal vane positions."""
         if self._device_conf.get("HideVaneControls", False):
             return []
-        device = self._device_conf.get("Device", {})
+        device = self._device_props
         if not device.get("ModelSupportsVaneHorizontal", False):
             return []
 
@@ -350,7 +358,7 @@ class AtaDevice(Device):
         """Return available vertical vane positions."""
         if self._device_conf.get("HideVaneControls", False):
             return []
-        device = self._device_conf.get("Device", {})
+        device = self._device_props
         if not device.get("ModelSupportsVaneVertical", False):
             return []
 
@@ -376,4 +384,4 @@ class AtaDevice(Device):
         """
         if self._state is None:
             return None
-        return str(self._device_conf.get("Device", {}).get("ActualFanSpeed", -1))
+        return str(self._device_props.get("ActualFanSpeed", -1))
@@ -1,7 +1,7 @@
 """Air-To-Water (DeviceType=1) device definition."""
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
-from .device import EFFECTIVE_FLAGS, Device
+from .device import Device, PropertyCodec, build_codecs, round_temperature_encoder
 
 PROPERTY_TARGET_TANK_TEMPERATURE = "target_tank_temperature"
 PROPERTY_OPERATION_MODE = "operation_mode"
@@ -66,23 +66,86 @@ ZONE_STATUS_IDLE = "idle"
 ZONE_STATUS_COOL = "cool"
 ZONE_STATUS_UNKNOWN = "unknown"
 
+_FLOW_TEMPERATURE_FLAG = 0x1000000000000
+
+_CODECS = build_codecs(
+    Device._codecs,
+    {
+        PROPERTY_TARGET_TANK_TEMPERATURE: PropertyCodec(
+            "SetTankWaterTemperature", 0x1000000000020, round_temperature_encoder
+        ),
+        PROPERTY_OPERATION_MODE: PropertyCodec(
+            "ForcedHotWaterMode",
+            0x10000,
+            lambda _, value: value == OPERATION_MODE_FORCE_HOT_WATER,
+            lambda forced: OPERATION_MODE_FORCE_HOT_WATER
+            if forced
+            else OPERATION_MODE_AUTO,
+        ),
+        PROPERTY_ZONE_1_TARGET_TEMPERATURE: PropertyCodec(
+            "SetTemperatureZone1", 0x200000080, round_temperature_encoder
+        ),
+        PROPERTY_ZONE_2_TARGET_TEMPERATURE: PropertyCodec(
+            "SetTemperatureZone2", 0x800000200, round_temperature_encoder
+        ),
+        PROPERTY_ZONE_1_TARGET_HEAT_FLOW_TEMPERATURE: PropertyCodec(
+            "SetHeatFlowTemperatureZone1",
+            _FLOW_TEMPERATURE_FLAG,
+            round_temperature_encoder,
+        ),
+        PROPERTY_ZONE_1_TARGET_COOL_FLOW_TEMPERATURE: PropertyCodec(
+            "SetCoolFlowTemperatureZone1",
+            _FLOW_TEMPERATURE_FLAG,
+            round_temperature_encoder,
+        ),
+        PROPERTY_ZONE_2_TARGET_HEAT_FLOW_TEMPERATURE: PropertyCodec(
+            "SetHeatFlowTemperatureZone2",
+            _FLOW_TEMPERATURE_FLAG,
+            round_temperature_encoder,
+        ),
+        PROPERTY_ZONE_2_TARGET_COOL_FLOW_TEMPERATURE: PropertyCodec(
+            "SetCoolFlowTemperatureZone2",
+            _FLOW_TEMPERATURE_FLAG,
+            round_temperature_encoder,
+        ),
+        PROPERTY_ZONE_1_OPERATION_MODE: PropertyCodec("OperationModeZone1", 0x08),
+        PROPERTY_ZONE_2_OPERATION_MODE: PropertyCodec("OperationModeZone2", 0x10),
+    },
+)
+
 
 class Zone:
     """Zone controlled by Air-to-Water device."""
 
-    def __init__(
-        self,
-        device,
-        device_state: Callable[[], Optional[Dict[Any, Any]]],
-        device_conf: Callable[[], Dict[Any, Any]],
-        zone_index: int,
-    ):
-        """Initialize Zone."""
+    def __init__(self, device: "AtwDevice", zone_index: int):
+        """Initialize Zone.
+
+        The zone reads the current conf and state of the device on every access and
+        can be kept across device updates.
+        """
         self._device = device
-        self._device_state = device_state
-        self._device_conf = device_conf
         self.zone_index = zone_index
 
+        # Zone specific keys and properties are resolved once per zone.
+        self._name_key = f"Zone{zone_index}Name"
+        self._prohibit_key = f"ProhibitZone{zone_index}"
+        self._idle_key = f"IdleZone{zone_index}"
+        self._room_temperature_key = f"RoomTemperatureZone{zone_index}"
+        self._target_temperature_key = f"SetTemperatureZone{zone_index}"
+        self._target_heat_flow_key = f"SetHeatFlowTemperatureZone{zone_index}"
+        self._target_cool_flow_key = f"SetCoolFlowTemperatureZone{zone_index}"
+        self._operation_mode_key = f"OperationModeZone{zone_index}"
+        if zone_index == 1:
+            self._target_temperature_prop = PROPERTY_ZONE_1_TARGET_TEMPERATURE
+            self._target_heat_flow_prop = PROPERTY_ZONE_1_TARGET_HEAT_FLOW_TEMPERATURE
+            self._target_cool_flow_prop = PROPERTY_ZONE_1_TARGET_COOL_FLOW_TEMPERATURE
+            self._operation_mode_prop = PROPERTY_ZONE_1_OPERATION_MODE
+        else:
+            self._target_temperature_prop = PROPERTY_ZONE_2_TARGET_TEMPERATURE
+            self._target_heat_flow_prop = PROPERTY_ZONE_2_TARGET_HEAT_FLOW_TEMPERATURE
+            self._target_cool_flow_prop = PROPERTY_ZONE_2_TARGET_COOL_FLOW_TEMPERATURE
+            self._operation_mode_prop = PROPERTY_ZONE_2_OPERATION_MODE
+
     @property
     def name(self) -> Optional[str]:
         """Return zone name.
@@ -90,7 +153,7 @@ class Zone:
         If a name is not defined, a name is generated using format "Zone n" where "n"
         is the number of the zone.
         """
-        zone_name = self._device_conf().get(f"Zone{self.zone_index}Name")
+        zone_name = self._device._device_conf.get(self._name_key)
         if zone_name is None:
             return f"Zone {self.zone_index}"
         return zone_name
@@ -98,10 +161,10 @@ class Zone:
     @property
     def prohibit(self) -> Optional[bool]:
         """Return prohibit flag of the zone."""
-        state = self._device_state()
+        state = self._device._state
         if state is None:
             return None
-        return state.get(f"ProhibitZone{self.zone_index}")
+        return state.get(self._prohibit_key)
 
     @property
     def status(self) -> str:
@@ -110,10 +173,10 @@ class Zone:
         This is a Air-to-Water device specific property. The value can be - depending
         on the device capabilities - "heat", "cool" or "idle".
         """
-        state = self._device_state()
+        state = self._device._state
         if state is None:
             return ZONE_STATUS_UNKNOWN
-        if state.get(f"IdleZone{self.zone_index}", False):
+        if state.get(self._idle_key, False):
             return ZONE_STATUS_IDLE
 
         op_mode = self.operation_mode
@@ -134,26 +197,22 @@ class Zone:
     @property
     def room_temperature(self) -> Optional[float]:
         """Return room temperature."""
-        state = self._device_state()
+        state = self._device._state
         if state is None:
             return None
-        return state.get(f"RoomTemperatureZone{self.zone_index}")
+        return state.get(self._room_temperature_key)
 
     @property
     def target_temperature(self) -> Optional[float]:
         """Return target temperature."""
-        state = self._device_state()
+        state = self._device._state
         if state is None:
             return None
-        return state.get(f"SetTemperatureZone{self.zone_index}")
+        return state.get(self._target_temperature_key)
 
     async def set_target_temperature(self, target_temperature):
         """Set target temperature for this zone."""
-        if self.zone_index == 1:
-            prop = PROPERTY_ZONE_1_TARGET_TEMPERATURE
-        else:
-            prop = PROPERTY_ZONE_2_TARGET_TEMPERATURE
-        await self._device.set({prop: target_temperature})
+        await self._device.set({self._target_temperature_prop: target_temperature})
 
     @property
     def flow_temperature(self) -> float:
@@ -162,7 +221,7 @@ class Zone:
         This value is not available in the standard state poll response. The poll
         update frequency can be a little bit lower that expected.
         """
-        return self._device_conf()["Device"]["FlowTemperature"]
+        return self._device.get_device_prop("FlowTemperature")
 
     @property
     def return_temperature(self) -> float:
@@ -171,7 +230,7 @@ class Zone:
         This value is not available in the standard state poll response. The poll
         update frequency can be a little bit lower that expected.
         """
-        return self._device_conf()["Device"]["ReturnTemperature"]
+        return self._device.get_device_prop("ReturnTemperature")
 
     @property
     def target_flow_temperature(self) -> Optional[float]:
@@ -191,20 +250,20 @@ class Zone:
     @property
     def target_heat_flow_temperature(self) -> Optional[float]:
         """Return target heat flow temperature."""
-        state = self._device_state()
+        state = self._device._state
         if state is None:
             return None
 
-        return state.get(f"SetHeatFlowTemperatureZone{self.zone_index}")
+        return state.get(self._target_heat_flow_key)
 
     @property
     def target_cool_flow_temperature(self) -> Optional[float]:
         """Return target cool flow temperature."""
-        state = self._device_state()
+        state = self._device._state
         if state is None:
             return None
 
-        return state.get(f"SetCoolFlowTemperatureZone{self.zone_index}")
+        return state.get(self._target_cool_flow_key)
 
     async def set_target_flow_temperature(self, target_flow_temperature):
         """Set target flow temperature for the currently active operation mode."""
@@ -222,30 +281,22 @@ class Zone:
 
     async def set_target_heat_flow_temperature(self, target_flow_temperature):
         """Set target heat flow temperature of this zone."""
-        if self.zone_index == 1:
-            prop = PROPERTY_ZONE_1_TARGET_HEAT_FLOW_TEMPERATURE
-        else:
-            prop = PROPERTY_ZONE_2_TARGET_HEAT_FLOW_TEMPERATURE
-        await self._device.set({prop: target_flow_temperature})
+        await self._device.set({self._target_heat_flow_prop: target_flow_temperature})
 
     async def set_target_cool_flow_temperature(self, target_flow_temperature):
         """Set target cool flow temperature of this zone."""
-        if self.zone_index == 1:
-            prop = PROPERTY_ZONE_1_TARGET_COOL_FLOW_TEMPERATURE
-        else:
-            prop = PROPERTY_ZONE_2_TARGET_COOL_FLOW_TEMPERATURE
-        await self._device.set({prop: target_flow_temperature})
+        await self._device.set({self._target_cool_flow_prop: target_flow_temperature})
 
     @property
     def operation_mode(self) -> Optional[str]:
         """Return current operation mode."""
-        state = self._device_state()
+        state = self._device._state
         if state is None:
             return None
 
         ##print(state)
 
-        mode = state.get(f"OperationModeZone{self.zone_index}")
+        mode = state.get(self._operation_mode_key)
         if not isinstance(mode, int):
             raise ValueError(f"Invalid operation mode [{mode}]")
 
@@ -258,7 +309,7 @@ class Zone:
     def operation_modes(self) -> List[str]:
         """Return list of available operation modes."""
         modes = []
-        device = self._device_conf().get("Device", {})
+        device = self._device._device_props
         if device.get("CanHeat", False):
             modes += [
                 ZONE_OPERATION_MODE_HEAT_THERMOSTAT,
@@ -274,7 +325,7 @@ class Zone:
 
     async def set_operation_mode(self, mode: str):
         """Change operation mode."""
-        state = self._device_state()
+        state = self._device._state
         if state is None:
             return
 
@@ -282,55 +333,28 @@ class Zone:
         if int_mode is None:
             raise ValueError(f"Invalid mode '{mode}'")
 
-        if self.zone_index == 1:
-            prop = PROPERTY_ZONE_1_OPERATION_MODE
-        else:
-            prop = PROPERTY_ZONE_2_OPERATION_MODE
-
-        await self._device.set({prop: int_mode})
+        await self._device.set({self._operation_mode_prop: int_mode})
 
 
 class AtwDevice(Device):
     """Air-to-Water device."""
 
-    def apply_write(self, state: Dict[str, Any], key: str, value: Any):
-        """Apply writes to state object."""
-        flags = state.get(EFFECTIVE_FLAGS, 0)
-
-        if key == PROPERTY_TARGET_TANK_TEMPERATURE:
-            state["SetTankWaterTemperature"] = self.round_temperature(value)
-            flags |= 0x1000000000020
-        elif key == PROPERTY_OPERATION_MODE:
-            state["ForcedHotWaterMode"] = value == OPERATION_MODE_FORCE_HOT_WATER
-            flags |= 0x10000
-        elif key == PROPERTY_ZONE_1_TARGET_TEMPERATURE:
-            state["SetTemperatureZone1"] = self.round_temperature(value)
-            flags |= 0x200000080
-        elif key == PROPERTY_ZONE_2_TARGET_TEMPERATURE:
-            state["SetTemperatureZone2"] = self.round_temperature(value)
-            flags |= 0x800000200
-        elif key == PROPERTY_ZONE_1_TARGET_HEAT_FLOW_TEMPERATURE:
-            state["SetHeatFlowTemperatureZone1"] = self.round_temperature(value)
-            flags |= 0x1000000000000
-        elif key == PROPERTY_ZONE_1_TARGET_COOL_FLOW_TEMPERATURE:
-            state["SetCoolFlowTemperatureZone1"] = self.round_temperature(value)
-            flags |= 0x1000000000000
-        elif key == PROPERTY_ZONE_2_TARGET_HEAT_FLOW_TEMPERATURE:
-            state["SetHeatFlowTemperatureZone2"] = self.round_temperature(value)
-            flags |= 0x1000000000000
-        elif key == PROPERTY_ZONE_2_TARGET_COOL_FLOW_TEMPERATURE:
-            state["SetCoolFlowTemperatureZone2"] = self.round_temperature(value)
-            flags |= 0x1000000000000
-        elif key == PROPERTY_ZONE_1_OPERATION_MODE:
-            state["OperationModeZone1"] = value
-            flags |= 0x08
-        elif key == PROPERTY_ZONE_2_OPERATION_MODE:
-            state["OperationModeZone2"] = value
-            flags |= 0x10
-        else:
-            raise ValueError(f"Cannot set {key}, invalid property")
+    _codecs = _CODECS
+
+    _zones: Optional[List[Zone]] = None
+    _zones_signature: Optional[Tuple[bool, bool]] = None
 
-        state[EFFECTIVE_FLAGS] = flags
+    def _bind_conf(self, device_conf: Dict[str, Any]):
+        """Bind a new device conf and drop the zones if the zone layout changed."""
+        super()._bind_conf(device_conf)
+        device = self._device_props
+        signature = (
+            bool(device.get("HasThermostatZone1", False)),
+            bool(device.get("HasZone2") and device.get("HasThermostatZone2", False)),
+        )
+        if signature != self._zones_signature:
+            self._zones_signature = signature
+            self._zones = None
 
     @property
     def tank_temperature(self) -> Optional[float]:
@@ -388,18 +412,19 @@ class AtwDevice(Device):
     def zones(self) -> Optional[List[Zone]]:
         """Return zones controlled by this device.
 
-        Zones without a thermostat are not returned.
+        Zones without a thermostat are not returned. The zones are built once and
+        kept until the zone layout of the device conf changes.
         """
-        _zones = []
-
-        device = self._device_conf.get("Device", {})
-        if device.get("HasThermostatZone1", False):
-            _zones.append(Zone(self, lambda: self._state, lambda: self._device_conf, 1))
-
-        if device.get("HasZone2") and device.get("HasThermostatZone2", False):
-            _zones.append(Zone(self, lambda: self._state, lambda: self._device_conf, 2))
-
-        return _zones
+        if self._zones is None:
+            has_zone_1, has_zone_2 = self._zones_signature or (False, False)
+            _zones = []
+            if has_zone_1:
+                _zones.append(Zone(self, 1))
+            if has_zone_2:
+                _zones.append(Zone(self, 2))
+            self._zones = _zones
+
+        return self._zones
 
     @property
     def status(self) -> Optional[str]:
@@ -1,11 +1,60 @@
 """MEL API access."""
-from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional
+import asyncio
+import hashlib
+import json
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
 
-from aiohttp import ClientSession
+from aiohttp import ClientResponseError, ClientSession, TCPConnector
+from multidict import CIMultiDict, CIMultiDictProxy
+
+from .snapshot import PayloadSnapshot, UnitSnapshot, decode_payload, decode_units
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
 
 BASE_URL = "https://app.melcloud.com/Mitsubishi.Wifi.Client"
 
+# Connector tuning of sessions created by the client. All the requests go to a
+# single host, the connections are kept alive across the 60 s poll interval.
+CONNECTOR_LIMIT = 8
+CONNECTOR_DNS_CACHE_TTL = 300
+CONNECTOR_KEEPALIVE_TIMEOUT = 75
+
+
+def _frozen_headers(token: str, content_type: Optional[str] = None) -> CIMultiDictProxy:
+    """Return the headers of a token in the form aiohttp merges without copying."""
+    headers = CIMultiDict(_headers(token))
+    if content_type is not None:
+        headers["Content-Type"] = content_type
+    return CIMultiDictProxy(headers)
+
+
+def json_loads(data: bytes) -> Any:
+    """Decode a JSON document from bytes, using orjson when available."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_dumps(obj: Any) -> bytes:
+    """Encode a JSON document to bytes, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":")).encode()
+
+
+def _create_session() -> ClientSession:
+    return ClientSession(
+        connector=TCPConnector(
+            limit=CONNECTOR_LIMIT,
+            ttl_dns_cache=CONNECTOR_DNS_CACHE_TTL,
+            keepalive_timeout=CONNECTOR_KEEPALIVE_TIMEOUT,
+        )
+    )
+
 
 def _headers(token: str) -> Dict[str, str]:
     return {
@@ -61,6 +110,17 @@ async def login(
     )
 
 
+class DeviceLocation(NamedTuple):
+    """Place of a device in the building structure of ListDevices."""
+
+    building_id: Optional[int]
+    building_name: Optional[str]
+    floor_id: Optional[int]
+    floor_name: Optional[str]
+    area_id: Optional[int]
+    area_name: Optional[str]
+
+
 class Client:
     """MELCloud client.
 
@@ -76,67 +136,207 @@ class Client:
         user_update_interval=timedelta(minutes=5),
         conf_update_interval=timedelta(seconds=59),
         device_set_debounce=timedelta(seconds=1),
+        energy_report_ttl=timedelta(0),
+        dedicated_session=False,
+        loads: Callable[[bytes], Any] = json_loads,
+        dumps: Callable[[Any], bytes] = json_dumps,
     ):
-        """Initialize MELCloud client."""
+        """Initialize MELCloud client.
+
+        The energy report of the default date range of a device is fetched at most
+        once per energy_report_ttl, the limit is disabled by default.
+
+        Without a session, or with dedicated_session, the client creates its own
+        session with a connector tuned for MELCloud and closes it in close().
+
+        Request and response bodies are encoded with dumps and decoded with loads,
+        both working on bytes.
+        """
         self._token = token
-        if session:
+        self._headers = _frozen_headers(token)
+        self._json_headers = _frozen_headers(token, "application/json")
+        self._loads = loads
+        self._dumps = dumps
+        if session and not dedicated_session:
             self._session = session
             self._managed_session = False
         else:
-            self._session = ClientSession()
+            self._session = _create_session()
             self._managed_session = True
         self._user_update_interval = user_update_interval
         self._conf_update_interval = conf_update_interval
         self._device_set_debounce = device_set_debounce
+        self._energy_report_ttl = energy_report_ttl
+
+        self._conf_lock = asyncio.Lock()
+        # Digest and decoded object of the last body per endpoint and device. The
+        # decoded objects are the ones held by the devices and device_confs.
+        self._bodies: Dict[Any, Tuple[bytes, Any]] = {}
+        self._units: Dict[Any, Tuple[UnitSnapshot, ...]] = {}
+        # Body digest, generation and fetch time of the energy report per device.
+        # The reports themselves are not kept, only their digest.
+        self._energy_reports: Dict[Any, Tuple[bytes, int, datetime]] = {}
 
         self._last_user_update = None
         self._last_conf_update = None
         self._device_confs: List[Dict[str, Any]] = []
+        self._device_locations: Dict[Any, DeviceLocation] = {}
         self._account: Optional[Dict[str, Any]] = None
 
+        self._request_counts: Dict[str, int] = {}
+        self._cache_hits: Dict[str, int] = {}
+        self._cache_misses: Dict[str, int] = {}
+
     @property
     def token(self) -> str:
         """Return currently used token."""
         return self._token
 
+    @token.setter
+    def token(self, token: str):
+        """Replace the token, for example after a refresh."""
+        self._token = token
+        self._headers = _frozen_headers(token)
+        self._json_headers = _frozen_headers(token, "application/json")
+
     @property
     def device_confs(self) -> List[Dict[Any, Any]]:
         """Return device configurations."""
         return self._device_confs
 
+    @property
+    def device_locations(self) -> Dict[Any, "DeviceLocation"]:
+        """Return the building, floor and area of the devices by device id."""
+        return self._device_locations
+
     @property
     def account(self) -> Optional[Dict[Any, Any]]:
         """Return account."""
         return self._account
 
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Return request counters and cache hit rates.
+
+        Reading the stats never triggers a request to MELCloud.
+        """
+        cache = {}
+        for name in set(self._cache_hits) | set(self._cache_misses):
+            hits = self._cache_hits.get(name, 0)
+            misses = self._cache_misses.get(name, 0)
+            cache[name] = {
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": hits / (hits + misses) if hits + misses else None,
+            }
+        return {
+            "requests": dict(self._request_counts),
+            "cache": cache,
+            "last_conf_update": self._last_conf_update,
+            "last_user_update": self._last_user_update,
+        }
+
+    async def _read_json(self, resp) -> Any:
+        """Decode a response body straight from its bytes."""
+        body = await resp.read()
+        if not body.strip():
+            return None
+        return self._loads(body)
+
+    async def _read_json_cached(
+        self, resp, key: Any, decode: Optional[Callable[[Any], Any]] = None
+    ) -> Tuple[Any, bool]:
+        """Decode a response body unless it is identical to the previous one.
+
+        Returns the decoded object and whether the body changed. An unchanged body
+        returns the very same object as the previous call for the key, letting the
+        callers skip their own processing by identity. The optional decode turns
+        the JSON into the object kept and returned instead.
+        """
+        body = await resp.read()
+        digest = hashlib.blake2b(body, digest_size=16).digest()
+        previous = self._bodies.get(key)
+        if previous is not None and previous[0] == digest:
+            self._count_cache("unchanged_body", True)
+            return previous[1], False
+
+        self._count_cache("unchanged_body", False)
+        decoded = self._loads(body) if body.strip() else None
+        if decode is not None:
+            decoded = decode(decoded)
+        self._bodies[key] = (digest, decoded)
+        return decoded, True
+
+    def _count_request(self, endpoint: str):
+        self._request_counts[endpoint] = self._request_counts.get(endpoint, 0) + 1
+
+    def _count_cache(self, name: str, hit: bool):
+        counters = self._cache_hits if hit else self._cache_misses
+        counters[name] = counters.get(name, 0) + 1
+
     async def _fetch_user_details(self):
         """Fetch user details."""
+        self._count_request("User/GetUserDetails")
         async with self._session.get(
             f"{BASE_URL}/User/GetUserDetails",
-            headers=_headers(self._token),
+            headers=self._headers,
             raise_for_status=True,
         ) as resp:
-            self._account = await resp.json()
+            self._account, _ = await self._read_json_cached(
+                resp, "User/GetUserDetails"
+            )
 
     async def _fetch_device_confs(self):
         """Fetch all configured devices."""
         url = f"{BASE_URL}/User/ListDevices"
+        self._count_request("User/ListDevices")
         async with self._session.get(
-            url, headers=_headers(self._token), raise_for_status=True
+            url, headers=self._headers, raise_for_status=True
         ) as resp:
-            entries = await resp.json()
-            new_devices = []
+            entries, changed = await self._read_json_cached(resp, "User/ListDevices")
+            if entries is None:
+                # Process the next body even if it is empty again.
+                del self._bodies["User/ListDevices"]
+                raise ClientResponseError(
+                    resp.request_info,
+                    resp.history,
+                    status=resp.status,
+                    message="Empty ListDevices response",
+                )
+            if not changed:
+                return
+            new_devices: List[Dict[str, Any]] = []
+            locations: Dict[Any, DeviceLocation] = {}
+
+            def _add(devices, entry, floor=None, area=None):
+                location = DeviceLocation(
+                    entry.get("ID"),
+                    entry.get("Name"),
+                    floor.get("ID") if floor else None,
+                    floor.get("Name") if floor else None,
+                    area.get("ID") if area else None,
+                    area.get("Name") if area else None,
+                )
+                for device in devices:
+                    # The nested device properties are the bulk of the conf.
+                    props = device.get("Device")
+                    if props is not None:
+                        device["Device"] = PayloadSnapshot(props)
+                    new_devices.append(device)
+                    locations.setdefault(device["DeviceID"], location)
+
             for entry in entries:
-                new_devices = new_devices + entry["Structure"]["Devices"]
+                structure = entry["Structure"]
+                _add(structure["Devices"], entry)
 
-                for area in entry["Structure"]["Areas"]:
-                    new_devices = new_devices + area["Devices"]
+                for area in structure["Areas"]:
+                    _add(area["Devices"], entry, area=area)
 
-                for floor in entry["Structure"]["Floors"]:
-                    new_devices = new_devices + floor["Devices"]
+                for floor in structure["Floors"]:
+                    _add(floor["Devices"], entry, floor=floor)
 
                     for area in floor["Areas"]:
-                        new_devices = new_devices + area["Devices"]
+                        _add(area["Devices"], entry, floor=floor, area=area)
 
             visited = set()
             self._device_confs = [
@@ -144,82 +344,200 @@ class Client:
                 for d in new_devices
                 if d["DeviceID"] not in visited and not visited.add(d["DeviceID"])
             ]
+            self._device_locations = locations
+            self._prune_device_caches(visited)
+
+    def _prune_device_caches(self, device_ids):
+        """Forget the cached bodies of the devices no longer listed."""
+        self._bodies = {
+            key: value
+            for key, value in self._bodies.items()
+            if not isinstance(key, tuple) or key[1] in device_ids
+        }
+        self._units = {
+            key: value for key, value in self._units.items() if key in device_ids
+        }
+        self._energy_reports = {
+            key: value
+            for key, value in self._energy_reports.items()
+            if key in device_ids
+        }
+
+    def seed_account(self, login_data: Dict[str, Any]):
+        """Use the LoginData of a login response as account details.
+
+        The login response carries the same user settings as GetUserDetails, the
+        details are refreshed after the user update interval as usual.
+        """
+        if self._account is None:
+            self._account = login_data
+            self._last_user_update = datetime.now()
+
+    async def close(self):
+        """Close the session if it is managed by the client."""
+        self._bodies = {}
+        self._units = {}
+        self._energy_reports = {}
+        if self._managed_session:
+            await self._session.close()
 
     async def update_confs(self):
         """Update device_confs and account.
 
         Calls are rate limited to allow Device instances to freely poll their own
-        state while refreshing the device_confs list and account.
+        state while refreshing the device_confs list and account. Concurrent calls
+        wait for the fetch already in progress.
         """
+        async with self._conf_lock:
+            await self._update_confs()
+
+    async def _update_confs(self):
         now = datetime.now()
 
         if (
             self._last_conf_update is None
             or now - self._last_conf_update > self._conf_update_interval
         ):
+            self._count_cache("device_confs", False)
             await self._fetch_device_confs()
             self._last_conf_update = now
+        else:
+            self._count_cache("device_confs", True)
 
         if (
             self._last_user_update is None
             or now - self._last_user_update > self._user_update_interval
         ):
+            self._count_cache("account", False)
             await self._fetch_user_details()
             self._last_user_update = now
+        else:
+            self._count_cache("account", True)
 
-    async def fetch_device_units(self, device) -> Optional[Dict[Any, Any]]:
+    async def fetch_device_units(self, device) -> Tuple[UnitSnapshot, ...]:
         """Fetch unit information for a device.
 
         User provided info such as indoor/outdoor unit model names and
-        serial numbers.
+        serial numbers. The units do not change, they are fetched once per device
+        and only their decoded snapshots are kept.
         """
+        device_id = device.device_id
+        if device_id in self._units:
+            self._count_cache("device_units", True)
+            return self._units[device_id]
+
+        self._count_cache("device_units", False)
+        self._count_request("Device/ListDeviceUnits")
         async with self._session.post(
             f"{BASE_URL}/Device/ListDeviceUnits",
-            headers=_headers(self._token),
-            json={"deviceId": device.device_id},
+            headers=self._json_headers,
+            data=self._dumps({"deviceId": device_id}),
             raise_for_status=True,
         ) as resp:
-            return await resp.json()
+            units = decode_units(await self._read_json(resp))
+        self._units[device_id] = units
+        return units
 
-    async def fetch_device_state(self, device) -> Optional[Dict[Any, Any]]:
+    async def fetch_device_state(self, device) -> Optional[PayloadSnapshot]:
         """Fetch state information of a device.
 
         This method should not be called more than once a minute. Rate
-        limiting is left to the caller.
+        limiting is left to the caller. An unchanged state returns the same object
+        as the previous call.
         """
         device_id = device.device_id
         building_id = device.building_id
+        self._count_request("Device/Get")
         async with self._session.get(
             f"{BASE_URL}/Device/Get?id={device_id}&buildingID={building_id}",
-            headers=_headers(self._token),
+            headers=self._headers,
             raise_for_status=True,
         ) as resp:
-            return await resp.json()
+            state, _ = await self._read_json_cached(
+                resp, ("Device/Get", device_id), decode_payload
+            )
+            return state
+
+    async def fetch_energy_report(
+        self,
+        device,
+        from_date: Optional[date] = None,
+        to_date: Optional[date] = None,
+    ) -> Optional[Dict[Any, Any]]:
+        """Fetch energy report of a date range.
 
-    async def fetch_energy_report(self, device) -> Optional[Dict[Any, Any]]:
-        """Fetch energy report containing today and 1-2 days from the past."""
+        The default range contains today and 1-2 days from the past.
+        """
+        today = datetime.today()
+        if from_date is None:
+            from_date = today - timedelta(days=2)
+        if to_date is None:
+            to_date = today + timedelta(days=2)
         device_id = device.device_id
-        from_str = (datetime.today() - timedelta(days=2)).strftime("%Y-%m-%d")
-        to_str = (datetime.today() + timedelta(days=2)).strftime("%Y-%m-%d")
+        async with self._post_energy_report(device_id, from_date, to_date) as resp:
+            return await self._read_json(resp)
 
-        async with self._session.post(
+    async def fetch_energy_report_update(
+        self, device, generation: int
+    ) -> Tuple[int, Optional[Dict[Any, Any]]]:
+        """Fetch the energy report of the default range if it changed.
+
+        Returns the generation of the current report and the report, or None if the
+        report did not change since the given generation. Reports are fetched at
+        most once per energy report TTL and are not kept by the client.
+        """
+        device_id = device.device_id
+        today = datetime.today()
+        cached = self._energy_reports.get(device_id)
+        if (
+            cached is not None
+            and cached[1] == generation
+            and today - cached[2] < self._energy_report_ttl
+        ):
+            self._count_cache("energy_report", True)
+            return generation, None
+        self._count_cache("energy_report", False)
+
+        async with self._post_energy_report(
+            device_id, today - timedelta(days=2), today + timedelta(days=2)
+        ) as resp:
+            body = await resp.read()
+        digest = hashlib.blake2b(body, digest_size=16).digest()
+        if cached is not None and cached[0] == digest:
+            self._energy_reports[device_id] = (digest, cached[1], today)
+            if cached[1] == generation:
+                self._count_cache("unchanged_body", True)
+                return generation, None
+            current = cached[1]
+        else:
+            current = cached[1] + 1 if cached is not None else 1
+            self._energy_reports[device_id] = (digest, current, today)
+        self._count_cache("unchanged_body", False)
+        return current, self._loads(body) if body.strip() else None
+
+    def _post_energy_report(self, device_id, from_date: date, to_date: date):
+        self._count_request("EnergyCost/Report")
+        from_str = from_date.strftime("%Y-%m-%d")
+        to_str = to_date.strftime("%Y-%m-%d")
+        return self._session.post(
             f"{BASE_URL}/EnergyCost/Report",
-            headers=_headers(self._token),
-            json={
-                "DeviceId": device_id,
-                "UseCurrency": False,
-                "FromDate": f"{from_str}T00:00:00",
-                "ToDate": f"{to_str}T00:00:00"
-            },
+            headers=self._json_headers,
+            data=self._dumps(
+                {
+                    "DeviceId": device_id,
+                    "UseCurrency": False,
+                    "FromDate": f"{from_str}T00:00:00",
+                    "ToDate": f"{to_str}T00:00:00",
+                }
+            ),
             raise_for_status=True,
-        ) as resp:
-            return await resp.json()
+        )
 
-    async def set_device_state(self, device):
+    async def set_device_state(self, device) -> Optional[PayloadSnapshot]:
         """Update device state.
 
         This method is as dumb as it gets. Device is responsible for updating
-        the state and managing EffectiveFlags.
+        the state and managing EffectiveFlags. Returns the updated state.
         """
         device_type = device.get("DeviceType")
         if device_type == 0:
@@ -231,10 +549,64 @@ class Client:
         else:
             raise ValueError(f"Unsupported device type [{device_type}]")
 
+        self._count_request(f"Device/{setter}")
         async with self._session.post(
             f"{BASE_URL}/Device/{setter}",
-            headers=_headers(self._token),
-            json=device,
+            headers=self._json_headers,
+            data=self._dumps(device),
             raise_for_status=True,
         ) as resp:
-            return await resp.json()
+            return decode_payload(await self._read_json(resp))
+
+
+class ClientRegistry:
+    """Reference counted Client instances shared per MELCloud account.
+
+    Every user of an account acquires the client and releases it once done. The
+    client, its caches and rate limits live until the last user releases it.
+    """
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self._clients: Dict[str, Client] = {}
+        self._refs: Dict[str, int] = {}
+
+    def acquire(
+        self,
+        account: str,
+        token: str,
+        session: Optional[ClientSession] = None,
+        **kwargs,
+    ) -> Client:
+        """Return the client of an account, creating it if needed.
+
+        The keyword arguments are passed to Client when the client is created. A
+        different token replaces the token of the shared client.
+        """
+        client = self._clients.get(account)
+        if client is None:
+            client = Client(token, session, **kwargs)
+            self._clients[account] = client
+            self._refs[account] = 0
+        elif client.token != token:
+            client.token = token
+        self._refs[account] += 1
+        return client
+
+    async def release(self, account: str):
+        """Release a client acquired for an account, closing it on last release."""
+        refs = self._refs.get(account)
+        if refs is None:
+            return
+        if refs > 1:
+            self._refs[account] = refs - 1
+            return
+        del self._refs[account]
+        await self._clients.pop(account).close()
+
+    def get(self, account: str) -> Optional[Client]:
+        """Return the client of an account without acquiring it."""
+        return self._clients.get(account)
+
+
+registry = ClientRegistry()
@@ -1,11 +1,23 @@
 """Base MELCloud device."""
 import asyncio
-from abc import ABC, abstractmethod
+import math
+from abc import ABC
 from datetime import datetime, timedelta, timezone
 from decimal import Decimal, ROUND_HALF_UP
-from typing import Any, Dict, List, Optional
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
 
 from .client import Client
+from .snapshot import EnergyReportSnapshot, PayloadSnapshot, UnitSnapshot
 from .const import (
     DEVICE_TYPE_LOOKUP,
     DEVICE_TYPE_UNKNOWN,
@@ -20,16 +32,115 @@ EFFECTIVE_FLAGS = "EffectiveFlags"
 HAS_PENDING_COMMAND = "HasPendingCommand"
 
 
+class PropertyCodec(NamedTuple):
+    """Mapping of a writable property to a key of the device state.
+
+    encode receives the device and the property value and returns the state value.
+    decode converts a state value back to the property value. Either can be left
+    out when the value is stored as is.
+    """
+
+    state_key: str
+    flag: int
+    encode: Optional[Callable[["Device", Any], Any]] = None
+    decode: Optional[Callable[[Any], Any]] = None
+
+
+def build_codecs(*tables: Mapping[str, PropertyCodec]) -> Dict[str, PropertyCodec]:
+    """Merge codec tables, later tables overriding earlier ones."""
+    codecs: Dict[str, PropertyCodec] = {}
+    for table in tables:
+        codecs.update(table)
+    return codecs
+
+
+def reverse_lookup(lookup: Mapping[int, str], name: str) -> Callable[[str], int]:
+    """Return an O(1) inverse of a state value lookup table."""
+    reverse = {value: key for key, value in lookup.items()}
+
+    def _to(value: str) -> int:
+        try:
+            return reverse[value]
+        except (KeyError, TypeError):
+            raise ValueError(f"Invalid {name} [{value}]") from None
+
+    return _to
+
+
+def round_temperature_encoder(device: "Device", value: Any) -> float:
+    """Encode a temperature rounded to the increment of the device."""
+    return device.round_temperature(value)
+
+
+def _round_half_up(value: float, increment: float) -> float:
+    """Round value to a multiple of increment with ROUND_HALF_UP semantics.
+
+    The shortest repr of a float can only end in .5 when the float is an exact
+    half, so comparing the exact fractional part of the quotient gives the same
+    result as quantizing Decimal(str(quotient)).
+    """
+    quotient = value / increment
+    if not math.isfinite(quotient):
+        return float(
+            Decimal(str(quotient)).quantize(Decimal("1"), rounding=ROUND_HALF_UP)
+        ) * increment
+    magnitude = abs(quotient)
+    steps = math.floor(magnitude)
+    if magnitude - steps >= 0.5:
+        steps += 1
+    return math.copysign(steps, quotient) * increment
+
+
+def _parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    """Parse a MELCloud UTC timestamp into an aware datetime.
+
+    MELCloud sends "YYYY-MM-DDTHH:MM:SS" with an optional fraction of up to seven
+    digits and, on some endpoints, a trailing "Z".
+    """
+    if not value:
+        return None
+    if value[-1] in "Zz":
+        value = value[:-1]
+    try:
+        if len(value) > 19:
+            if value[19] != ".":
+                raise ValueError(value)
+            microsecond = int(value[20:26].ljust(6, "0"))
+        else:
+            microsecond = 0
+        return datetime(
+            int(value[0:4]),
+            int(value[5:7]),
+            int(value[8:10]),
+            int(value[11:13]),
+            int(value[14:16]),
+            int(value[17:19]),
+            microsecond,
+            tzinfo=timezone.utc,
+        )
+    except ValueError:
+        return None
+
+
 class Device(ABC):
     """MELCloud base device representation."""
 
+    _codecs: Dict[str, PropertyCodec] = {
+        PROPERTY_POWER: PropertyCodec("Power", 0x01),
+    }
+
     def __init__(
         self,
         device_conf: Dict[str, Any],
         client: Client,
         set_debounce=timedelta(seconds=1),
+        keep_raw_payloads: bool = False,
     ):
-        """Initialize a device."""
+        """Initialize a device.
+
+        Energy reports and unit lists are decoded into compact snapshots. Set
+        keep_raw_payloads to also keep the raw responses for debugging.
+        """
         self.device_id = device_conf.get("DeviceID")
         self.building_id = device_conf.get("BuildingID")
         self.mac = device_conf.get("MacAddress")
@@ -40,10 +151,17 @@ class Device(ABC):
         if client.account is not None:
             self._use_fahrenheit = client.account.get("UseFahrenheit", False)
 
-        self._device_conf = device_conf
-        self._state = None
-        self._device_units = None
-        self._energy_report = None
+        self._device_conf: Dict[str, Any] = {}
+        self._device_props: Mapping[str, Any] = {}
+        self._bind_conf(device_conf)
+        self._state: Optional[PayloadSnapshot] = None
+        self._device_units: Optional[Tuple[UnitSnapshot, ...]] = None
+        self._energy_report: Optional[EnergyReportSnapshot] = None
+        # Client generation of the report the snapshot was built from.
+        self._energy_report_generation = 0
+        self._keep_raw_payloads = keep_raw_payloads
+        self._last_seen: Optional[datetime] = None
+        self._last_seen_state: Optional[PayloadSnapshot] = None
         self._client = client
 
         self._set_debounce = set_debounce
@@ -51,10 +169,14 @@ class Device(ABC):
         self._write_task: Optional[asyncio.Future[None]] = None
         self._pending_writes: Dict[str, Any] = {}
 
+    def _bind_conf(self, device_conf: Dict[str, Any]):
+        """Bind a new device conf and resolve the nested device properties once."""
+        self._device_conf = device_conf
+        self._device_props = device_conf.get("Device", {})
+
     def get_device_prop(self, name: str) -> Optional[Any]:
         """Access device properties while shortcutting the nested device access."""
-        device = self._device_conf.get("Device", {})
-        return device.get(name)
+        return self._device_props.get(name)
 
     def get_state_prop(self, name: str) -> Optional[Any]:
         """Access state prop without None check."""
@@ -63,53 +185,122 @@ class Device(ABC):
         return self._state.get(name)
 
     def round_temperature(self, temperature: float) -> float:
-        """Round a temperature to the nearest temperature increment."""
-        return float(
-            Decimal(str(temperature / self.temperature_increment))
-            .quantize(Decimal('1'), rounding=ROUND_HALF_UP)
-        ) * self.temperature_increment
+        """Round a temperature to the nearest temperature increment.
+
+        Halves are rounded away from zero.
+        """
+        return _round_half_up(temperature, self.temperature_increment)
+
+    def round_temperatures(self, temperatures: Iterable[float]) -> List[float]:
+        """Round a batch of temperatures to the nearest temperature increment."""
+        increment = self.temperature_increment
+        return [_round_half_up(t, increment) for t in temperatures]
 
-    @abstractmethod
     def apply_write(self, state: Dict[str, Any], key: str, value: Any):
         """Apply writes to state object.
 
         Used for property validation, do not modify device state.
         """
-        pass
+        codec = self._codecs.get(key)
+        if codec is None:
+            raise ValueError(f"Cannot set {key}, invalid property")
+        encode = codec.encode
+        state[codec.state_key] = value if encode is None else encode(self, value)
+        state[EFFECTIVE_FLAGS] = state.get(EFFECTIVE_FLAGS, 0) | codec.flag
+
+    def encode_writes(self, properties: Mapping[str, Any]) -> Dict[str, Any]:
+        """Validate and encode multiple property writes at once.
+
+        Returns the state keys to update, including the combined EffectiveFlags.
+        Raises ValueError on the first invalid property or value.
+        """
+        state: Dict[str, Any] = {}
+        for key, value in properties.items():
+            self.apply_write(state, key, value)
+        return state
+
+    def diff_writes(self, properties: Mapping[str, Any]) -> Dict[str, Any]:
+        """Return the property writes that would change the current state."""
+        state = self._state or {}
+        changed: Dict[str, Any] = {}
+        for key, value in properties.items():
+            codec = self._codecs.get(key)
+            if codec is None:
+                raise ValueError(f"Cannot set {key}, invalid property")
+            encode = codec.encode
+            encoded = value if encode is None else encode(self, value)
+            if state.get(codec.state_key) != encoded:
+                changed[key] = value
+        return changed
+
+    def get_property(self, key: str) -> Optional[Any]:
+        """Return the current value of a writable property."""
+        codec = self._codecs.get(key)
+        if codec is None:
+            raise ValueError(f"Unknown property {key}")
+        if self._state is None:
+            return None
+        value = self._state.get(codec.state_key)
+        if value is None or codec.decode is None:
+            return value
+        return codec.decode(value)
+
+    @property
+    def writable_properties(self) -> List[str]:
+        """Return the properties accepted by set()."""
+        return list(self._codecs)
 
-    async def update(self):
+    async def update(self) -> bool:
         """Fetch state of the device from MELCloud.
 
-        List of device_confs is also updated.
+        List of device_confs is also updated. Returns False if neither the conf,
+        the state nor the energy report of the device changed.
 
         Please, rate limit calls to this method. Polling every 60 seconds should be
         enough to catch all events at the rate they are coming in to MELCloud with the
         exception of changes performed through MELCloud directly.
         """
         await self._client.update_confs()
-        self._device_conf = next(
+        device_conf = next(
             c
             for c in self._client.device_confs
             if c.get("DeviceID") == self.device_id
             and c.get("BuildingID") == self.building_id
         )
-        self._state = await self._client.fetch_device_state(self)
-        self._energy_report = await self._client.fetch_energy_report(self)
+        changed = device_conf is not self._device_conf
+        if changed:
+            self._bind_conf(device_conf)
+
+        state = await self._client.fetch_device_state(self)
+        changed |= state is not self._state
+        self._state = state
+
+        generation, energy_report = await self._client.fetch_energy_report_update(
+            self, self._energy_report_generation
+        )
+        if generation != self._energy_report_generation:
+            changed = True
+            self._energy_report_generation = generation
+            if energy_report is None:
+                self._energy_report = None
+            else:
+                self._energy_report = EnergyReportSnapshot(
+                    energy_report, keep_raw=self._keep_raw_payloads
+                )
 
         if self._device_units is None and self.access_level != ACCESS_LEVEL.get(
             "GUEST"
         ):
             self._device_units = await self._client.fetch_device_units(self)
+            changed = True
+        return changed
 
     async def set(self, properties: Dict[str, Any]):
         """Schedule property write to MELCloud."""
         if self._write_task is not None:
             self._write_task.cancel()
 
-        for k, value in properties.items():
-            if k == PROPERTY_POWER:
-                continue
-            self.apply_write({}, k, value)
+        self.encode_writes(properties)
 
         self._pending_writes.update(properties)
 
@@ -118,14 +309,10 @@ class Device(ABC):
 
     async def _write(self):
         await asyncio.sleep(self._set_debounce.total_seconds())
-        new_state = self._state.copy()
+        new_state = self._state.as_dict()
 
         for k, value in self._pending_writes.items():
-            if k == PROPERTY_POWER:
-                new_state["Power"] = value
-                new_state[EFFECTIVE_FLAGS] = new_state.get(EFFECTIVE_FLAGS, 0) | 0x01
-            else:
-                self.apply_write(new_state, k, value)
+            self.apply_write(new_state, k, value)
 
         if new_state[EFFECTIVE_FLAGS] != 0:
             new_state.update({HAS_PENDING_COMMAND: True})
@@ -135,6 +322,11 @@ class Device(ABC):
         self._set_event.set()
         self._set_event.clear()
 
+    @property
+    def pending_writes(self) -> Dict[str, Any]:
+        """Return property writes waiting for the debounce to expire."""
+        return dict(self._pending_writes)
+
     @property
     def name(self) -> str:
         """Return device name."""
@@ -144,7 +336,7 @@ class Device(ABC):
     def device_type(self) -> str:
         """Return type of the device."""
         return DEVICE_TYPE_LOOKUP.get(
-            self._device_conf.get("Device", {}).get("DeviceType", -1),
+            self._device_props.get("DeviceType", -1),
             DEVICE_TYPE_UNKNOWN,
         )
 
@@ -153,17 +345,7 @@ class Device(ABC):
         """Return device model info."""
         if self._device_units is None:
             return None
-
-        infos: List[dict] = []
-        for unit in self._device_units:
-            infos.append(
-                {
-                    "model_number": unit.get("ModelNumber"),
-                    "model": unit.get("Model"),
-                    "serial_number": unit.get("SerialNumber"),
-                }
-            )
-        return infos
+        return [unit.as_dict() for unit in self._device_units]
 
     @property
     def temp_unit(self) -> str:
@@ -175,7 +357,7 @@ class Device(ABC):
     @property
     def temperature_increment(self) -> float:
         """Return temperature increment."""
-        return self._device_conf.get("Device", {}).get("TemperatureIncrement", 0.5)
+        return self._device_props.get("TemperatureIncrement", 0.5)
 
     @property
     def last_seen(self) -> Optional[datetime]:
@@ -183,11 +365,13 @@ class Device(ABC):
 
         The timestamp is in UTC.
         """
-        if self._state is None:
+        state = self._state
+        if state is None:
             return None
-        return datetime.strptime(
-            self._state.get("LastCommunication"), "%Y-%m-%dT%H:%M:%S.%f"
-        ).replace(tzinfo=timezone.utc)
+        if state is not self._last_seen_state:
+            self._last_seen = _parse_timestamp(state.get("LastCommunication"))
+            self._last_seen_state = state
+        return self._last_seen
 
     @property
     def power(self) -> Optional[bool]:
@@ -214,25 +398,12 @@ class Device(ABC):
         """
         if self._energy_report is None:
             return None
-
-        consumption = 0
-
-        for mode in ['Heating', 'Cooling', 'Auto', 'Dry', 'Fan', 'Other']:
-            previous_reports = self._energy_report.get(mode, [0.0])
-            if previous_reports:
-                last_report = previous_reports[-1]
-            else:
-                last_report = 0.0
-            consumption += last_report
-
-        return consumption
+        return self._energy_report.daily_consumed
 
     @property
     def wifi_signal(self) -> Optional[int]:
         """Return wifi signal in dBm (negative value)."""
-        if self._device_conf is None:
-            return None
-        return self._device_conf.get("Device", {}).get("WifiSignalStrength", None)
+        return self._device_props.get("WifiSignalStrength", None)
 
     @property
     def has_error(self) -> bool:
@@ -1,7 +1,7 @@
 """Energy-Recovery-Ventilation (DeviceType=3) device definition."""
 from typing import Any, Dict, List, Optional
 
-from .device import EFFECTIVE_FLAGS, Device
+from .device import Device, PropertyCodec, build_codecs, reverse_lookup
 
 PROPERTY_VENTILATION_MODE = "ventilation_mode"
 PROPERTY_FAN_SPEED = "fan_speed"
@@ -41,36 +41,35 @@ def _ventilation_mode_from(mode: int) -> str:
     return _VENTILATION_MODE_LOOKUP.get(mode, VENTILATION_MODE_UNDEFINED)
 
 
-def _ventilation_mode_to(mode: str) -> int:
-    for k, value in _VENTILATION_MODE_LOOKUP.items():
-        if value == mode:
-            return k
-    raise ValueError(f"Invalid ventilation_mode [{mode}]")
+_ventilation_mode_to = reverse_lookup(_VENTILATION_MODE_LOOKUP, "ventilation_mode")
 
 
-class ErvDevice(Device):
-    """Energy-Recovery-Ventilation device."""
-
-    def apply_write(self, state: Dict[str, Any], key: str, value: Any):
-        """Apply writes to state object.
+_CODECS = build_codecs(
+    Device._codecs,
+    {
+        PROPERTY_VENTILATION_MODE: PropertyCodec(
+            "VentilationMode",
+            0x04,
+            lambda _, value: _ventilation_mode_to(value),
+            _ventilation_mode_from,
+        ),
+        PROPERTY_FAN_SPEED: PropertyCodec(
+            "SetFanSpeed",
+            0x08,
+            lambda _, value: _fan_speed_to(value),
+            _fan_speed_from,
+        ),
+    },
+)
 
-        Used for property validation, do not modify device state.
-        """
-        flags = state.get(EFFECTIVE_FLAGS, 0)
 
-        if key == PROPERTY_VENTILATION_MODE:
-            state["VentilationMode"] = _ventilation_mode_to(value)
-            flags = flags | 0x04
-        elif key == PROPERTY_FAN_SPEED:
-            state["SetFanSpeed"] = _fan_speed_to(value)
-            flags = flags | 0x08
-        else:
-            raise ValueError(f"Cannot set {key}, invalid property")
+class ErvDevice(Device):
+    """Energy-Recovery-Ventilation device."""
 
-        state[EFFECTIVE_FLAGS] = flags
+    _codecs = _CODECS
 
     def _device(self) -> Dict[str, Any]:
-        return self._device_conf.get("Device", {})
+        return self._device_props
 
     @property
     def has_energy_consumed_meter(self) -> bool:
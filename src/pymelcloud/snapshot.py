@@ -0,0 +1,116 @@
+"""Compact snapshots of MELCloud responses kept by the devices."""
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple
+
+# Key layouts of the payload snapshots, one per key order. The states and confs of
+# a device type always list the same keys, so the devices of a type share them.
+_LAYOUTS: Dict[Tuple[str, ...], Dict[str, int]] = {}
+
+
+def _last_bucket(report: Dict[str, Any], mode: str) -> float:
+    buckets = report.get(mode, [0.0])
+    if buckets:
+        return buckets[-1] or 0.0
+    return 0.0
+
+
+class EnergyReportSnapshot:
+    """Latest day bucket of every operation mode of an energy report.
+
+    The report contains arrays of buckets for each mode, labels and totals for the
+    whole requested period. Only the last bucket of each mode is used by the
+    devices, the raw report is kept only if explicitly requested.
+    """
+
+    __slots__ = ("heating", "cooling", "auto", "dry", "fan", "other", "raw")
+
+    def __init__(self, report: Dict[str, Any], keep_raw: bool = False):
+        """Decode an EnergyCost/Report response."""
+        self.heating = _last_bucket(report, "Heating")
+        self.cooling = _last_bucket(report, "Cooling")
+        self.auto = _last_bucket(report, "Auto")
+        self.dry = _last_bucket(report, "Dry")
+        self.fan = _last_bucket(report, "Fan")
+        self.other = _last_bucket(report, "Other")
+        self.raw: Optional[Dict[str, Any]] = report if keep_raw else None
+
+    @property
+    def daily_consumed(self) -> float:
+        """Return the energy consumed during the last day bucket in kWh."""
+        return (
+            self.heating + self.cooling + self.auto + self.dry + self.fan + self.other
+        )
+
+
+class UnitSnapshot:
+    """Indoor or outdoor unit information of a device."""
+
+    __slots__ = ("model_number", "model", "serial_number")
+
+    def __init__(self, unit: Dict[str, Any]):
+        """Decode a single entry of a ListDeviceUnits response."""
+        self.model_number: Optional[str] = unit.get("ModelNumber")
+        self.model: Optional[str] = unit.get("Model")
+        self.serial_number: Optional[str] = unit.get("SerialNumber")
+
+    def as_dict(self) -> Dict[str, Optional[str]]:
+        """Return the unit information as a dict."""
+        return {
+            "model_number": self.model_number,
+            "model": self.model,
+            "serial_number": self.serial_number,
+        }
+
+
+def decode_units(units: Optional[List[Dict[str, Any]]]) -> Tuple[UnitSnapshot, ...]:
+    """Decode a ListDeviceUnits response."""
+    return tuple(UnitSnapshot(unit) for unit in units or [])
+
+
+class PayloadSnapshot(Mapping[str, Any]):
+    """Read-only device state or conf with the key layout shared per device type.
+
+    A raw payload is a dict of its own per device. The snapshot keeps only a tuple
+    of the values and a reference to the layout mapping the keys to their position.
+    The Set* endpoints take the full state back, the body of a write is rebuilt
+    with as_dict.
+    """
+
+    __slots__ = ("_layout", "_values")
+
+    def __init__(self, payload: Mapping[str, Any]):
+        """Decode a flat JSON object of a response."""
+        keys = tuple(payload)
+        layout = _LAYOUTS.get(keys)
+        if layout is None:
+            layout = _LAYOUTS[keys] = {key: i for i, key in enumerate(keys)}
+        self._layout = layout
+        self._values = tuple(payload.values())
+
+    def __getitem__(self, key: str) -> Any:
+        return self._values[self._layout[key]]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._layout)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return the value of a key or the default if the payload lacks it."""
+        index = self._layout.get(key)
+        if index is None:
+            return default
+        return self._values[index]
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the payload as a new dict, e.g. as the body of a Set* write."""
+        return dict(zip(self._layout, self._values))
+
+
+def decode_payload(
+    payload: Optional[Dict[str, Any]]
+) -> Optional[PayloadSnapshot]:
+    """Decode a Device/Get or Set* response."""
+    if payload is None:
+        return None
+    return PayloadSnapshot(payload)
@@ -14,10 +14,9 @@ from homeassistant.components.switch import SwitchEntity
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 
-from . import DOMAIN, MelCloudDevice
+from . import DOMAIN, MelCloudDevice, MelCloudEntity
 from .const import ATTR_STATUS, MEL_DEVICES
 
 
@@ -41,9 +40,11 @@ async def async_setup_entry(
 
 
 
-class PowerSwitch(CoordinatorEntity, SwitchEntity):
+class PowerSwitch(MelCloudEntity, SwitchEntity):
     """Representation of a Switch."""
 
+    _source_keys = frozenset({"Power"})
+
 
     def __init__(self, api: MelCloudDevice, device: AtwDevice) -> None:
         """Initialize water heater device."""
@@ -0,0 +1,22 @@
+"""Make the integration and its bundled library importable by the tests.
+
+The bundled library is importable as pymelcloud. With Home Assistant installed,
+the integration is loaded from the repository root as melcloud_custom.
+"""
+import importlib.util
+from pathlib import Path
+import sys
+
+ROOT = Path(__file__).resolve().parent.parent
+
+sys.path.insert(0, str(ROOT / "src"))
+
+if "melcloud_custom" not in sys.modules and importlib.util.find_spec("homeassistant"):
+    spec = importlib.util.spec_from_file_location(
+        "melcloud_custom",
+        ROOT / "__init__.py",
+        submodule_search_locations=[str(ROOT)],
+    )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["melcloud_custom"] = module
+    spec.loader.exec_module(module)
@@ -0,0 +1,89 @@
+"""Tests of the streaming analytics."""
+from datetime import date
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from melcloud_custom.analytics import (  # noqa: E402
+    DEFROST_ENDED,
+    DEFROST_STARTED,
+    DefrostTracker,
+)
+
+DAY = date(2026, 10, 19)
+
+
+def _run(tracker, samples):
+    """Feed (timestamp, defrosting, CurrentEnergyConsumed in Wh) polls."""
+    return [
+        tracker.add_sample(
+            timestamp, DAY, defrosting, counter / 1000.0 if counter else None
+        )
+        for timestamp, defrosting, counter in samples
+    ]
+
+
+def test_cycle_without_counter_move_has_no_energy():
+    """The counter lags by hours, a cycle it did not move in has no energy."""
+    tracker = DefrostTracker()
+    transitions = _run(
+        tracker,
+        [
+            (0.0, False, 1284530),
+            (60.0, True, 1284530),
+            (120.0, True, 1284530),
+            (240.0, False, 1284530),
+        ],
+    )
+
+    assert transitions[1] == DEFROST_STARTED
+    assert transitions[3] == DEFROST_ENDED
+    assert tracker.last_energy is None
+    assert tracker.last_duration == 180.0
+    assert tracker.energy_today == 0.0
+    assert tracker.cycles_today == 1
+
+
+def test_counter_move_is_shared_at_the_average_power():
+    """A move within a cycle credits the cycle its share, not the whole lump."""
+    tracker = DefrostTracker()
+    _run(
+        tracker,
+        [
+            # The counter last moved two hours before the cycle.
+            (0.0, False, 1284530),
+            (7200.0, True, 1284530),
+            # 3.6 kWh over the 7500 s since the previous move.
+            (7500.0, True, 1288130),
+            (7560.0, False, 1288130),
+        ],
+    )
+
+    assert tracker.last_energy == pytest.approx(3.6 * 300 / 7500)
+    assert tracker.energy_today == pytest.approx(3.6 * 300 / 7500)
+
+
+def test_counter_reset_within_a_cycle():
+    """A reset counts the counter value as the increase."""
+    tracker = DefrostTracker()
+    _run(
+        tracker,
+        [
+            (0.0, False, 1284530),
+            (3000.0, True, 1284530),
+            (3600.0, True, 720),
+            (3660.0, False, 720),
+        ],
+    )
+
+    assert tracker.last_energy == pytest.approx(0.72 * 600 / 3600)
+
+
+def test_cycle_energy_is_unknown_without_counter():
+    """Units without a reading report no cycle energy."""
+    tracker = DefrostTracker()
+    _run(tracker, [(0.0, True, 0), (60.0, True, 0), (120.0, False, 0)])
+
+    assert tracker.last_energy is None
+    assert tracker.last_duration == 120.0
@@ -0,0 +1,74 @@
+"""Tests of the telemetry archive files."""
+from datetime import datetime, timezone
+import mmap
+import os
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from melcloud_custom import archive  # noqa: E402
+from melcloud_custom.archive import (  # noqa: E402
+    COLUMNS,
+    TIMESTAMP_COLUMN,
+    _day_dir,
+    _write_rows,
+    load_day,
+)
+
+DAY_START = datetime(2026, 10, 19, tzinfo=timezone.utc).timestamp()
+
+
+def _rows(first: int, count: int) -> list[tuple[float, ...]]:
+    return [
+        (DAY_START + 60 * index,) + tuple(float(index) for _ in COLUMNS)
+        for index in range(first, first + count)
+    ]
+
+
+def test_load_day_ignores_rows_missing_from_a_column(tmp_path):
+    """A column cut short by an interrupted write limits every column."""
+    _write_rows(str(tmp_path), 1, _rows(0, 5))
+    day = datetime(2026, 10, 19).date()
+    column_path = os.path.join(
+        _day_dir(str(tmp_path), 1, day), f"{COLUMNS[2]}.f64"
+    )
+    # Three complete rows and half a value.
+    os.truncate(column_path, 3 * 8 + 4)
+
+    columns = load_day(str(tmp_path), 1, day)
+    assert {len(view) for view in columns.values()} == {3}
+    assert list(columns[COLUMNS[2]]) == [0.0, 1.0, 2.0]
+
+
+def test_write_realigns_columns_before_appending(tmp_path):
+    """Rows appended after an interrupted write stay aligned."""
+    _write_rows(str(tmp_path), 1, _rows(0, 5))
+    day = datetime(2026, 10, 19).date()
+    column_path = os.path.join(
+        _day_dir(str(tmp_path), 1, day), f"{COLUMNS[0]}.f64"
+    )
+    os.truncate(column_path, 2 * 8)
+
+    _write_rows(str(tmp_path), 1, _rows(10, 2))
+    columns = load_day(str(tmp_path), 1, day)
+    assert {len(view) for view in columns.values()} == {4}
+    assert list(columns[COLUMNS[0]]) == [0.0, 1.0, 10.0, 11.0]
+    assert columns[TIMESTAMP_COLUMN][2] == DAY_START + 600
+
+
+def test_load_day_closes_the_maps_of_an_incomplete_day(tmp_path, monkeypatch):
+    """The columns mapped before finding a missing one are closed."""
+    _write_rows(str(tmp_path), 1, _rows(0, 5))
+    day = datetime(2026, 10, 19).date()
+    os.remove(os.path.join(_day_dir(str(tmp_path), 1, day), f"{COLUMNS[-1]}.f64"))
+    opened = []
+
+    class TrackedMmap(mmap.mmap):
+        def __init__(self, *args, **kwargs):
+            opened.append(self)
+
+    monkeypatch.setattr(archive.mmap, "mmap", TrackedMmap)
+
+    assert load_day(str(tmp_path), 1, day) == {}
+    assert opened and all(mapped.closed for mapped in opened)
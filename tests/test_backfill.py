@@ -0,0 +1,108 @@
+"""Tests of the energy history backfill."""
+import asyncio
+from datetime import date, datetime, timedelta, timezone
+import sys
+import types
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from homeassistant.util import dt as dt_util  # noqa: E402
+
+from melcloud_custom.backfill import EnergyBackfill, _report_buckets  # noqa: E402
+
+
+@pytest.fixture
+def rome():
+    """Use a time zone with daylight saving time."""
+    previous = dt_util.DEFAULT_TIME_ZONE
+    dt_util.set_default_time_zone(dt_util.get_time_zone("Europe/Rome"))
+    yield
+    dt_util.set_default_time_zone(previous)
+
+
+@pytest.fixture
+def recorder(monkeypatch):
+    """Replace the recorder modules imported by the backfill."""
+    statistics = types.ModuleType("statistics")
+    statistics.async_add_external_statistics = MagicMock()
+    models = types.ModuleType("models")
+    models.StatisticData = dict
+    models.StatisticMetaData = dict
+    package = "homeassistant.components.recorder"
+    monkeypatch.setitem(sys.modules, package, types.ModuleType(package))
+    monkeypatch.setitem(sys.modules, f"{package}.models", models)
+    monkeypatch.setitem(sys.modules, f"{package}.statistics", statistics)
+    return statistics.async_add_external_statistics
+
+
+def test_daily_buckets_follow_the_labels(rome):
+    """Days left out of a trimmed report are skipped, not shifted."""
+    report = {"Heating": [1.0, 2.0], "HotWater": [0.5, 0.0], "Labels": [30, 1]}
+
+    buckets = _report_buckets(report, date(2026, 9, 28), 5)
+
+    assert buckets == [
+        (dt_util.start_of_local_day(date(2026, 9, 30)), 1.5),
+        (dt_util.start_of_local_day(date(2026, 10, 1)), 2.0),
+    ]
+
+
+def test_hourly_buckets_across_the_end_of_dst(rome):
+    """The repeated local hour gets its own bucket, an hour later in UTC."""
+    labels = list(range(24))
+    labels.insert(3, 2)
+    report = {"Heating": [float(index) for index in range(25)], "Labels": labels}
+
+    buckets = _report_buckets(report, date(2026, 10, 25), 1)
+
+    starts = [start for start, _ in buckets]
+    assert len(starts) == 25
+    assert starts[0] == datetime(2026, 10, 24, 22, tzinfo=timezone.utc)
+    assert all(b - a == timedelta(hours=1) for a, b in zip(starts, starts[1:]))
+    assert buckets[3][1] == 3.0
+
+
+def test_unlabelled_short_report_cannot_be_aligned():
+    """Without labels, a report shorter than the requested days is skipped."""
+    assert _report_buckets({"Heating": [1.0, 2.0]}, date(2026, 10, 1), 5) is None
+
+
+def _backfill(report, last_imported: date):
+    backfill = EnergyBackfill(MagicMock(), "entry")
+    backfill._store = MagicMock(async_save=AsyncMock())
+    backfill._checkpoints = {"7": {"date": last_imported.isoformat(), "sum": 10.0}}
+    mel_device = MagicMock(device_id=7)
+    mel_device.name = "Heat pump"
+    mel_device.client.fetch_energy_report = AsyncMock(return_value=report)
+    asyncio.run(backfill._async_backfill(mel_device))
+    return backfill
+
+
+def test_short_report_advances_the_checkpoint(recorder):
+    """A report trimmed by MELCloud is imported and not retried."""
+    yesterday = dt_util.now().date() - timedelta(days=1)
+    report = {"Heating": [2.0], "Labels": [yesterday.day]}
+
+    backfill = _backfill(report, yesterday - timedelta(days=3))
+
+    assert backfill._checkpoints["7"] == {"date": yesterday.isoformat(), "sum": 12.0}
+    assert "7" not in backfill._failed_at
+    (_, _, statistics), _ = recorder.call_args
+    assert statistics == [
+        {"start": dt_util.start_of_local_day(yesterday), "state": 2.0, "sum": 12.0}
+    ]
+
+
+def test_unaligned_report_keeps_the_checkpoint(recorder):
+    """A report that cannot be aligned is retried later from the same day."""
+    yesterday = dt_util.now().date() - timedelta(days=1)
+    last_imported = yesterday - timedelta(days=3)
+
+    backfill = _backfill({"Heating": [2.0]}, last_imported)
+
+    assert backfill._checkpoints["7"]["date"] == last_imported.isoformat()
+    assert "7" in backfill._failed_at
+    recorder.assert_not_called()
@@ -0,0 +1,177 @@
+"""Tests of the MELCloud client caches."""
+import asyncio
+from datetime import timedelta
+import json
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from aiohttp import ClientResponseError  # noqa: E402
+from pymelcloud.client import Client  # noqa: E402
+from pymelcloud.snapshot import PayloadSnapshot  # noqa: E402
+
+
+class FakeResponse:
+    """Response of the fake session."""
+
+    request_info = SimpleNamespace(real_url="https://app.melcloud.com")
+    history = ()
+    status = 200
+
+    def __init__(self, body: bytes) -> None:
+        self._body = body
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *_):
+        return False
+
+    async def read(self) -> bytes:
+        return self._body
+
+
+class FakeSession:
+    """Session answering every request with the current body."""
+
+    def __init__(self) -> None:
+        self.body = b""
+        self.requests = 0
+
+    def _respond(self, *_, **__):
+        self.requests += 1
+        return FakeResponse(self.body)
+
+    get = post = _respond
+
+
+def _report(heating: float) -> bytes:
+    return json.dumps({"Heating": [1.0, heating], "Cooling": [0.0, 0.0]}).encode()
+
+
+def test_energy_report_generations():
+    """Unchanged reports are reported by generation without being kept."""
+    asyncio.run(_energy_report_generations())
+
+
+async def _energy_report_generations():
+    session = FakeSession()
+    client = Client("token", session)
+    device = SimpleNamespace(device_id=1)
+
+    session.body = _report(2.0)
+    generation, report = await client.fetch_energy_report_update(device, 0)
+    assert generation == 1
+    assert report["Heating"] == [1.0, 2.0]
+
+    generation, report = await client.fetch_energy_report_update(device, 1)
+    assert (generation, report) == (1, None)
+
+    # Another device object of the account still gets the current report.
+    generation, report = await client.fetch_energy_report_update(device, 0)
+    assert generation == 1
+    assert report["Heating"] == [1.0, 2.0]
+
+    session.body = _report(3.0)
+    generation, report = await client.fetch_energy_report_update(device, 1)
+    assert generation == 2
+    assert report["Heating"] == [1.0, 3.0]
+
+    # Only digests are kept, never the decoded reports.
+    assert all(
+        not isinstance(value, dict)
+        for cached in client._energy_reports.values()
+        for value in cached
+    )
+    assert session.requests == 4
+
+
+def test_energy_report_ttl():
+    """The report is fetched once per TTL for the generation it was fetched at."""
+    asyncio.run(_energy_report_ttl())
+
+
+async def _energy_report_ttl():
+    session = FakeSession()
+    client = Client("token", session, energy_report_ttl=timedelta(minutes=5))
+    device = SimpleNamespace(device_id=1)
+    session.body = _report(2.0)
+
+    generation, _ = await client.fetch_energy_report_update(device, 0)
+    assert await client.fetch_energy_report_update(device, generation) == (1, None)
+    assert session.requests == 1
+
+
+def _list_devices(flow_temperature: float) -> bytes:
+    device = {
+        "DeviceID": 1,
+        "BuildingID": 2,
+        "Device": {"DeviceType": 1, "FlowTemperature": flow_temperature},
+    }
+    structure = {"Devices": [device], "Areas": [], "Floors": []}
+    return json.dumps([{"ID": 2, "Name": "Home", "Structure": structure}]).encode()
+
+
+def test_state_snapshots():
+    """States are kept as snapshots and written back whole."""
+    asyncio.run(_state_snapshots())
+
+
+async def _state_snapshots():
+    session = FakeSession()
+    client = Client("token", session)
+    device = SimpleNamespace(device_id=1, building_id=2)
+    session.body = json.dumps({"DeviceType": 1, "Power": True}).encode()
+
+    state = await client.fetch_device_state(device)
+    assert isinstance(state, PayloadSnapshot)
+    assert await client.fetch_device_state(device) is state
+    assert (state["Power"], state.get("EffectiveFlags")) == (True, None)
+
+    body = state.as_dict()
+    body["Power"] = False
+    session.body = json.dumps(body).encode()
+    written = await client.set_device_state(body)
+    assert written.as_dict() == {"DeviceType": 1, "Power": False}
+    # States of the same keys share their layout.
+    assert written._layout is state._layout
+
+
+def test_conf_snapshots():
+    """The device properties of ListDevices are kept as snapshots."""
+    asyncio.run(_conf_snapshots())
+
+
+async def _conf_snapshots():
+    session = FakeSession()
+    client = Client("token", session)
+    session.body = _list_devices(30.0)
+
+    await client._fetch_device_confs()
+    (conf,) = client.device_confs
+    assert isinstance(conf["Device"], PayloadSnapshot)
+    assert conf["Device"].get("FlowTemperature") == 30.0
+
+    await client._fetch_device_confs()
+    assert client.device_confs[0] is conf
+
+
+def test_empty_list_devices():
+    """An empty ListDevices body fails the update and keeps the devices."""
+    asyncio.run(_empty_list_devices())
+
+
+async def _empty_list_devices():
+    session = FakeSession()
+    client = Client("token", session)
+    session.body = _list_devices(30.0)
+    await client._fetch_device_confs()
+    confs = client.device_confs
+
+    session.body = b""
+    for _ in range(2):
+        with pytest.raises(ClientResponseError, match="Empty ListDevices"):
+            await client._fetch_device_confs()
+    assert client.device_confs == confs
@@ -0,0 +1,69 @@
+"""Tests of the MELCloud config flow."""
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from homeassistant.const import CONF_PASSWORD, CONF_TOKEN  # noqa: E402
+
+from melcloud_custom.config_flow import FlowHandler  # noqa: E402
+
+
+def _reauth_flow(entry):
+    flow = FlowHandler()
+    flow.hass = MagicMock()
+    flow.hass.config_entries.async_get_entry.return_value = entry
+    flow.context = {"source": "reauth", "entry_id": "entry"}
+    flow.async_update_reload_and_abort = MagicMock(return_value={"type": "abort"})
+    return flow
+
+
+def test_reauth_of_a_token_only_entry():
+    """Entries holding only the token log in with their unique id."""
+    entry = MagicMock(unique_id="user@example.com", title="user@example.com")
+    entry.data = {CONF_TOKEN: "expired"}
+    flow = _reauth_flow(entry)
+    mcauth = MagicMock(auth_token="fresh", token_expiry=None)
+    flow._test_authorization = AsyncMock(return_value=mcauth)
+
+    async def _reauth():
+        form = await flow.async_step_reauth(entry.data)
+        assert form["step_id"] == "reauth_confirm"
+        assert form["description_placeholders"] == {"username": "user@example.com"}
+        return await flow.async_step_reauth_confirm(
+            {CONF_PASSWORD: "secret", "language": "IT"}
+        )
+
+    assert asyncio.run(_reauth()) == {"type": "abort"}
+    flow._test_authorization.assert_awaited_once_with(
+        "user@example.com", "secret", "IT"
+    )
+    flow.async_update_reload_and_abort.assert_called_once_with(
+        entry,
+        data={
+            CONF_TOKEN: "fresh",
+            "token_expiry": None,
+            "username": "user@example.com",
+            "language": "IT",
+        },
+    )
+
+
+def test_reauth_shows_invalid_auth():
+    """A refused password shows the form again."""
+    entry = MagicMock(unique_id="user@example.com")
+    entry.data = {CONF_TOKEN: "expired", "username": "user@example.com"}
+    flow = _reauth_flow(entry)
+    flow._test_authorization = AsyncMock(return_value=None)
+
+    async def _reauth():
+        await flow.async_step_reauth(entry.data)
+        return await flow.async_step_reauth_confirm(
+            {CONF_PASSWORD: "wrong", "language": "EN"}
+        )
+
+    result = asyncio.run(_reauth())
+    assert result["errors"] == {"base": "invalid_auth"}
+    flow.async_update_reload_and_abort.assert_not_called()
@@ -0,0 +1,39 @@
+"""Tests of the base MELCloud device."""
+from decimal import ROUND_HALF_UP, Decimal
+import random
+
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from pymelcloud.device import _round_half_up  # noqa: E402
+
+# Celsius and Fahrenheit increments reported by the devices.
+INCREMENTS = (0.5, 1.0, 0.1, 1 / 1.8)
+
+
+def _decimal_round(value: float, increment: float) -> float:
+    """Rounding of Device.round_temperature before the Decimal path was removed."""
+    return float(
+        Decimal(str(value / increment)).quantize(Decimal("1"), rounding=ROUND_HALF_UP)
+    ) * increment
+
+
+@pytest.mark.parametrize("increment", INCREMENTS)
+@pytest.mark.parametrize(
+    "value", (0.0, -0.0, 0.25, 0.75, -0.25, 20.25, 20.75, -20.25, 21.5, 1e-9, 1e15)
+)
+def test_round_half_up_edge_cases(value, increment):
+    """Halves and boundaries round like the Decimal implementation."""
+    assert _round_half_up(value, increment) == _decimal_round(value, increment)
+
+
+@pytest.mark.parametrize("increment", INCREMENTS)
+def test_round_half_up_matches_decimal(increment):
+    """Random setpoints and exact halves round like the Decimal implementation."""
+    rng = random.Random(increment)
+    for _ in range(50_000):
+        value = rng.uniform(-100, 100)
+        assert _round_half_up(value, increment) == _decimal_round(value, increment)
+        half = (rng.randrange(-400, 400) + 0.5) * increment
+        assert _round_half_up(half, increment) == _decimal_round(half, increment)
@@ -0,0 +1,48 @@
+"""Tests of the compressor frequency and demand histograms."""
+from unittest.mock import MagicMock
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from melcloud_custom.histograms import (  # noqa: E402
+    MAX_HOLD,
+    HistogramStore,
+    TimeWeightedHistogram,
+)
+
+
+def test_polled_value_holds_until_the_next_poll():
+    """Each band is credited the time its value held."""
+    histogram = TimeWeightedHistogram(0, 10, 3)
+    histogram.add(5, 0.0)
+    histogram.add(15, 60.0)
+    histogram.add(45, 180.0)
+    histogram.add(None, 240.0)
+
+    assert list(histogram.seconds) == [60.0, 120.0, 60.0]
+
+
+def test_long_gap_credits_no_band():
+    """A gap longer than MAX_HOLD is not credited, not even in part."""
+    histogram = TimeWeightedHistogram(0, 10, 3)
+    histogram.add(5, 0.0)
+    histogram.add(15, MAX_HOLD + 1.0)
+    histogram.add(15, MAX_HOLD + 61.0)
+
+    assert list(histogram.seconds) == [0.0, 60.0, 0.0]
+
+
+def test_polls_do_not_postpone_a_pending_save():
+    """Only the first poll after a save requests a delayed save."""
+    store = HistogramStore(MagicMock(), "entry")
+    store._store = MagicMock()
+
+    store.async_schedule_save()
+    store.async_schedule_save()
+    assert store._store.async_delay_save.call_count == 1
+
+    data_func = store._store.async_delay_save.call_args.args[0]
+    data_func()
+    store.async_schedule_save()
+    assert store._store.async_delay_save.call_count == 2
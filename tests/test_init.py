@@ -0,0 +1,104 @@
+"""Tests of the MELCloud config entry setup."""
+import asyncio
+from datetime import timedelta
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from homeassistant.const import CONF_PASSWORD, CONF_TOKEN  # noqa: E402
+from homeassistant.util import dt as dt_util  # noqa: E402
+
+import melcloud_custom  # noqa: E402
+from melcloud_custom import (  # noqa: E402
+    MelCloudDevice,
+    TokenManager,
+    token_entry_data,
+)
+from melcloud_custom.const import CONF_TOKEN_EXPIRY  # noqa: E402
+
+
+def _entry(expires_in: timedelta | None) -> MagicMock:
+    entry = MagicMock()
+    entry.title = "user@example.com"
+    entry.data = {
+        CONF_TOKEN_EXPIRY: (
+            (dt_util.utcnow() + expires_in).isoformat() if expires_in else None
+        )
+    }
+    return entry
+
+
+def test_entry_data_has_no_password():
+    """Only the token is persisted after a login."""
+    mcauth = MagicMock()
+    mcauth.auth_token = "token"
+    mcauth.token_expiry = None
+
+    data = token_entry_data(mcauth, "user@example.com", "en")
+
+    assert CONF_PASSWORD not in data
+    assert data["token"] == "token"
+
+
+def test_reauth_starts_once_when_the_token_expires_soon():
+    """The password is asked again before the token expires."""
+    entry = _entry(timedelta(days=1))
+    manager = TokenManager(MagicMock(), entry)
+
+    manager.async_check_expiry()
+    manager.async_check_expiry()
+
+    entry.async_start_reauth.assert_called_once()
+
+
+@pytest.mark.parametrize("expires_in", [timedelta(days=30), None])
+def test_no_reauth_while_the_token_is_valid(expires_in):
+    """Tokens far from expiry or without a reported expiry are kept."""
+    entry = _entry(expires_in)
+    manager = TokenManager(MagicMock(), entry)
+
+    manager.async_check_expiry()
+
+    entry.async_start_reauth.assert_not_called()
+
+
+def test_unit_serials_are_listed_with_their_models():
+    """The device serial is the registry serial, unit serials follow their models."""
+    device = MagicMock(device_type="ata", serial="2800000001", mac="aa:bb:cc:00:00:01")
+    device.units = [
+        {"model": "EHST20D-VM2D", "serial_number": "1234567"},
+        {"model": "PUZ-WM85VAA", "serial_number": None},
+    ]
+    device_info = MelCloudDevice(device).device_info
+
+    assert device_info["serial_number"] == "2800000001"
+    assert "hw_version" not in device_info
+    assert device_info["model"] == (
+        "MELCloud IF (MAC: aa:bb:cc:00:00:01) - "
+        "EHST20D-VM2D (S/N 1234567), PUZ-WM85VAA"
+    )
+
+
+def test_failed_setup_releases_the_shared_client(monkeypatch):
+    """A setup failing after acquiring the client does not keep a reference."""
+    monkeypatch.setattr(
+        melcloud_custom, "mel_devices_setup", AsyncMock(return_value={})
+    )
+    release_client = AsyncMock()
+    monkeypatch.setattr(melcloud_custom, "release_client", release_client)
+    energy_backfill = MagicMock()
+    energy_backfill.return_value.async_load = AsyncMock(side_effect=OSError)
+    energy_backfill.return_value.async_cancel = AsyncMock()
+    monkeypatch.setattr(melcloud_custom, "EnergyBackfill", energy_backfill)
+    hass = MagicMock(data={})
+    entry = MagicMock(unique_id="user@example.com", entry_id="entry")
+    entry.data = {CONF_TOKEN: "token"}
+
+    with pytest.raises(OSError):
+        asyncio.run(melcloud_custom.async_setup_entry(hass, entry))
+
+    release_client.assert_awaited_once_with("user@example.com")
+    energy_backfill.return_value.async_cancel.assert_awaited_once()
+    assert hass.data == {}
@@ -0,0 +1,156 @@
+"""Tests of the MELCloud sensors."""
+from datetime import timedelta
+from unittest.mock import MagicMock
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from melcloud_custom import sensor  # noqa: E402
+from melcloud_custom.sensor import (  # noqa: E402
+    FLEET_SENSORS,
+    FleetSensor,
+    MelcloudSensorEntityDescription,
+    MelDeviceSensor,
+    PublishFilter,
+)
+
+
+class FakeClock:
+    """Monotonic clock advanced by hand."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Replace the clock of the publish filter."""
+    fake = FakeClock()
+    monkeypatch.setattr(sensor, "time", fake)
+    return fake
+
+
+@pytest.fixture
+def timers(monkeypatch):
+    """Capture the deferred publishes instead of scheduling them."""
+    scheduled = []
+
+    def _call_later(hass, delay, action):
+        timer = [delay, action, False]
+        scheduled.append(timer)
+
+        def _cancel():
+            timer[2] = True
+
+        return _cancel
+
+    monkeypatch.setattr(sensor, "async_call_later", _call_later)
+    return scheduled
+
+
+def _sensor(api, monkeypatch):
+    description = MelcloudSensorEntityDescription(
+        key="room_temperature",
+        name="Room Temperature",
+        value_fn=lambda x: x.value,
+        enabled=lambda x: True,
+        source_keys=frozenset({"RoomTemperature"}),
+        publish_filter=PublishFilter(
+            deadband=0.3, min_interval=timedelta(minutes=2)
+        ),
+    )
+    entity = MelDeviceSensor(api, description)
+    entity.hass = MagicMock()
+    written = []
+    monkeypatch.setattr(
+        entity, "async_write_ha_state", lambda: written.append(entity.native_value)
+    )
+    return entity, written
+
+
+def test_suppressed_value_is_published_when_steady(clock, timers, monkeypatch):
+    """A value suppressed by the min interval is published without a new change."""
+    api = MagicMock()
+    api.coordinator.last_update_success = True
+    api.value = 21.0
+    entity, written = _sensor(api, monkeypatch)
+
+    api.has_changed.return_value = True
+    entity._handle_coordinator_update()
+    assert written == [21.0]
+
+    clock.now = 60
+    api.value = 22.0
+    entity._handle_coordinator_update()
+    assert written == [21.0]
+    assert timers[-1][0] == pytest.approx(60)
+
+    # Quiet polls, the raw data does not change anymore.
+    api.has_changed.return_value = False
+    clock.now = 90
+    entity._handle_coordinator_update()
+    assert written == [21.0]
+    assert timers[0][2]
+    assert timers[-1][0] == pytest.approx(30)
+
+    clock.now = 120
+    delay, action, cancelled = timers[-1]
+    assert not cancelled
+    action(None)
+    assert written == [21.0, 22.0]
+    assert entity._unsub_publish is None
+
+    clock.now = 180
+    entity._handle_coordinator_update()
+    assert written == [21.0, 22.0]
+
+
+def test_value_within_deadband_is_published_at_heartbeat(clock, timers, monkeypatch):
+    """A small change is held back until the heartbeat."""
+    api = MagicMock()
+    api.coordinator.last_update_success = True
+    api.value = 21.0
+    api.has_changed.return_value = True
+    entity, written = _sensor(api, monkeypatch)
+    entity._handle_coordinator_update()
+
+    clock.now = 300
+    api.value = 21.1
+    entity._handle_coordinator_update()
+    assert written == [21.0]
+    assert timers[-1][0] == pytest.approx(1500)
+
+    clock.now = 1800
+    timers[-1][1](None)
+    assert written == [21.0, 21.1]
+
+
+def test_unchanged_value_schedules_nothing(clock, timers, monkeypatch):
+    """Polls repeating the published value do not schedule publishes."""
+    api = MagicMock()
+    api.coordinator.last_update_success = True
+    api.value = 21.0
+    api.has_changed.return_value = True
+    entity, written = _sensor(api, monkeypatch)
+    entity._handle_coordinator_update()
+
+    clock.now = 60
+    entity._handle_coordinator_update()
+    assert written == [21.0]
+    assert not timers
+
+
+def test_fleet_energy_resets_at_the_start_of_the_day():
+    """Daily energy totals are TOTAL sensors resetting at local midnight."""
+    entry = MagicMock(title="user@example.com", entry_id="entry")
+    for description in FLEET_SENSORS:
+        fleet_sensor = FleetSensor(MagicMock(), entry, description)
+        if description.device_class == sensor.SensorDeviceClass.ENERGY:
+            assert description.state_class == sensor.SensorStateClass.TOTAL
+            assert fleet_sensor.last_reset == sensor.dt_util.start_of_local_day()
+        else:
+            assert fleet_sensor.last_reset is None
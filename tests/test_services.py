@@ -0,0 +1,56 @@
+"""Tests of the MELCloud services."""
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from homeassistant.exceptions import HomeAssistantError  # noqa: E402
+
+from melcloud_custom import services  # noqa: E402
+
+
+def _mel_device(device_id, async_set=None):
+    mel_device = MagicMock(device_id=device_id)
+    mel_device.name = f"Heat pump {device_id}"
+    mel_device.device.diff_writes.side_effect = dict
+    mel_device.async_set = async_set or AsyncMock(return_value=True)
+    return mel_device
+
+
+def _set_group(monkeypatch, group, properties):
+    monkeypatch.setattr(services, "_find_group", lambda *args: group)
+    monkeypatch.setattr(services, "GROUP_WRITE_INTERVAL", 0)
+    call = MagicMock()
+    call.data = {services.ATTR_BUILDING_ID: 1, services.ATTR_PROPERTIES: properties}
+    return asyncio.run(services._async_set_group(call))
+
+
+def test_set_group_rejects_values_of_the_wrong_type(monkeypatch):
+    """A TypeError of the validation becomes a service error, nothing is written."""
+    valid = _mel_device(1)
+    invalid = _mel_device(2)
+    invalid.device.encode_writes.side_effect = TypeError("not a number")
+
+    with pytest.raises(HomeAssistantError, match="Heat pump 2"):
+        _set_group(monkeypatch, [valid, invalid], {"target_temperature": "warm"})
+
+    valid.async_set.assert_not_called()
+
+
+def test_set_group_reports_a_raising_write_as_failed(monkeypatch):
+    """A write raising does not abort the writes to the other devices."""
+    failing = _mel_device(1, AsyncMock(side_effect=ConnectionError("reset")))
+    refused = _mel_device(2, AsyncMock(return_value=False))
+    written = _mel_device(3)
+
+    response = _set_group(
+        monkeypatch, [failing, refused, written], {"target_temperature": 21}
+    )
+
+    assert {key: value["result"] for key, value in response["devices"].items()} == {
+        "1": services.RESULT_FAILED,
+        "2": services.RESULT_FAILED,
+        "3": services.RESULT_OK,
+    }
@@ -47,10 +47,10 @@ async def async_setup_entry(
 
     for mel_device in mel_devices[DEVICE_TYPE_ATW]:
         
-        if (mel_device.device._device_conf['Device']['HasHotWaterTank'] and
-            mel_device.device._device_conf['Device']['CanSetTankTemperature']):
+        if (mel_device.device.get_device_prop("HasHotWaterTank") and
+            mel_device.device.get_device_prop("CanSetTankTemperature")):
             entities.append(HotWaterAccumulator(mel_device, mel_device.device))
-        if mel_device.device._device_conf['Device']['CanHeat']:
+        if mel_device.device.get_device_prop("CanHeat"):
             [
             entities.append(HeatingWaterAccumulator(mel_device, mel_device.device, zone))
             for zone in mel_device.device.zones
@@ -64,6 +64,8 @@ async def async_setup_entry(
 class HotWaterAccumulator(CoordinatorEntity, WaterHeaterEntity):
     """Air-to-Water water heater."""
 
+    # The status is recorded by the operation mode sensor of the device.
+    _unrecorded_attributes = frozenset({ATTR_STATUS})
     _attr_supported_features = (
         WaterHeaterEntityFeature.TARGET_TEMPERATURE
         | WaterHeaterEntityFeature.OPERATION_MODE
@@ -134,12 +136,12 @@ class HotWaterAccumulator(CoordinatorEntity, WaterHeaterEntity):
     @property
     def min_temp(self) -> float:
         """Return the minimum temperature."""
-        return self._device._device_conf['Device']['MinSetTemperature'] or 10
+        return self._device.get_device_prop("MinSetTemperature") or 10
 
     @property
     def max_temp(self) -> float:
         """Return the maximum temperature."""
-        return self._device._device_conf['Device']['MaxSetTemperature'] or 60
+        return self._device.get_device_prop("MaxSetTemperature") or 60
 
 
 class HeatingWaterAccumulator(CoordinatorEntity, WaterHeaterEntity):
@@ -197,7 +199,7 @@ class HeatingWaterAccumulator(CoordinatorEntity, WaterHeaterEntity):
         if self._zone.operation_mode in [
             ZONE_OPERATION_MODE_HEAT_FLOW,
             ZONE_OPERATION_MODE_COOL_FLOW ]:
-            return self._device._device_conf['Device']['FlowTemperature']
+            return self._device.get_device_prop("FlowTemperature")
         
         elif self._zone.operation_mode in [
             ZONE_OPERATION_MODE_HEAT_THERMOSTAT,
@@ -246,5 +248,5 @@ class HeatingWaterAccumulator(CoordinatorEntity, WaterHeaterEntity):
     @property
     def max_temp(self) -> float:
         """Return the maximum temperature."""
-        return self._device._device_conf['Device']['MaxSetTemperature'] or 60
+        return self._device.get_device_prop("MaxSetTemperature") or 60
 